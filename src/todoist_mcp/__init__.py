@@ -1,10 +1,17 @@
 """Todoist MCP Server package."""
-from todoist_mcp.server import TodoistMCPServer
 import argparse
 import os
 
 __version__ = "0.1.0"
 
+
+def __getattr__(name):
+    # FastMCP and its transports are imported on first use, not with the package
+    if name == "TodoistMCPServer":
+        from todoist_mcp.server import TodoistMCPServer
+        return TodoistMCPServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def main():
     """
     Run the Sceptre MCP server with command-line arguments.
@@ -31,16 +38,77 @@ def main():
         default="stdio",
         help="Transport protocol to use"
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Cache GET responses in memory for 30 seconds (reads may then miss changes made elsewhere)"
+    )
+    parser.add_argument(
+        "--warm-cache",
+        action="store_true",
+        help="Load projects, labels, sections and recent tasks in the background at startup (implies --cache)"
+    )
+    parser.add_argument(
+        "--shared-cache",
+        metavar="PATH",
+        help="SQLite file for a response cache shared by all server processes on this host"
+    )
+    parser.add_argument(
+        "--tool-workers",
+        type=int,
+        default=8,
+        help="Number of threads that run tool calls"
+    )
+    parser.add_argument(
+        "--max-response-bytes",
+        type=int,
+        help="Cut list responses larger than this; the rest is returned by continue_response"
+    )
+    parser.add_argument(
+        "--max-response-items",
+        type=int,
+        help="Cut list responses with more items than this"
+    )
+    parser.add_argument(
+        "--multi-tenant",
+        action="store_true",
+        help="Serve many Todoist accounts, each authenticated by its 'Authorization: Bearer' token (HTTP transports only)"
+    )
+    parser.add_argument(
+        "--max-tenants",
+        type=int,
+        default=256,
+        help="Accounts kept loaded in multi-tenant mode; the least recently used are dropped"
+    )
+    parser.add_argument(
+        "--tenant-memory-mb",
+        type=int,
+        default=32,
+        help="Estimated memory one account's local store and indexes may use in multi-tenant mode; "
+             "larger accounts are refused for an hour"
+    )
     
     args = parser.parse_args()
     
+    if args.multi_tenant and args.transport == "stdio":
+        parser.error("--multi-tenant needs the sse or streamable-http transport")
+    if args.multi_tenant and args.warm_cache:
+        parser.error("--warm-cache needs a single account and cannot be combined with --multi-tenant")
+    
     # Create and run the server
-    server = TodoistMCPServer()
+    from todoist_mcp.server import TodoistMCPServer
+    server = TodoistMCPServer(shared_cache_path=args.shared_cache, max_workers=args.tool_workers,
+                              max_response_bytes=args.max_response_bytes,
+                              max_response_items=args.max_response_items,
+                              multi_tenant=args.multi_tenant, max_tenants=args.max_tenants,
+                              tenant_memory_bytes=args.tenant_memory_mb * 1024 * 1024,
+                              response_cache=args.cache or args.warm_cache)
     
     if args.transport in ["sse", "streamable-http"]:
-        server.run(transport=args.transport, host=args.host, port=args.port)
+        server.run(transport=args.transport, host=args.host, port=args.port,
+                   warm_cache=args.warm_cache)
     else:
-        server.run(transport="stdio")
+        server.run(transport="stdio", warm_cache=args.warm_cache)
 
 __all__ = ["main"]
 
@@ -1,7 +1,37 @@
 """Unified API v1 client for Todoist."""
 
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
 import httpx
-from typing import Any, Dict, Optional, List, Union
+from typing import Any, Callable, Dict, NamedTuple, Optional, List, Tuple, Union
+
+from .cache import (
+    NEGATIVE_STATUSES, WRITE_NEGATIVE_STATUSES, NegativeCache, ResponseCache, SharedResponseCache,
+)
+from .labels import LabelIndex
+from .ratelimit import RateBudget
+from .scheduler import RequestScheduler
+
+
+logger = logging.getLogger(__name__)
+
+_MISS = object()
+
+# POST endpoints that only read data and must not invalidate caches
+READ_ONLY_POSTS = frozenset({"sync"})
+
+
+class ChangeEvent(NamedTuple):
+    """A successful write made through the client."""
+    
+    action: str
+    entity_type: str
+    entity_id: Optional[str]
+    data: Optional[Dict[str, Any]]
+    result: Any
 
 
 class TodoistV1Client:
@@ -9,14 +39,44 @@ class TodoistV1Client:
     
     BASE_URL = "https://api.todoist.com/api/v1"
     V2_URL = "https://api.todoist.com/api/v2"
+    # Minimum seconds between label listings triggered by unknown label names
+    LABEL_RELOAD_INTERVAL = 30.0
     
-    def __init__(self, token: str):
+    def __init__(self, token: str, negative_ttl: float = 60.0,
+                 cache: Optional[Union[ResponseCache, SharedResponseCache]] = None,
+                 max_concurrent: int = 4):
         self.token = token
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
-        self.client = httpx.Client(headers=self.headers)
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self.negative_cache = NegativeCache(ttl=negative_ttl)
+        # Reads are cached only when a cache is passed in (opt-in)
+        self.cache = cache if cache is not None else ResponseCache(ttl=0)
+        self._inflight: Dict[Any, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._listeners: List[Callable[[ChangeEvent], None]] = []
+        self.rate_budget = RateBudget()
+        self.scheduler = RequestScheduler(max_concurrent=max_concurrent)
+        self.labels = LabelIndex()
+        self.add_listener(self.labels.handle_event)
+        self._labels_loaded: Optional[float] = None
+        self._labels_lock = threading.Lock()
+    
+    @property
+    def client(self) -> httpx.Client:
+        """HTTP client, created on the first request.
+        
+        Building the client loads the TLS trust store, which is the bulk of
+        constructing this object; deferring it keeps server start-up fast.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(headers=self.headers)
+        return self._client
     
     def __enter__(self):
         """Context manager support."""
@@ -26,6 +86,39 @@ class TodoistV1Client:
         """Ensure client is closed on exit."""
         self.close()
     
+    def add_listener(self, listener: Callable[[ChangeEvent], None]) -> None:
+        """Register a callback invoked with a ChangeEvent after every successful write."""
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[ChangeEvent], None]) -> None:
+        """Unregister a change listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, method: str, endpoint: str, data: Optional[Dict], result: Any) -> None:
+        """Describe a write as a ChangeEvent and hand it to the listeners."""
+        if not self._listeners:
+            return
+        parts = endpoint.split("/")
+        if len(parts) > 1:
+            entity_id = parts[1]
+        else:
+            entity_id = result.get("id") if isinstance(result, dict) else None
+        if len(parts) > 2:
+            action = parts[2]
+        elif method == "DELETE":
+            action = "delete"
+        elif len(parts) == 1:
+            action = "create"
+        else:
+            action = "update"
+        event = ChangeEvent(action, parts[0], entity_id, data, result)
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Change listener failed for %s %s", method, endpoint)
+    
     def _url(self, endpoint: str, api_version: int = 1) -> str:
         """Construct API URL."""
         base = self.BASE_URL if api_version == 1 else self.V2_URL
@@ -36,17 +129,101 @@ class TodoistV1Client:
         return {k: v for k, v in kwargs.items() if v is not None}
     
     def _request(self, method: str, endpoint: str, json: Optional[Dict] = None, 
-                 params: Optional[Dict] = None, api_version: int = 1) -> Optional[Dict[str, Any]]:
-        """Execute HTTP request with standard error handling."""
+                 params: Optional[Dict] = None, api_version: int = 1,
+                 entity: Optional[Tuple[str, str]] = None,
+                 use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Execute HTTP request with standard error handling.
+        
+        ``entity`` is the ``(entity_type, entity_id)`` the request targets.
+        Reads of an entity recently reported missing or forbidden fail fast
+        from the negative cache; writes clear its entry. ``use_cache=False``
+        reads upstream even when a cached response exists, for reads whose
+        result is written back.
+        """
+        if entity:
+            if method == "GET":
+                self.negative_cache.check(*entity)
+            else:
+                self.negative_cache.discard(*entity)
+        
+        entity_type = self.cache.entity_type(endpoint)
+        if method != "GET" or not self.cache.enabled or not use_cache:
+            return self._send(method, endpoint, json, params, api_version, entity)
+        
+        cache_key = self.cache.make_key(endpoint, params, api_version)
+        cached = self.cache.get(cache_key, entity_type, default=_MISS)
+        if cached is not _MISS:
+            return cached
+        
+        # Single-flight: concurrent identical reads share one upstream request
+        with self._inflight_lock:
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                pending = self._inflight[cache_key] = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return pending.result()
+        
+        try:
+            result = self._send(method, endpoint, json, params, api_version, entity,
+                                cache_key=cache_key)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+    
+    def _send(self, method: str, endpoint: str, json: Optional[Dict], params: Optional[Dict],
+              api_version: int, entity: Optional[Tuple[str, str]],
+              cache_key: Any = None) -> Optional[Dict[str, Any]]:
+        """Send a request upstream, maintaining the negative and response caches.
+        
+        At most ``max_concurrent`` requests are in flight per client; further
+        requests wait in the scheduler by their priority class.
+        """
+        is_write = method != "GET" and endpoint not in READ_ONLY_POSTS
         url = self._url(endpoint, api_version)
-        response = self.client.request(method, url, json=json, params=params)
-        response.raise_for_status()
+        # Noted before the read goes out: a write landing meanwhile makes the result stale
+        generation = self.cache.generation(self.cache.entity_type(endpoint)) if cache_key is not None else None
+        try:
+            with self.scheduler.slot():
+                self.rate_budget.record()
+                response = self.client.request(method, url, json=json, params=params)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            statuses = NEGATIVE_STATUSES if method == "GET" else WRITE_NEGATIVE_STATUSES
+            if entity and e.response.status_code in statuses:
+                self.negative_cache.add(*entity, e)
+            raise
+        finally:
+            if is_write:
+                self.cache.invalidate_for_write(endpoint)
         
         # Handle empty responses (e.g., DELETE)
         if response.status_code == 204 or not response.content:
-            return None
+            result = None
+        else:
+            result = response.json()
         
-        return response.json()
+        if is_write:
+            self._notify(method, endpoint, json, result)
+        if cache_key is not None:
+            body = response.content
+            self.cache.put(cache_key, self.cache.entity_type(endpoint), result,
+                           size=len(body) if isinstance(body, bytes) else None, generation=generation)
+        return result
+    
+    def _not_found(self, endpoint: str) -> httpx.HTTPStatusError:
+        """A 404 error for an entity that a bulk read did not return."""
+        request = httpx.Request("GET", self._url(endpoint))
+        response = httpx.Response(404, request=request)
+        return httpx.HTTPStatusError(f"404 Not Found for url '{request.url}'", request=request, response=response)
     
     def _validate_comment_target(self, task_id: Optional[str], project_id: Optional[str]) -> None:
         """Validate comment target - must specify exactly one."""
@@ -68,7 +245,7 @@ class TodoistV1Client:
     
     def get_project(self, project_id: str) -> Dict[str, Any]:
         """Get a single project."""
-        return self._request("GET", f"projects/{project_id}")
+        return self._request("GET", f"projects/{project_id}", entity=("project", project_id))
     
     def add_project(self, name: str, parent_id: Optional[str] = None, 
                    color: Optional[str] = None) -> Dict[str, Any]:
@@ -79,23 +256,25 @@ class TodoistV1Client:
     def update_project(self, project_id: str, **kwargs) -> Dict[str, Any]:
         """Update an existing project."""
         data = self._build_params(**kwargs)
-        return self._request("POST", f"projects/{project_id}", json=data)
+        return self._request("POST", f"projects/{project_id}", json=data,
+                             entity=("project", project_id))
     
     def delete_project(self, project_id: str) -> None:
         """Delete a project."""
-        return self._request("DELETE", f"projects/{project_id}", api_version=2)
+        return self._request("DELETE", f"projects/{project_id}", api_version=2,
+                             entity=("project", project_id))
     
     def get_tasks(self, project_id: Optional[str] = None, limit: Optional[int] = None,
-                  cursor: Optional[str] = None, **filters) -> Dict[str, Any]:
+                  cursor: Optional[str] = None, use_cache: bool = True, **filters) -> Dict[str, Any]:
         """Get tasks with pagination support."""
         params = self._build_params(
             project_id=project_id, limit=limit, cursor=cursor, **filters
         )
-        return self._request("GET", "tasks", params=params)
+        return self._request("GET", "tasks", params=params, use_cache=use_cache)
     
     def get_task(self, task_id: str) -> Dict[str, Any]:
         """Get a single task."""
-        return self._request("GET", f"tasks/{task_id}")
+        return self._request("GET", f"tasks/{task_id}", entity=("task", task_id))
     
     def add_task(self, content: str, **kwargs) -> Dict[str, Any]:
         """Create a new task."""
@@ -105,7 +284,12 @@ class TodoistV1Client:
     def update_task(self, task_id: str, **kwargs) -> Dict[str, Any]:
         """Update an existing task."""
         data = self._build_params(**kwargs)
-        return self._request("POST", f"tasks/{task_id}", json=data)
+        return self._request("POST", f"tasks/{task_id}", json=data, entity=("task", task_id))
+    
+    def sync(self, sync_token: str = "*", resource_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Read changes since ``sync_token`` ("*" for a full sync) via the Sync API."""
+        data = {"sync_token": sync_token, "resource_types": resource_types or ["all"]}
+        return self._request("POST", "sync", json=data)
     
     def get_comments(self, task_id: Optional[str] = None, project_id: Optional[str] = None,
                     limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
@@ -124,16 +308,17 @@ class TodoistV1Client:
     
     def get_comment(self, comment_id: str) -> Dict[str, Any]:
         """Get a single comment."""
-        return self._request("GET", f"comments/{comment_id}")
+        return self._request("GET", f"comments/{comment_id}", entity=("comment", comment_id))
     
     def update_comment(self, comment_id: str, content: str) -> Dict[str, Any]:
         """Update an existing comment."""
         data = self._build_params(content=content)
-        return self._request("POST", f"comments/{comment_id}", json=data)
+        return self._request("POST", f"comments/{comment_id}", json=data,
+                             entity=("comment", comment_id))
     
     def delete_comment(self, comment_id: str) -> None:
         """Delete a comment."""
-        return self._request("DELETE", f"comments/{comment_id}")
+        return self._request("DELETE", f"comments/{comment_id}", entity=("comment", comment_id))
     
     def move_task(self, task_id: str, project_id: Optional[str] = None,
                   section_id: Optional[str] = None, parent_id: Optional[str] = None) -> Dict[str, Any]:
@@ -142,7 +327,8 @@ class TodoistV1Client:
         data = self._build_params(
             project_id=project_id, section_id=section_id, parent_id=parent_id
         )
-        return self._request("POST", f"tasks/{task_id}/move", json=data)
+        return self._request("POST", f"tasks/{task_id}/move", json=data,
+                             entity=("task", task_id))
     
     def get_sections(self, project_id: str, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get sections for a project with pagination support."""
@@ -151,7 +337,7 @@ class TodoistV1Client:
     
     def get_section(self, section_id: str) -> Dict[str, Any]:
         """Get a single section by ID."""
-        return self._request("GET", f"sections/{section_id}")
+        return self._request("GET", f"sections/{section_id}", entity=("section", section_id))
     
     def add_section(self, project_id: str, name: str, order: Optional[int] = None) -> Dict[str, Any]:
         """Create a new section."""
@@ -163,27 +349,74 @@ class TodoistV1Client:
         if not name:
             raise ValueError("Section name cannot be empty")
         data = {"name": name}
-        return self._request("POST", f"sections/{section_id}", json=data)
+        return self._request("POST", f"sections/{section_id}", json=data,
+                             entity=("section", section_id))
     
     def delete_section(self, section_id: str) -> None:
         """Delete a section."""
-        return self._request("DELETE", f"sections/{section_id}")
+        return self._request("DELETE", f"sections/{section_id}", entity=("section", section_id))
     
     def move_section(self, section_id: str, order: int) -> None:
         """Move a section to a new order position."""
         if order < 0:
             raise ValueError("Order must be a positive integer")
         data = {"order": order}
-        return self._request("POST", f"sections/{section_id}/move", json=data)
+        return self._request("POST", f"sections/{section_id}/move", json=data,
+                             entity=("section", section_id))
     
     def get_labels(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get labels with pagination support."""
         params = self._build_params(limit=limit, cursor=cursor)
-        return self._request("GET", "labels", params=params)
+        result = self._request("GET", "labels", params=params)
+        if isinstance(result, dict):
+            self.labels.update(result.get("results") or [])
+        return result
+    
+    def load_labels(self) -> None:
+        """Read all personal labels into the label index."""
+        labels = []
+        cursor = None
+        while True:
+            page = self.get_labels(limit=200, cursor=cursor) or {}
+            labels.extend(page.get("results") or [])
+            cursor = page.get("next_cursor")
+            if not cursor:
+                break
+        self.labels.load(labels)
+        self._labels_loaded = time.monotonic()
+    
+    def _resolve_labels(self, values: List[str], lookup) -> List[Optional[str]]:
+        resolved = [lookup(value) for value in values]
+        if None not in resolved:
+            return resolved
+        # Unknown names or IDs: the label may be new, so reload unless a
+        # listing was just read (shared labels never resolve)
+        with self._labels_lock:
+            loaded = self._labels_loaded
+            if loaded is None or time.monotonic() - loaded >= self.LABEL_RELOAD_INTERVAL:
+                self.load_labels()
+        return [lookup(value) for value in values]
+    
+    def resolve_label_names(self, values: List[str]) -> List[str]:
+        """Translate label names (any case) or IDs to label names.
+        
+        Values that match no personal label are kept as given, since
+        shared labels have names but no personal label ID.
+        """
+        resolved = self._resolve_labels(values, self.labels.name_for)
+        return [name or value for name, value in zip(resolved, values)]
+    
+    def resolve_label_ids(self, values: List[str]) -> List[str]:
+        """Translate label names (any case) or IDs to label IDs."""
+        resolved = self._resolve_labels(values, self.labels.id_for)
+        unknown = [value for label_id, value in zip(resolved, values) if label_id is None]
+        if unknown:
+            raise ValueError(f"Unknown label(s): {', '.join(unknown)}")
+        return resolved
     
     def get_label(self, label_id: str) -> Dict[str, Any]:
         """Get a single label by ID."""
-        return self._request("GET", f"labels/{label_id}")
+        return self._request("GET", f"labels/{label_id}", entity=("label", label_id))
     
     def add_label(self, name: str, color: Optional[str] = None, order: Optional[int] = None) -> Dict[str, Any]:
         """Create a new label."""
@@ -193,11 +426,11 @@ class TodoistV1Client:
     def update_label(self, label_id: str, **kwargs) -> Dict[str, Any]:
         """Update an existing label."""
         data = self._build_params(**kwargs)
-        return self._request("POST", f"labels/{label_id}", json=data)
+        return self._request("POST", f"labels/{label_id}", json=data, entity=("label", label_id))
     
     def delete_label(self, label_id: str) -> None:
         """Delete a label."""
-        return self._request("DELETE", f"labels/{label_id}")
+        return self._request("DELETE", f"labels/{label_id}", entity=("label", label_id))
     
     def batch_move_tasks(self, task_ids: List[str], project_id: Optional[str] = None,
                         section_id: Optional[str] = None) -> Dict[str, Any]:
@@ -214,6 +447,7 @@ class TodoistV1Client:
         
         for task_id in task_ids:
             try:
+                self.negative_cache.check("task", task_id)
                 self.move_task(task_id, project_id=project_id, section_id=section_id)
                 moved.append(task_id)
             except Exception as e:
@@ -221,9 +455,25 @@ class TodoistV1Client:
         
         return {"moved": moved, "failed": failed}
     
+    def get_tasks_by_ids(self, task_ids: List[str], use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Fetch active tasks by ID in bulk, keyed by task ID."""
+        tasks = {}
+        cursor = None
+        while True:
+            page = self.get_tasks(ids=",".join(task_ids), limit=200, cursor=cursor, use_cache=use_cache)
+            for task in page.get("results", []):
+                tasks[task["id"]] = task
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return tasks
+    
     def batch_update_labels(self, task_ids: List[str], add_labels: Optional[List[str]] = None,
                            remove_labels: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Batch update labels for multiple tasks."""
+        """Batch update labels for multiple tasks.
+        
+        Current labels are resolved with one bulk read; only tasks whose
+        label set actually changes are written.
+        """
         if not task_ids:
             raise ValueError("Task list cannot be empty")
         if len(task_ids) > 100:
@@ -231,31 +481,52 @@ class TodoistV1Client:
         if not add_labels and not remove_labels:
             raise ValueError("Must specify either add_labels or remove_labels")
         
+        to_add = list(dict.fromkeys(add_labels or []))
+        to_remove = set(remove_labels or [])
+        
         updated = []
+        unchanged = []
         failed = []
         
-        for task_id in task_ids:
+        pending = []
+        for task_id in dict.fromkeys(task_ids):
+            if self.negative_cache.get("task", task_id) is not None:
+                failed.append({"task_id": task_id, "error": "Task not found"})
+            else:
+                pending.append(task_id)
+        
+        try:
+            # Read current labels upstream: a cached read could undo concurrent edits
+            current = self.get_tasks_by_ids(pending, use_cache=False) if pending else {}
+        except Exception as e:
+            failed.extend({"task_id": task_id, "error": str(e)} for task_id in pending)
+            return {"updated": updated, "unchanged": unchanged, "failed": failed}
+        
+        for task_id in pending:
+            task = current.get(task_id)
+            if task is None:
+                # Remember it like a per-task 404 so later batches skip it
+                self.negative_cache.add("task", task_id, self._not_found(f"tasks/{task_id}"))
+                failed.append({"task_id": task_id, "error": "Task not found"})
+                continue
+            
+            current_labels = task.get("labels", [])
+            existing = set(current_labels)
+            new_labels = [
+                label for label in current_labels + [l for l in to_add if l not in existing]
+                if label not in to_remove
+            ]
+            if set(new_labels) == existing:
+                unchanged.append(task_id)
+                continue
+            
             try:
-                # Get current task to preserve/modify labels
-                task = self.get_task(task_id)
-                current_labels = task.get("labels", [])
-                
-                # Apply label changes
-                new_labels = current_labels.copy()
-                if add_labels:
-                    for label in add_labels:
-                        if label not in new_labels:
-                            new_labels.append(label)
-                if remove_labels:
-                    new_labels = [l for l in new_labels if l not in remove_labels]
-                
-                # Update task with new labels
                 self.update_task(task_id, labels=new_labels)
                 updated.append(task_id)
             except Exception as e:
                 failed.append({"task_id": task_id, "error": str(e)})
         
-        return {"updated": updated, "failed": failed}
+        return {"updated": updated, "unchanged": unchanged, "failed": failed}
     
     def batch_update_tasks(self, task_ids: List[str], **kwargs) -> Dict[str, Any]:
         """Batch update multiple tasks with same properties."""
@@ -271,6 +542,7 @@ class TodoistV1Client:
         
         for task_id in task_ids:
             try:
+                self.negative_cache.check("task", task_id)
                 self.update_task(task_id, **kwargs)
                 updated.append(task_id)
             except Exception as e:
@@ -290,8 +562,9 @@ class TodoistV1Client:
         
         for task_id in task_ids:
             try:
+                self.negative_cache.check("task", task_id)
                 # Complete task by closing it
-                self._request("POST", f"tasks/{task_id}/close")
+                self._request("POST", f"tasks/{task_id}/close", entity=("task", task_id))
                 completed.append(task_id)
             except Exception as e:
                 error_msg = str(e)
@@ -303,7 +576,20 @@ class TodoistV1Client:
         
         return {"completed": completed, "failed": failed}
     
-
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Response cache statistics plus negative cache size."""
+        stats = self.cache.stats()
+        stats["negative_entries"] = len(self.negative_cache)
+        return stats
+    
+    def scheduler_stats(self) -> Dict[str, Any]:
+        """In-flight requests and per-priority queueing of upstream requests."""
+        return self.scheduler.stats()
+    
     def close(self):
         """Close the HTTP client."""
-        self.client.close()
+        if self._client is not None:
+            self._client.close()
+        if isinstance(self.cache, SharedResponseCache):
+            self.cache.close()
@@ -0,0 +1,133 @@
+"""Response size budgets and continuation handles for list results."""
+
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+def json_size(value: Any) -> int:
+    """Bytes of ``value`` as compact UTF-8 JSON."""
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode())
+
+
+def _tighter(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+class ResponseBudget(NamedTuple):
+    """Largest list response to return at once; None means unlimited."""
+    
+    max_bytes: Optional[int] = None
+    max_items: Optional[int] = None
+    
+    @property
+    def unlimited(self) -> bool:
+        return self.max_bytes is None and self.max_items is None
+    
+    def merge(self, max_bytes: Optional[int] = None, max_items: Optional[int] = None) -> "ResponseBudget":
+        """Combine with per-call limits; the tighter limit wins."""
+        for value in (max_bytes, max_items):
+            if value is not None and value < 1:
+                raise ValueError("Response budget limits must be at least 1")
+        return ResponseBudget(_tighter(self.max_bytes, max_bytes), _tighter(self.max_items, max_items))
+    
+    def fit(self, items: List[Any], size: Callable[[Any], int]) -> int:
+        """How many leading ``items`` fit; always at least one so callers make progress."""
+        count = 0
+        used = 2  # Enclosing brackets
+        for item in items:
+            if self.max_items is not None and count >= self.max_items:
+                break
+            cost = size(item) + (1 if count else 0)
+            if self.max_bytes is not None and count and used + cost > self.max_bytes:
+                break
+            used += cost
+            count += 1
+        return count
+
+
+class Continuation(NamedTuple):
+    """The unreturned rest of a truncated list response."""
+    
+    result: Dict[str, Any]  # List response holding the remaining ``results``
+    state: Dict[str, Any]  # How the response is rendered (e.g. format, fields)
+
+
+class Continuations:
+    """Remainders of truncated list responses, handed out by opaque handle.
+    
+    The items an upstream page already returned are kept here, so resuming
+    never re-reads upstream; the page's own ``next_cursor`` comes back with
+    the last piece. Handles are single use and expire after ``ttl`` seconds;
+    at most ``max_entries`` are kept, oldest first out.
+    """
+    
+    def __init__(self, max_entries: int = 128, ttl: float = 900.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            handle, (created, _) = next(iter(self._entries.items()))
+            if now - created < self.ttl:
+                break
+            del self._entries[handle]
+    
+    def save(self, continuation: Continuation) -> str:
+        handle = secrets.token_urlsafe(12)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._entries[handle] = (now, continuation)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+    
+    def take(self, handle: str, **state: Any) -> Continuation:
+        """Remove and return the continuation for ``handle``.
+        
+        Keyword arguments must match the continuation's saved state (e.g. its
+        ``tenant``); a handle that does not match is left in place and
+        reported as unknown.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._entries.get(handle)
+            if entry is not None and all(entry[1].state.get(key) == value for key, value in state.items()):
+                del self._entries[handle]
+            else:
+                entry = None
+        if entry is None:
+            raise ValueError(f"Unknown or expired continuation handle: {handle}")
+        return entry[1]
+    
+    def cut(self, result: Any, budget: ResponseBudget, size: Callable[[Any], int] = json_size,
+            state: Optional[Dict[str, Any]] = None) -> Any:
+        """Return the part of a list response that fits ``budget``.
+        
+        When items are left over, the response carries a ``continuation``
+        handle and the number of ``remaining`` items instead of its
+        ``next_cursor``.
+        """
+        if budget.unlimited or not (isinstance(result, dict) and isinstance(result.get("results"), list)):
+            return result
+        items = result["results"]
+        count = budget.fit(items, size)
+        if count >= len(items):
+            return result
+        handle = self.save(Continuation(dict(result, results=items[count:]), dict(state or {})))
+        page = {key: value for key, value in result.items() if key not in ("results", "next_cursor")}
+        page.update(results=items[:count], continuation=handle, remaining=len(items) - count)
+        return page
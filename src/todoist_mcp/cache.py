@@ -0,0 +1,526 @@
+"""Client-side caches for the Todoist API client."""
+
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+import httpx
+
+if TYPE_CHECKING:
+    # Imported on first use; only multi-process deployments share a cache
+    import sqlite3
+
+
+NEGATIVE_STATUSES = (403, 404)
+
+# A write may be forbidden on an entity the user can still read
+WRITE_NEGATIVE_STATUSES = (404,)
+
+
+class NegativeCache:
+    """Short-lived record of entities the API reported as missing or forbidden.
+    
+    Entries are keyed by ``(entity_type, entity_id)`` and hold the original
+    ``httpx.HTTPStatusError`` so that cached lookups fail with the same error
+    the API returned, without another round trip.
+    """
+    
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, httpx.HTTPStatusError]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def add(self, entity_type: str, entity_id: str, error: httpx.HTTPStatusError) -> None:
+        """Remember that an entity lookup failed with a 403/404 error."""
+        if self.ttl <= 0:
+            return
+        key = (entity_type, entity_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, error)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get(self, entity_type: str, entity_id: str) -> Optional[httpx.HTTPStatusError]:
+        """Return the cached error for an entity, if still fresh."""
+        key = (entity_type, entity_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, error = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            return error
+    
+    def check(self, entity_type: str, entity_id: str) -> None:
+        """Raise the cached error for an entity, if any."""
+        error = self.get(entity_type, entity_id)
+        if error is not None:
+            raise httpx.HTTPStatusError(str(error), request=error.request, response=error.response)
+    
+    def discard(self, entity_type: str, entity_id: str) -> None:
+        """Forget an entity, e.g. after a write or sync event touched it."""
+        with self._lock:
+            self._entries.pop((entity_type, entity_id), None)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Entity types whose cached reads a write to the given type may invalidate.
+INVALIDATES = {
+    "tasks": ("tasks",),
+    "comments": ("comments", "tasks"),
+    "sections": ("sections", "tasks"),
+    "labels": ("labels", "tasks"),
+    "projects": ("projects", "sections", "tasks", "comments"),
+}
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory footprint of a decoded JSON value in bytes."""
+    try:
+        return len(json.dumps(value, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class ResponseCache:
+    """Memory-budgeted cache of GET responses.
+    
+    Entries are kept in recency order and accounted by estimated byte size.
+    When the total exceeds ``max_bytes``, the largest of the least recently
+    used entries is evicted first. Hits, misses, byte usage and evictions
+    are tracked per entity type (the first path segment of the endpoint).
+    
+    Cached values are shared between callers and must be treated as
+    read-only.
+    
+    Every invalidation bumps a generation counter per entity type. A read
+    that notes :meth:`generation` before going upstream passes it to
+    :meth:`put`, which then drops the value if a write invalidated the
+    type in the meantime.
+    """
+    
+    EVICTION_SAMPLE = 8
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 30.0,
+                 max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self._entries: "OrderedDict[Hashable, Tuple[str, float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def generation(self, entity_type: str) -> int:
+        """Number of invalidations of ``entity_type`` so far."""
+        with self._lock:
+            return self._generations.get(entity_type, 0)
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+    
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None,
+                 api_version: int = 1) -> Hashable:
+        """Build a cache key for a GET request."""
+        return (api_version, endpoint, json.dumps(params or {}, sort_keys=True, default=str))
+    
+    @staticmethod
+    def entity_type(endpoint: str) -> str:
+        """Entity type an endpoint belongs to, e.g. ``tasks/abc`` -> ``tasks``."""
+        return endpoint.split("/", 1)[0]
+    
+    def _counter(self, entity_type: str) -> Dict[str, int]:
+        counter = self._stats.get(entity_type)
+        if counter is None:
+            counter = self._stats[entity_type] = {
+                "hits": 0, "misses": 0, "evictions": 0, "bytes": 0, "entries": 0
+            }
+        return counter
+    
+    def get(self, key: Hashable, entity_type: str, default: Any = _MISSING) -> Any:
+        """Return a fresh cached value, or ``default`` on a miss."""
+        with self._lock:
+            counter = self._counter(entity_type)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                counter["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            counter["hits"] += 1
+            return entry[3]
+    
+    def contains(self, key: Hashable) -> bool:
+        """Whether a fresh entry exists, without touching statistics."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[1] > time.monotonic()
+    
+    def put(self, key: Hashable, entity_type: str, value: Any, size: Optional[int] = None,
+            generation: Optional[int] = None) -> bool:
+        """Store a value; returns False if it was too large or stale to cache.
+        
+        ``generation`` is the entity type's :meth:`generation` when the value
+        was read; if the type has been invalidated since, nothing is stored.
+        """
+        if not self.enabled:
+            return False
+        if size is None:
+            size = estimate_size(value)
+        size += sys.getsizeof(key)
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            if generation is not None and self._generations.get(entity_type, 0) != generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (entity_type, time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            counter = self._counter(entity_type)
+            counter["bytes"] += size
+            counter["entries"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                self._evict_one()
+        return True
+    
+    def _remove(self, key: Hashable) -> None:
+        entity_type, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        counter = self._counter(entity_type)
+        counter["bytes"] -= size
+        counter["entries"] -= 1
+    
+    def _evict_one(self) -> None:
+        """Evict the largest entry among the least recently used ones."""
+        candidates = []
+        for key, entry in self._entries.items():
+            candidates.append((entry[2], key))
+            if len(candidates) >= self.EVICTION_SAMPLE:
+                break
+        _, victim = max(candidates, key=lambda item: item[0])
+        entity_type = self._entries[victim][0]
+        self._remove(victim)
+        self._counter(entity_type)["evictions"] += 1
+    
+    def invalidate(self, *entity_types: str) -> int:
+        """Drop all entries of the given entity types; returns count dropped."""
+        types = set(entity_types)
+        with self._lock:
+            for entity_type in types:
+                self._generations[entity_type] = self._generations.get(entity_type, 0) + 1
+            stale = [key for key, entry in self._entries.items() if entry[0] in types]
+            for key in stale:
+                self._remove(key)
+        return len(stale)
+    
+    def invalidate_for_write(self, endpoint: str) -> int:
+        """Drop entries a write to ``endpoint`` may have made stale."""
+        entity_type = self.entity_type(endpoint)
+        return self.invalidate(*INVALIDATES.get(entity_type, (entity_type,)))
+    
+    def clear(self) -> None:
+        """Drop all entries, keeping statistics."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, byte usage and eviction counts, overall and per entity type."""
+        with self._lock:
+            by_entity = {}
+            for entity_type, counter in sorted(self._stats.items()):
+                lookups = counter["hits"] + counter["misses"]
+                by_entity[entity_type] = dict(
+                    counter, hit_ratio=counter["hits"] / lookups if lookups else 0.0
+                )
+            hits = sum(c["hits"] for c in self._stats.values())
+            lookups = hits + sum(c["misses"] for c in self._stats.values())
+            return {
+                "backend": "memory",
+                "max_bytes": self.max_bytes,
+                "bytes": self._bytes,
+                "entries": len(self._entries),
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "evictions": sum(c["evictions"] for c in self._stats.values()),
+                "by_entity": by_entity,
+            }
+
+
+class SharedResponseCache:
+    """Response cache shared by all server processes on a host.
+    
+    Backed by a SQLite database in WAL mode so several ``todoist-mcp``
+    workers can read and write it concurrently. Invalidation deletes rows,
+    so a write seen by one process is visible to every other process on its
+    next lookup. Entries are namespaced (e.g. per API token) and the same
+    byte budget and size/recency eviction as :class:`ResponseCache` apply
+    to the whole file. Statistics for hits, misses and evictions are local
+    to the process; byte usage is read from the shared file. Invalidation
+    generations are kept in the file too, so a read that started before a
+    write in any process is not stored after it.
+    """
+    
+    EVICTION_SAMPLE = ResponseCache.EVICTION_SAMPLE
+    
+    make_key = staticmethod(ResponseCache.make_key)
+    entity_type = staticmethod(ResponseCache.entity_type)
+    
+    def __init__(self, path: str, namespace: str = "default",
+                 max_bytes: int = 256 * 1024 * 1024, ttl: float = 30.0,
+                 max_entry_bytes: Optional[int] = None, busy_timeout: float = 5.0):
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach them all
+        self._connections: List["sqlite3.Connection"] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, entity TEXT NOT NULL,"
+                " value TEXT NOT NULL, size INTEGER NOT NULL, expires REAL NOT NULL,"
+                " accessed REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_entity ON entries (namespace, entity)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS generations ("
+                " namespace TEXT NOT NULL, entity TEXT NOT NULL, generation INTEGER NOT NULL,"
+                " PRIMARY KEY (namespace, entity))"
+            )
+    
+    def _connection(self) -> "sqlite3.Connection":
+        """Per-thread connection; sqlite3 connections are not shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            import sqlite3
+            # Used only by this thread; close() may close it from another
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+    
+    def _counter(self, entity_type: str) -> Dict[str, int]:
+        counter = self._stats.get(entity_type)
+        if counter is None:
+            counter = self._stats[entity_type] = {"hits": 0, "misses": 0, "evictions": 0}
+        return counter
+    
+    def _count(self, entity_type: str, field: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._counter(entity_type)[field] += amount
+    
+    @staticmethod
+    def _encode_key(key: Hashable) -> str:
+        return json.dumps(key)
+    
+    def __len__(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return row[0]
+    
+    def get(self, key: Hashable, entity_type: str, default: Any = _MISSING) -> Any:
+        """Return a fresh cached value, or ``default`` on a miss."""
+        now = time.time()
+        encoded = self._encode_key(key)
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT value, expires FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, encoded),
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    conn.execute(
+                        "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                        (self.namespace, encoded),
+                    )
+                self._count(entity_type, "misses")
+                return default
+            conn.execute(
+                "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, encoded),
+            )
+        self._count(entity_type, "hits")
+        return json.loads(row[0])
+    
+    def contains(self, key: Hashable) -> bool:
+        """Whether a fresh entry exists, without touching statistics."""
+        row = self._connection().execute(
+            "SELECT expires FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, self._encode_key(key)),
+        ).fetchone()
+        return row is not None and row[0] > time.time()
+    
+    def generation(self, entity_type: str) -> int:
+        """Number of invalidations of ``entity_type`` so far, in any process."""
+        row = self._connection().execute(
+            "SELECT generation FROM generations WHERE namespace = ? AND entity = ?",
+            (self.namespace, entity_type),
+        ).fetchone()
+        return row[0] if row is not None else 0
+    
+    def put(self, key: Hashable, entity_type: str, value: Any, size: Optional[int] = None,
+            generation: Optional[int] = None) -> bool:
+        """Store a value; returns False if it was too large or stale to cache.
+        
+        ``generation`` is the entity type's :meth:`generation` when the value
+        was read; if the type has been invalidated since, nothing is stored.
+        """
+        if not self.enabled:
+            return False
+        text = json.dumps(value, separators=(",", ":"))
+        size = len(text)
+        if size > self.max_entry_bytes:
+            return False
+        now = time.time()
+        row = (self.namespace, self._encode_key(key), entity_type, text, size, now + self.ttl, now)
+        with self._connection() as conn:
+            if generation is None:
+                cursor = conn.execute(
+                    "INSERT OR REPLACE INTO entries"
+                    " (namespace, key, entity, value, size, expires, accessed)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+            else:
+                # One statement, so the check and the insert cannot straddle an invalidation
+                cursor = conn.execute(
+                    "INSERT OR REPLACE INTO entries"
+                    " (namespace, key, entity, value, size, expires, accessed)"
+                    " SELECT ?, ?, ?, ?, ?, ?, ? WHERE COALESCE((SELECT generation FROM generations"
+                    " WHERE namespace = ? AND entity = ?), 0) = ?",
+                    (*row, self.namespace, entity_type, generation),
+                )
+            if not cursor.rowcount:
+                return False
+            self._enforce_budget(conn)
+        return True
+    
+    def _enforce_budget(self, conn: "sqlite3.Connection") -> None:
+        """Evict the largest of the least recently used rows until under budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        while total > self.max_bytes:
+            candidates = conn.execute(
+                "SELECT namespace, key, entity, size FROM entries ORDER BY accessed LIMIT ?",
+                (self.EVICTION_SAMPLE,),
+            ).fetchall()
+            if not candidates:
+                return
+            namespace, key, entity_type, size = max(candidates, key=lambda row: row[3])
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            total -= size
+            if namespace == self.namespace:
+                self._count(entity_type, "evictions")
+    
+    def invalidate(self, *entity_types: str) -> int:
+        """Drop entries of the given entity types in every process."""
+        if not entity_types:
+            return 0
+        placeholders = ",".join("?" for _ in entity_types)
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO generations (namespace, entity, generation) VALUES (?, ?, 1)"
+                " ON CONFLICT (namespace, entity) DO UPDATE SET generation = generation + 1",
+                [(self.namespace, entity_type) for entity_type in entity_types],
+            )
+            cursor = conn.execute(
+                f"DELETE FROM entries WHERE namespace = ? AND entity IN ({placeholders})",
+                (self.namespace, *entity_types),
+            )
+        return cursor.rowcount
+    
+    def invalidate_for_write(self, endpoint: str) -> int:
+        """Drop entries a write to ``endpoint`` may have made stale."""
+        entity_type = self.entity_type(endpoint)
+        return self.invalidate(*INVALIDATES.get(entity_type, (entity_type,)))
+    
+    def clear(self) -> None:
+        """Drop all entries in this namespace."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and evictions for this process, byte usage of the shared file."""
+        rows = self._connection().execute(
+            "SELECT entity, COALESCE(SUM(size), 0), COUNT(*) FROM entries"
+            " WHERE namespace = ? GROUP BY entity",
+            (self.namespace,),
+        ).fetchall()
+        usage = {entity: (size, count) for entity, size, count in rows}
+        with self._stats_lock:
+            counters = {entity: dict(counter) for entity, counter in self._stats.items()}
+        by_entity = {}
+        for entity_type in sorted(set(usage) | set(counters)):
+            counter = counters.get(entity_type, {"hits": 0, "misses": 0, "evictions": 0})
+            size, count = usage.get(entity_type, (0, 0))
+            lookups = counter["hits"] + counter["misses"]
+            by_entity[entity_type] = dict(
+                counter, bytes=size, entries=count,
+                hit_ratio=counter["hits"] / lookups if lookups else 0.0,
+            )
+        hits = sum(c["hits"] for c in counters.values())
+        lookups = hits + sum(c["misses"] for c in counters.values())
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "max_bytes": self.max_bytes,
+            "bytes": sum(size for size, _ in usage.values()),
+            "entries": sum(count for _, count in usage.values()),
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": sum(c["evictions"] for c in counters.values()),
+            "by_entity": by_entity,
+        }
+    
+    def close(self) -> None:
+        """Close the connections of all threads; later use opens new ones."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
@@ -0,0 +1,166 @@
+"""Argument coercion for tool parameters that arrive as JSON strings."""
+
+import functools
+import inspect
+import json
+import typing
+from typing import Any, Callable, Dict, List, Optional
+
+# Todoist accepts at most 100 commands per batch
+MAX_BATCH = 100
+
+
+def _json_or_text(name: str, value: str) -> Any:
+    text = value.strip()
+    if text[:1] in "[{\"":
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{name}: invalid JSON ({exc.msg})") from None
+    return value
+
+
+def string_list(single_fallback: bool = True) -> Callable[[str, Any], Optional[List[str]]]:
+    """A list of strings from a JSON list, a list, or (with ``single_fallback``) one bare string."""
+    def coerce(name: str, value: Any) -> Optional[List[str]]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, str):
+            parsed = _json_or_text(name, value)
+            if isinstance(parsed, str):
+                if not single_fallback:
+                    raise ValueError(f"{name}: expected a JSON list like '[\"a\", \"b\"]'")
+                parsed = [parsed]
+            value = parsed
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"{name}: expected a list")
+        items = []
+        for item in value:
+            if isinstance(item, bool) or not isinstance(item, (str, int)) or not str(item).strip():
+                raise ValueError(f"{name}: entries must be non-empty strings, got {item!r}")
+            items.append(str(item).strip())
+        return items
+    return coerce
+
+
+def id_list(max_items: Optional[int] = None, required: bool = False) -> Callable[[str, Any], Optional[List[str]]]:
+    """A de-duplicated list of IDs, optionally bounded and required to be non-empty."""
+    parse = string_list()
+    
+    def coerce(name: str, value: Any) -> Optional[List[str]]:
+        ids = parse(name, value)
+        if ids is None and not required:
+            return None
+        ids = list(dict.fromkeys(ids or ()))
+        if required and not ids:
+            raise ValueError(f"{name}: list cannot be empty")
+        if max_items is not None and len(ids) > max_items:
+            raise ValueError(f"{name}: at most {max_items} IDs allowed, got {len(ids)}")
+        return ids
+    return coerce
+
+
+def json_object(name: str, value: Any) -> Optional[Dict[str, Any]]:
+    """A dict from a JSON object string or a dict."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = _json_or_text(name, value)
+    if not isinstance(value, dict):
+        raise ValueError(f"{name}: expected a JSON object")
+    return value
+
+
+def integer(name: str, value: Any) -> Optional[int]:
+    """An int from an int, an integral float or a numeric string."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{name}: expected an integer, got {value!r}")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f"{name}: expected an integer, got {value!r}")
+
+
+def identifier(name: str, value: Any) -> Optional[str]:
+    """An ID string: numbers are converted, whitespace is stripped."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f"{name}: expected an ID, got {value!r}")
+    text = str(value).strip()
+    return text or None
+
+
+# Coercion by parameter name; shared by every tool that uses these names
+RULES: Dict[str, Callable[[str, Any], Any]] = {
+    "task_ids": id_list(max_items=MAX_BATCH, required=True),
+    "project_ids": id_list(),
+    "labels": string_list(),
+    "label_ids": string_list(),
+    "add_labels": string_list(),
+    "remove_labels": string_list(),
+    "names": string_list(),
+    "types": string_list(),
+    "weights": json_object,
+}
+
+
+def _is_int(annotation: Any) -> bool:
+    if annotation is int:
+        return True
+    return typing.get_origin(annotation) is typing.Union and int in typing.get_args(annotation)
+
+
+class ArgumentCoercion:
+    """Per-tool argument coercers, compiled once from the tool's signature.
+    
+    Parameters named in :data:`RULES` get that rule; other ``int``
+    parameters are parsed as integers and ``str`` parameters ending in
+    ``_id`` are normalized as IDs. Invalid arguments raise ``ValueError``
+    before the tool body runs.
+    """
+    
+    def __init__(self, fn: Callable[..., Any], rules: Optional[Dict[str, Callable[[str, Any], Any]]] = None):
+        rules = RULES if rules is None else rules
+        self.signature = inspect.signature(fn)
+        hints = typing.get_type_hints(fn)
+        self.coercers: Dict[str, Callable[[str, Any], Any]] = {}
+        for name in self.signature.parameters:
+            annotation = hints.get(name)
+            if name in rules:
+                self.coercers[name] = rules[name]
+            elif _is_int(annotation):
+                self.coercers[name] = integer
+            elif name.endswith("_id") and annotation in (str, Optional[str]):
+                self.coercers[name] = identifier
+    
+    def __bool__(self) -> bool:
+        return bool(self.coercers)
+    
+    def __call__(self, args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Bind a call's arguments and return them coerced, by name."""
+        arguments = self.signature.bind_partial(*args, **kwargs).arguments if args else dict(kwargs)
+        for name, coerce in self.coercers.items():
+            if name in arguments:
+                arguments[name] = coerce(name, arguments[name])
+        return arguments
+
+
+def coercing(fn: Callable[..., Any], rules: Optional[Dict[str, Callable[[str, Any], Any]]] = None) -> Callable[..., Any]:
+    """Wrap ``fn`` so its arguments are coerced first; ``fn`` itself if nothing applies."""
+    coercion = ArgumentCoercion(fn, rules)
+    if not coercion:
+        return fn
+    
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        return fn(**coercion(args, kwargs))
+    return call
@@ -0,0 +1,258 @@
+"""Local full-text index over task and project comments."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .api_v1 import ChangeEvent
+from .cache import estimate_size
+from .scheduler import BULK, priority
+from .search import InvertedIndex
+
+Owner = Tuple[str, str]  # ("task" | "project", ID)
+
+
+def comment_owner(comment: Dict[str, Any]) -> Optional[Owner]:
+    """The task or project a comment belongs to."""
+    if comment.get("task_id"):
+        return ("task", comment["task_id"])
+    if comment.get("project_id"):
+        return ("project", comment["project_id"])
+    return None
+
+
+class CommentIndex:
+    """Inverted index over comment content, ingested per project.
+    
+    :meth:`ingest` lists a project's tasks and re-fetches comments only for
+    tasks whose ``note_count`` differs from the count seen at the previous
+    ingest; project comments are read with one request per project.
+    Comments added, updated or deleted through the client are applied from
+    its change events without any refetch.
+    
+    Given the task ``store``, tasks are not listed at all: the store's sync
+    changes mark the tasks whose ``note_count`` moved, and only those are
+    re-fetched. Project comments, which sync does not count, are still
+    re-read once ``max_age`` has passed.
+    """
+    
+    def __init__(self, api: Any, max_age: float = 30.0, max_workers: int = 4, store: Any = None):
+        self.api = api
+        self.store = store
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self.index = InvertedIndex()
+        self.comments: Dict[str, Dict[str, Any]] = {}
+        # Estimated JSON size of the indexed comments
+        self.size_bytes = 0
+        self._by_owner: Dict[Owner, Set[str]] = {}
+        self._note_counts: Dict[str, int] = {}
+        self._project_tasks: Dict[str, Set[str]] = {}
+        self._ingested: Dict[str, float] = {}
+        # Store mode: project of each followed task, and tasks whose count moved
+        self._task_projects: Dict[str, str] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        api.add_listener(self.handle_event)
+        if store is not None:
+            store.add_listener(self.handle_store_change)
+    
+    def __len__(self) -> int:
+        return len(self.comments)
+    
+    # Index maintenance
+    
+    def _add(self, comment: Dict[str, Any]) -> None:
+        owner = comment_owner(comment)
+        if owner is None:
+            return
+        self._remove(comment["id"])
+        self.comments[comment["id"]] = comment
+        self.size_bytes += estimate_size(comment)
+        self._by_owner.setdefault(owner, set()).add(comment["id"])
+        self.index.add_document(comment["id"], comment.get("content") or "")
+    
+    def _remove(self, comment_id: str) -> Optional[Dict[str, Any]]:
+        comment = self.comments.pop(comment_id, None)
+        if comment is None:
+            return None
+        self.size_bytes -= estimate_size(comment)
+        owner = comment_owner(comment)
+        ids = self._by_owner.get(owner)
+        if ids is not None:
+            ids.discard(comment_id)
+            if not ids:
+                del self._by_owner[owner]
+        self.index.remove_document(comment_id)
+        return comment
+    
+    def _replace_owner(self, owner: Owner, comments: Iterable[Dict[str, Any]]) -> None:
+        for comment_id in list(self._by_owner.get(owner, ())):
+            self._remove(comment_id)
+        for comment in comments:
+            self._add(comment)
+    
+    def handle_event(self, event: ChangeEvent) -> None:
+        """Apply a comment write made through the client."""
+        if event.entity_type != "comments":
+            return
+        with self._lock:
+            if event.action == "delete":
+                comment = self._remove(event.entity_id)
+                owner = comment_owner(comment) if comment else None
+                if owner and owner[0] == "task" and owner[1] in self._note_counts:
+                    self._note_counts[owner[1]] -= 1
+            elif isinstance(event.result, dict) and event.result.get("id"):
+                is_new = event.result["id"] not in self.comments
+                self._add(event.result)
+                owner = comment_owner(event.result)
+                if is_new and owner and owner[0] == "task" and owner[1] in self._note_counts:
+                    self._note_counts[owner[1]] += 1
+    
+    def _forget_task(self, task_id: str) -> None:
+        project_id = self._task_projects.pop(task_id, None)
+        if project_id is not None:
+            self._project_tasks.get(project_id, set()).discard(task_id)
+        self._note_counts.pop(task_id, None)
+        self._dirty.discard(task_id)
+        self._replace_owner(("task", task_id), ())
+    
+    def _follow_task(self, task: Dict[str, Any], project_id: str) -> None:
+        previous = self._task_projects.get(task["id"])
+        if previous != project_id:
+            if previous is not None:
+                self._project_tasks[previous].discard(task["id"])
+            self._task_projects[task["id"]] = project_id
+            self._project_tasks[project_id].add(task["id"])
+        if task.get("note_count", 0) != self._note_counts.setdefault(task["id"], 0):
+            self._dirty.add(task["id"])
+    
+    def handle_store_change(self, collection: str, object_id: str, obj: Optional[Dict[str, Any]]) -> None:
+        """Follow tasks of ingested projects through the store's sync changes."""
+        if collection != "tasks":
+            return
+        with self._lock:
+            project_id = obj.get("project_id") if obj is not None else None
+            if project_id in self._project_tasks:
+                self._follow_task(obj, project_id)
+            elif object_id in self._task_projects:
+                # Completed, deleted or moved out of the ingested projects
+                self._forget_task(object_id)
+    
+    # Ingestion
+    
+    def _fetch_all(self, fetch, **params) -> List[Dict[str, Any]]:
+        results = []
+        cursor = None
+        while True:
+            page = fetch(limit=200, cursor=cursor, **params) or {}
+            results.extend(page.get("results", []))
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return results
+    
+    def ingest(self, project_ids: Iterable[str], force: bool = False) -> Dict[str, int]:
+        """Bring the comments of the given projects up to date.
+        
+        Projects ingested less than ``max_age`` seconds ago are skipped
+        unless ``force`` is set. Returns the number of projects and tasks
+        whose comments were fetched.
+        """
+        now = time.monotonic()
+        project_ids = list(dict.fromkeys(project_ids))
+        stale = [
+            project_id for project_id in project_ids
+            if force or now - self._ingested.get(project_id, float("-inf")) >= self.max_age
+        ]
+        if self.store is not None:
+            changed_tasks = self._changed_in_store(project_ids, force)
+        else:
+            changed_tasks = self._changed_in_listing(stale)
+        
+        owners = [("project", project_id) for project_id in stale]
+        owners.extend(("task", task_id) for task_id in changed_tasks)
+        if owners:
+            def fetch_comments(owner: Owner) -> List[Dict[str, Any]]:
+                # One request per owner; queue behind interactive calls
+                with priority(BULK):
+                    return self._fetch_all(self.api.get_comments, **{f"{owner[0]}_id": owner[1]})
+            
+            pending = set(changed_tasks)
+            try:
+                with ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix="todoist-comments") as pool:
+                    fetched = pool.map(fetch_comments, owners)
+                    for owner, comments in zip(owners, fetched):
+                        with self._lock:
+                            self._replace_owner(owner, comments)
+                            if owner[0] == "task":
+                                self._note_counts[owner[1]] = len(comments)
+                                pending.discard(owner[1])
+            except Exception:
+                if self.store is not None:
+                    # Fetch the tasks that were not replaced again on the next ingest
+                    with self._lock:
+                        self._dirty.update(task_id for task_id in pending if task_id in self._task_projects)
+                raise
+        
+        with self._lock:
+            for project_id in stale:
+                self._ingested[project_id] = now
+        return {"projects": len(stale), "tasks": len(changed_tasks)}
+    
+    def _changed_in_listing(self, project_ids: List[str]) -> List[str]:
+        """List the projects' tasks and return those whose comment count moved."""
+        changed_tasks: List[str] = []
+        for project_id in project_ids:
+            tasks = self._fetch_all(self.api.get_tasks, project_id=project_id)
+            with self._lock:
+                current = {task["id"]: task.get("note_count", 0) for task in tasks}
+                # Tasks that left the project (completed, deleted or moved)
+                for task_id in self._project_tasks.get(project_id, set()) - set(current):
+                    self._note_counts.pop(task_id, None)
+                    self._replace_owner(("task", task_id), ())
+                self._project_tasks[project_id] = set(current)
+                for task_id, count in current.items():
+                    if count != self._note_counts.setdefault(task_id, 0):
+                        changed_tasks.append(task_id)
+        return changed_tasks
+    
+    def _changed_in_store(self, project_ids: List[str], force: bool) -> List[str]:
+        """Sync the store and claim the projects' tasks whose comment count moved.
+        
+        Claimed tasks leave the dirty set so concurrent ingests do not fetch
+        them twice; :meth:`ingest` puts back any whose fetch fails.
+        """
+        store = self.store
+        store.ensure_fresh()
+        # Same lock order as the store calling handle_store_change
+        with store.lock, self._lock:
+            for project_id in project_ids:
+                if project_id not in self._project_tasks:
+                    # First ingest: follow the project's tasks from now on
+                    self._project_tasks[project_id] = set()
+                    for task in store.iter_tasks(store.by_project.get(project_id)):
+                        self._follow_task(task, project_id)
+                elif force:
+                    self._dirty.update(self._project_tasks[project_id])
+            wanted = set(project_ids)
+            changed_tasks = [task_id for task_id in self._dirty if self._task_projects.get(task_id) in wanted]
+            self._dirty.difference_update(changed_tasks)
+        return changed_tasks
+    
+    # Queries
+    
+    def search(self, query: str, limit: int = 20,
+               project_ids: Optional[Iterable[str]] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """Best ``(comment, score)`` matches, optionally limited to some projects."""
+        with self._lock:
+            candidates = None
+            if project_ids is not None:
+                candidates = set()
+                for project_id in project_ids:
+                    candidates |= self._by_owner.get(("project", project_id), set())
+                    for task_id in self._project_tasks.get(project_id, ()):
+                        candidates |= self._by_owner.get(("task", task_id), set())
+            hits = self.index.search(query, limit=limit, candidates=candidates)
+            return [(self.comments[comment_id], score) for comment_id, score in hits]
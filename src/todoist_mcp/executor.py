@@ -0,0 +1,310 @@
+"""Thread pool offload for blocking tool bodies."""
+
+import asyncio
+import contextvars
+import fnmatch
+import functools
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+DEFAULT_LIMITS = {"batch_*": 2}
+
+# Relative cost of a call in fair queueing; other tools cost 1
+DEFAULT_COSTS = {"batch_*": 4}
+
+# Sessions reported by stats() once idle; older idle sessions are forgotten
+MAX_IDLE_SESSIONS = 256
+
+# Recent waits kept per session for the p99
+WAIT_SAMPLES = 256
+
+
+class _Job:
+    __slots__ = ("run", "session", "cost", "pattern", "enqueued", "future")
+    
+    def __init__(self, run: Callable[[], Any], session: Hashable, cost: int, pattern: Optional[str]):
+        self.run = run
+        self.session = session
+        self.cost = cost
+        self.pattern = pattern
+        self.enqueued = time.monotonic()
+        self.future: Future = Future()
+
+
+class _SessionStats:
+    __slots__ = ("queued", "active", "completed", "waits", "max_wait")
+    
+    def __init__(self):
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.max_wait = 0.0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        return {
+            "queued": self.queued,
+            "active": self.active,
+            "completed": self.completed,
+            "mean_wait_ms": round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+            "p99_wait_ms": round(1000 * waits[min(len(waits) - 1, int(len(waits) * 0.99))], 1) if waits else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 1),
+        }
+
+
+class ToolExecutor:
+    """Runs blocking tool functions on a bounded thread pool.
+    
+    Tool bodies call the synchronous Todoist client and scan local indexes;
+    running them here keeps the event loop free for other sessions.
+    ``limits`` maps tool name patterns (``fnmatch`` style) to the number of
+    calls matching the pattern that may run at once, e.g. ``{"batch_*": 2}``;
+    calls over a cap stay in their session's queue without holding a worker,
+    and the dispatcher serves other sessions past them.
+    The caller's context variables are copied into the worker thread.
+    
+    Workers are shared fairly between sessions: each ``session_key()``
+    (e.g. one MCP session) has its own queue, and free workers take calls
+    from the queues by deficit round-robin. A session earns ``quantum``
+    per turn and spends each call's cost from ``costs`` (tool name
+    patterns, 1 by default), so a session flooding the server waits
+    behind its own calls instead of delaying everyone else's.
+    """
+    
+    def __init__(self, max_workers: int = 8, limits: Optional[Dict[str, int]] = None,
+                 session_key: Optional[Callable[[], Hashable]] = None,
+                 costs: Optional[Dict[str, int]] = None, quantum: int = 1):
+        self.max_workers = max_workers
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.costs = dict(DEFAULT_COSTS if costs is None else costs)
+        self.quantum = quantum
+        self.session_key = session_key
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="todoist-tool")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._by_tool: Dict[str, Dict[str, int]] = {}
+        # Fair queueing state
+        self._running = 0
+        self._queues: Dict[Hashable, Deque[_Job]] = {}
+        self._rotation: Deque[Hashable] = deque()
+        self._deficits: Dict[Hashable, int] = {}
+        self._capped_running: Dict[str, int] = {}
+        self._sessions: "OrderedDict[Hashable, _SessionStats]" = OrderedDict()
+    
+    def _limit_for(self, tool: str) -> Optional[str]:
+        for pattern in self.limits:
+            if fnmatch.fnmatchcase(tool, pattern):
+                return pattern
+        return None
+    
+    def _cost_for(self, tool: str) -> int:
+        for pattern, cost in self.costs.items():
+            if fnmatch.fnmatchcase(tool, pattern):
+                return cost
+        return 1
+    
+    def _session(self) -> Hashable:
+        if self.session_key is None:
+            return None
+        return self.session_key()
+    
+    def _session_stats(self, session: Hashable) -> _SessionStats:
+        stats = self._sessions.get(session)
+        if stats is None:
+            stats = self._sessions[session] = _SessionStats()
+        self._sessions.move_to_end(session)
+        idle = [key for key, entry in self._sessions.items() if not (entry.queued or entry.active)]
+        for key in idle[:max(0, len(idle) - MAX_IDLE_SESSIONS)]:
+            del self._sessions[key]
+        return stats
+    
+    # Fair queueing
+    
+    def _enqueue(self, job: _Job) -> None:
+        with self._lock:
+            queue = self._queues.get(job.session)
+            if queue is None:
+                queue = self._queues[job.session] = deque()
+                self._rotation.append(job.session)
+                self._deficits[job.session] = 0
+            queue.append(job)
+            self._session_stats(job.session).queued += 1
+        self._dispatch()
+    
+    def _at_cap(self, job: _Job) -> bool:
+        return job.pattern is not None and self._capped_running.get(job.pattern, 0) >= self.limits[job.pattern]
+    
+    def _next_job(self) -> Optional[_Job]:
+        """Deficit round-robin over the session queues; called with the lock held.
+        
+        Sessions whose next call is over its pattern's cap are passed over
+        without earning deficit until a call of that pattern finishes.
+        """
+        blocked = 0
+        while self._rotation:
+            session = self._rotation[0]
+            queue = self._queues[session]
+            while queue and queue[0].future.cancelled():
+                queue.popleft()
+                self._sessions[session].queued -= 1
+            if not queue:
+                # An emptied queue leaves the rotation and forfeits its deficit
+                self._rotation.popleft()
+                del self._queues[session], self._deficits[session]
+                blocked = 0
+                continue
+            if self._at_cap(queue[0]):
+                blocked += 1
+                if blocked >= len(self._rotation):
+                    return None
+                self._rotation.rotate(-1)
+                continue
+            blocked = 0
+            if self._deficits[session] >= queue[0].cost:
+                job = queue.popleft()
+                self._deficits[session] -= job.cost
+                return job
+            self._deficits[session] += self.quantum
+            self._rotation.rotate(-1)
+        return None
+    
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                if self._running >= self.max_workers:
+                    return
+                job = self._next_job()
+                if job is None:
+                    return
+                self._running += 1
+                if job.pattern is not None:
+                    self._capped_running[job.pattern] = self._capped_running.get(job.pattern, 0) + 1
+            try:
+                self._pool.submit(self._execute, job)
+            except RuntimeError:
+                # Pool shut down
+                self._finished(job)
+                job.future.cancel()
+                return
+    
+    def _finished(self, job: _Job) -> None:
+        with self._lock:
+            self._running -= 1
+            if job.pattern is not None:
+                self._capped_running[job.pattern] -= 1
+    
+    def _execute(self, job: _Job) -> None:
+        try:
+            waited = time.monotonic() - job.enqueued
+            with self._lock:
+                stats = self._session_stats(job.session)
+                stats.queued -= 1
+                if job.future.set_running_or_notify_cancel():
+                    stats.active += 1
+                    stats.waits.append(waited)
+                    stats.max_wait = max(stats.max_wait, waited)
+                else:
+                    return
+            error = None
+            try:
+                result = job.run()
+            except BaseException as exc:
+                error = exc
+            # Counted before the caller can see the result
+            with self._lock:
+                stats.active -= 1
+                stats.completed += 1
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+        finally:
+            self._finished(job)
+            self._dispatch()
+    
+    def _call(self, tool: str, call: Dict[str, bool], fn: Callable[..., Any], args, kwargs) -> Any:
+        with self._lock:
+            counts = self._by_tool[tool]
+            if not call["started"]:
+                call["started"] = True
+                counts["queued"] -= 1
+                self._queued -= 1
+            counts["active"] += 1
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                counts["active"] -= 1
+                counts["completed"] += 1
+                self._active -= 1
+    
+    async def _submit(self, tool: str, call: Dict[str, bool], session: Hashable,
+                      fn: Callable[..., Any], args, kwargs) -> Any:
+        context = contextvars.copy_context()
+        job = _Job(functools.partial(context.run, self._call, tool, call, fn, args, kwargs),
+                   session, self._cost_for(tool), self._limit_for(tool))
+        self._enqueue(job)
+        return await asyncio.wrap_future(job.future)
+    
+    async def run(self, tool: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` for ``tool`` on the pool, honouring the tool's concurrency cap."""
+        session = self._session()
+        call = {"started": False}
+        with self._lock:
+            counts = self._by_tool.setdefault(tool, {"queued": 0, "active": 0, "completed": 0})
+            counts["queued"] += 1
+            self._queued += 1
+        try:
+            return await self._submit(tool, call, session, fn, args, kwargs)
+        finally:
+            with self._lock:
+                if not call["started"]:
+                    # Cancelled before a worker picked the call up
+                    call["started"] = True
+                    counts["queued"] -= 1
+                    self._queued -= 1
+    
+    def wrap(self, tool: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """An async function with ``fn``'s signature that runs it on the pool."""
+        @functools.wraps(fn)
+        async def offloaded(*args, **kwargs):
+            return await self.run(tool, fn, *args, **kwargs)
+        return offloaded
+    
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a cap or a worker."""
+        return self._queued
+    
+    def session_queue_depth(self, session: Hashable) -> int:
+        """Calls from ``session`` waiting for a worker."""
+        with self._lock:
+            stats = self._sessions.get(session)
+            return stats.queued if stats is not None else 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "limits": dict(self.limits),
+                "active": self._active,
+                "queued": self._queued,
+                "by_tool": {tool: dict(counts) for tool, counts in self._by_tool.items()},
+                "by_session": {str(session): stats.snapshot() for session, stats in self._sessions.items()},
+            }
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            queued = [job for queue in self._queues.values() for job in queue]
+            self._queues.clear()
+            self._rotation.clear()
+            self._deficits.clear()
+        for job in queued:
+            job.future.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,433 @@
+"""Compiler for the Todoist filter language, evaluated against the local task store."""
+
+import abc
+import datetime
+import fnmatch
+import functools
+import re
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Priority as shown in the Todoist UI (p1 highest) -> API priority (4 highest)
+UI_PRIORITY = {"p1": 4, "p2": 3, "p3": 2, "p4": 1}
+
+_OPERATORS = set("&|!()")
+
+
+class FilterContext:
+    """Values a compiled filter is evaluated against.
+    
+    Relative terms such as ``today`` are resolved against this context at
+    evaluation time, so a compiled filter stays valid across days.
+    """
+    
+    def __init__(self, store: Any, now: Optional[datetime.datetime] = None):
+        self.store = store
+        self.now = now or datetime.datetime.now().astimezone()
+        self.today = self.now.date()
+        self._memo: Dict[Any, Any] = {}
+    
+    def memo(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Compute a per-evaluation value (e.g. a name lookup) once."""
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+
+def due_date(task: Dict[str, Any]) -> Optional[datetime.date]:
+    """Calendar date a task is due on, or None if it has no due date."""
+    due = task.get("due")
+    if not due or not due.get("date"):
+        return None
+    value = due.get("datetime") or due["date"]
+    if len(value) > 10 and re.search(r"(Z|[+-]\d\d:?\d\d)$", value):
+        # Absolute moments fall on the local calendar day they occur in
+        return due_datetime(task).astimezone().date()
+    return datetime.date.fromisoformat(value[:10])
+
+
+def due_datetime(task: Dict[str, Any], tz: Optional[datetime.tzinfo] = None) -> Optional[datetime.datetime]:
+    """Timezone-aware due moment; all-day and floating dates use ``tz`` (local by default)."""
+    due = task.get("due")
+    if not due or not due.get("date"):
+        return None
+    value = due.get("datetime") or due["date"]
+    if len(value) == 10:
+        moment = datetime.datetime.combine(datetime.date.fromisoformat(value), datetime.time())
+    else:
+        moment = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz) if tz else moment.astimezone()
+    return moment
+
+
+def has_time(task: Dict[str, Any]) -> bool:
+    due = task.get("due") or {}
+    return len(due.get("datetime") or due.get("date") or "") > 10
+
+
+class Node(abc.ABC):
+    """A node of a compiled filter expression."""
+    
+    @abc.abstractmethod
+    def matches(self, task: Dict[str, Any], ctx: FilterContext) -> bool:
+        """Whether ``task`` satisfies this node."""
+    
+    def candidates(self, ctx: FilterContext) -> Optional[Set[str]]:
+        """Superset of matching task IDs from store indexes, or None to scan."""
+        return None
+
+
+class And(Node):
+    def __init__(self, left: Node, right: Node):
+        self.left = left
+        self.right = right
+    
+    def matches(self, task, ctx):
+        return self.left.matches(task, ctx) and self.right.matches(task, ctx)
+    
+    def candidates(self, ctx):
+        left = self.left.candidates(ctx)
+        right = self.right.candidates(ctx)
+        if left is None:
+            return right
+        if right is None:
+            return left
+        return left & right
+
+
+class Or(Node):
+    def __init__(self, left: Node, right: Node):
+        self.left = left
+        self.right = right
+    
+    def matches(self, task, ctx):
+        return self.left.matches(task, ctx) or self.right.matches(task, ctx)
+    
+    def candidates(self, ctx):
+        left = self.left.candidates(ctx)
+        right = self.right.candidates(ctx) if left is not None else None
+        if left is None or right is None:
+            return None
+        return left | right
+
+
+class Not(Node):
+    def __init__(self, operand: Node):
+        self.operand = operand
+    
+    def matches(self, task, ctx):
+        return not self.operand.matches(task, ctx)
+
+
+class Predicate(Node):
+    """A leaf term: a per-task test plus an optional index lookup."""
+    
+    def __init__(self, term: str, test: Callable[[Dict[str, Any], FilterContext], bool],
+                 lookup: Optional[Callable[[FilterContext], Set[str]]] = None):
+        self.term = term
+        self.test = test
+        self.lookup = lookup
+    
+    def matches(self, task, ctx):
+        return self.test(task, ctx)
+    
+    def candidates(self, ctx):
+        return self.lookup(ctx) if self.lookup else None
+
+
+def _union(sets: List[Set[str]]) -> Set[str]:
+    result: Set[str] = set()
+    for ids in sets:
+        result |= ids
+    return result
+
+
+def _parse_date(text: str, ctx: FilterContext) -> datetime.date:
+    text = text.strip().casefold()
+    relative = {"today": 0, "tomorrow": 1, "yesterday": -1}
+    if text in relative:
+        return ctx.today + datetime.timedelta(days=relative[text])
+    match = re.fullmatch(r"([+-]?\d+) days?", text)
+    if match:
+        return ctx.today + datetime.timedelta(days=int(match.group(1)))
+    return datetime.date.fromisoformat(text)
+
+
+def _date_term(term: str, relation: str, value: str) -> Predicate:
+    # Validate absolute dates at compile time; relative ones resolve per evaluation
+    probe = FilterContext(store=None)
+    _parse_date(value, probe)
+    compare = {
+        "before": lambda date, ref: date < ref,
+        "after": lambda date, ref: date > ref,
+        "on": lambda date, ref: date == ref,
+    }[relation]
+    
+    def test(task, ctx):
+        date = due_date(task)
+        return date is not None and compare(date, _parse_date(value, ctx))
+    
+    def lookup(ctx):
+        ref = _parse_date(value, ctx)
+        day = datetime.timedelta(days=1)
+        first, last = {
+            "before": (None, ref - day),
+            "after": (ref + day, None),
+            "on": (ref, ref),
+        }[relation]
+        return set(ctx.store.by_due.between_dates(first, last))
+    return Predicate(term, test, lookup)
+
+
+def _window_term(term: str, start: int, end: int) -> Predicate:
+    """Tasks due between today+start and today+end days, inclusive."""
+    def test(task, ctx):
+        date = due_date(task)
+        if date is None:
+            return False
+        offset = (date - ctx.today).days
+        return start <= offset <= end
+    
+    def lookup(ctx):
+        return set(ctx.store.by_due.between_dates(
+            ctx.today + datetime.timedelta(days=start), ctx.today + datetime.timedelta(days=end)
+        ))
+    return Predicate(term, test, lookup)
+
+
+def _overdue(task, ctx):
+    if has_time(task):
+        moment = due_datetime(task)
+        return moment is not None and moment < ctx.now
+    date = due_date(task)
+    return date is not None and date < ctx.today
+
+
+def _project_term(term: str, name: str, with_subprojects: bool) -> Predicate:
+    def resolve(ctx):
+        ids: Set[str] = set()
+        for project in ctx.store.find_projects(name):
+            if with_subprojects:
+                ids |= ctx.store.subproject_ids(project["id"])
+            else:
+                ids.add(project["id"])
+        return ids
+    
+    def project_ids(ctx):
+        return ctx.memo(("projects", name, with_subprojects), lambda: resolve(ctx))
+    
+    def test(task, ctx):
+        return task.get("project_id") in project_ids(ctx)
+    
+    def lookup(ctx):
+        return _union([ctx.store.by_project.get(pid) for pid in project_ids(ctx)])
+    return Predicate(term, test, lookup)
+
+
+def _section_term(term: str, name: str) -> Predicate:
+    def section_ids(ctx):
+        return ctx.memo(
+            ("sections", name),
+            lambda: {section["id"] for section in ctx.store.find_sections(name)},
+        )
+    
+    def test(task, ctx):
+        return task.get("section_id") in section_ids(ctx)
+    
+    def lookup(ctx):
+        return _union([ctx.store.by_section.get(sid) for sid in section_ids(ctx)])
+    return Predicate(term, test, lookup)
+
+
+def _label_term(term: str, pattern: str) -> Predicate:
+    folded = pattern.casefold()
+    if "*" in pattern:
+        def names(ctx):
+            return [name for name in ctx.store.by_label.values()
+                    if fnmatch.fnmatchcase(name.casefold(), folded)]
+        
+        def test(task, ctx):
+            return any(fnmatch.fnmatchcase(label.casefold(), folded) for label in task.get("labels", []))
+    else:
+        def names(ctx):
+            return [name for name in ctx.store.by_label.values() if name.casefold() == folded]
+        
+        def test(task, ctx):
+            return any(label.casefold() == folded for label in task.get("labels", []))
+    
+    def lookup(ctx):
+        return _union([ctx.store.by_label.get(name) for name in names(ctx)])
+    return Predicate(term, test, lookup)
+
+
+def _priority_term(term: str, priority: int) -> Predicate:
+    return Predicate(
+        term,
+        lambda task, ctx: task.get("priority", 1) == priority,
+        lambda ctx: set(ctx.store.by_priority.get(priority)),
+    )
+
+
+def compile_term(term: str) -> Node:
+    """Compile a single filter term (no operators) into a predicate."""
+    text = " ".join(term.split())
+    folded = text.casefold()
+    
+    if folded in UI_PRIORITY:
+        return _priority_term(text, UI_PRIORITY[folded])
+    if folded == "no priority":
+        return _priority_term(text, 1)
+    if folded.startswith("##") and len(text) > 2:
+        return _project_term(text, text[2:].strip(), with_subprojects=True)
+    if folded.startswith("#") and len(text) > 1:
+        return _project_term(text, text[1:].strip(), with_subprojects=False)
+    if folded.startswith("/") and len(text) > 1:
+        return _section_term(text, text[1:].strip())
+    if folded.startswith("@") and len(text) > 1:
+        return _label_term(text, text[1:].strip())
+    
+    if folded in ("today", "tomorrow", "yesterday"):
+        offset = {"today": 0, "tomorrow": 1, "yesterday": -1}[folded]
+        return _window_term(text, offset, offset)
+    if folded in ("overdue", "od"):
+        return Predicate(text, _overdue, lambda ctx: set(ctx.store.by_due.range(None, ctx.now)))
+    if folded in ("no date", "no due date"):
+        return Predicate(text, lambda task, ctx: due_date(task) is None)
+    if folded == "recurring":
+        return Predicate(text, lambda task, ctx: bool((task.get("due") or {}).get("is_recurring")))
+    if folded == "no labels":
+        return Predicate(text, lambda task, ctx: not task.get("labels"))
+    if folded == "subtask":
+        return Predicate(text, lambda task, ctx: bool(task.get("parent_id")))
+    if folded in ("all", "view all"):
+        return Predicate(text, lambda task, ctx: True)
+    
+    match = re.fullmatch(r"(?:next )?(\d+) days?", folded)
+    if match:
+        return _window_term(text, 0, int(match.group(1)) - 1)
+    match = re.fullmatch(r"due (before|after|on)?:\s*(.+)", folded)
+    if match:
+        try:
+            return _date_term(text, match.group(1) or "on", match.group(2))
+        except ValueError:
+            raise ValueError(f"Unsupported date in filter term: {text}") from None
+    match = re.fullmatch(r"search:\s*(.+)", text, flags=re.IGNORECASE)
+    if match:
+        needle = match.group(1).casefold()
+        return Predicate(text, lambda task, ctx: needle in task.get("content", "").casefold())
+    
+    raise ValueError(f"Unsupported filter term: {text}")
+
+
+class _Parser:
+    """Recursive descent parser: ``|`` binds loosest, then ``&``, then ``!``."""
+    
+    def __init__(self, expression: str):
+        self.tokens = self._tokenize(expression)
+        self.pos = 0
+    
+    @staticmethod
+    def _tokenize(expression: str) -> List[str]:
+        """Split into operators and terms; a backslash makes the next character literal."""
+        tokens = []
+        term = []
+        chars = iter(expression)
+        for char in chars:
+            if char == "\\":
+                escaped = next(chars, None)
+                if escaped is None:
+                    raise ValueError("Filter expression cannot end with '\\'")
+                term.append(escaped)
+            elif char in _OPERATORS:
+                if "".join(term).strip():
+                    tokens.append("".join(term).strip())
+                term = []
+                tokens.append(char)
+            else:
+                term.append(char)
+        if "".join(term).strip():
+            tokens.append("".join(term).strip())
+        return tokens
+    
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+    
+    def _take(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise ValueError("Unexpected end of filter expression")
+        self.pos += 1
+        return token
+    
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise ValueError("Filter expression cannot be empty")
+        node = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected '{self._peek()}' in filter expression")
+        return node
+    
+    def _or(self) -> Node:
+        node = self._and()
+        while self._peek() == "|":
+            self._take()
+            node = Or(node, self._and())
+        return node
+    
+    def _and(self) -> Node:
+        node = self._unary()
+        while self._peek() == "&":
+            self._take()
+            node = And(node, self._unary())
+        return node
+    
+    def _unary(self) -> Node:
+        token = self._take()
+        if token == "!":
+            return Not(self._unary())
+        if token == "(":
+            node = self._or()
+            if self._take() != ")":
+                raise ValueError("Missing ')' in filter expression")
+            return node
+        if token in _OPERATORS:
+            raise ValueError(f"Unexpected '{token}' in filter expression")
+        return compile_term(token)
+
+
+class CompiledFilter:
+    """A parsed filter expression, reusable across evaluations."""
+    
+    def __init__(self, expression: str, root: Node):
+        self.expression = expression
+        self.root = root
+    
+    def matches(self, task: Dict[str, Any], ctx: FilterContext) -> bool:
+        return self.root.matches(task, ctx)
+    
+    def candidates(self, ctx: FilterContext) -> Optional[Set[str]]:
+        return self.root.candidates(ctx)
+    
+    def select(self, store: Any, now: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
+        """Matching tasks from the store, narrowed through its indexes where possible."""
+        with store.lock:
+            ctx = FilterContext(store, now)
+            candidates = self.candidates(ctx)
+            tasks = store.iter_tasks(candidates)
+            return [task for task in tasks if self.matches(task, ctx)]
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(expression: str) -> CompiledFilter:
+    return CompiledFilter(expression, _Parser(expression).parse())
+
+
+def compile_filter(expression: str) -> CompiledFilter:
+    """Compile a Todoist filter expression, memoized by its normalized text."""
+    return _compile(" ".join(expression.split()))
+
+
+def sort_key(task: Dict[str, Any]):
+    """Order by due date (undated last), then priority (highest first), then position."""
+    date = due_date(task)
+    return (date is None, date or datetime.date.max, -task.get("priority", 1), task.get("child_order", 0))
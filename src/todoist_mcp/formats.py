@@ -0,0 +1,123 @@
+"""Compact tabular encodings for list tool results."""
+
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .budget import json_size
+from .projection import parse_fields, project_result, projection
+
+FORMATS = ("json", "columns", "tsv")
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _getter(path: str) -> Callable[[Dict[str, Any]], Any]:
+    """Compile a field path such as ``due.date`` into a value lookup."""
+    parts = path.split(".")
+    if len(parts) == 1:
+        return lambda row: row.get(path)
+    
+    def get(row: Dict[str, Any]) -> Any:
+        value: Any = row
+        for part in parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    return get
+
+
+def columns_for(rows: Iterable[Dict[str, Any]]) -> List[str]:
+    """Top-level keys of ``rows`` in order of first appearance."""
+    seen: Dict[str, None] = {}
+    for row in rows:
+        for key in row:
+            seen.setdefault(key)
+    return list(seen)
+
+
+def iter_rows(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[List[Any]]:
+    """Row values for ``columns``, read straight from the source dicts."""
+    getters = [_getter(column) for column in columns]
+    for row in rows:
+        yield [get(row) for get in getters]
+
+
+def _tsv_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def encode_tsv(rows: Iterable[Dict[str, Any]], columns: List[str]) -> str:
+    """A header line plus one tab-separated line per row.
+    
+    Missing values are empty, nested values are compact JSON, and tabs,
+    newlines and backslashes inside values are backslash-escaped.
+    """
+    out = io.StringIO()
+    out.write("\t".join(column.translate(_TSV_ESCAPES) for column in columns))
+    for values in iter_rows(rows, columns):
+        out.write("\n")
+        out.write("\t".join(_tsv_cell(value) for value in values))
+    return out.getvalue()
+
+
+def _check_format(format: Optional[str]) -> str:
+    format = (format or "json").lower()
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}; expected one of {', '.join(FORMATS)}")
+    return format
+
+
+def row_size(rows: List[Dict[str, Any]], format: Optional[str] = "json",
+             fields: Optional[Union[str, Iterable[str]]] = None) -> Callable[[Dict[str, Any]], int]:
+    """Bytes one of ``rows`` adds when encoded in ``format``, for response budgets.
+    
+    Without ``fields`` the tabular formats are sized over every key seen in
+    ``rows``, which may overestimate a cut part slightly but never under.
+    """
+    format = _check_format(format)
+    if format == "json":
+        select = projection(fields)
+        return (lambda row: json_size(select(row))) if select else json_size
+    getters = [_getter(column) for column in parse_fields(fields) or columns_for(rows)]
+    if format == "columns":
+        return lambda row: json_size([get(row) for get in getters])
+    return lambda row: len("\t".join(_tsv_cell(get(row)) for get in getters).encode())
+
+
+def encode(result: Any, format: Optional[str] = "json",
+           fields: Optional[Union[str, Iterable[str]]] = None) -> Any:
+    """Encode a list response (``{"results": [...], ...}``) in ``format``.
+    
+    ``json`` returns the response with ``fields`` projected; ``columns``
+    replaces ``results`` with ``columns`` plus ``rows`` of values, and
+    ``tsv`` with a ``tsv`` string. ``fields`` picks and orders the columns
+    (default: every key seen). Other response keys such as ``next_cursor``
+    are kept.
+    """
+    format = _check_format(format)
+    if format == "json":
+        return project_result(result, projection(fields))
+    
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        rows = result["results"]
+        rest = {key: value for key, value in result.items() if key != "results"}
+    elif isinstance(result, list):
+        rows, rest = result, {}
+    else:
+        raise ValueError(f"format={format!r} applies to list results only")
+    
+    columns = list(parse_fields(fields) or columns_for(rows))
+    if format == "columns":
+        encoded = {"columns": columns, "rows": list(iter_rows(rows, columns))}
+    else:
+        encoded = {"tsv": encode_tsv(rows, columns)}
+    encoded.update(rest)
+    return encoded
@@ -0,0 +1,86 @@
+"""Two-way index between personal label names and IDs."""
+
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+
+class LabelIndex:
+    """Maps label IDs to names and case-insensitive names to IDs.
+    
+    Fed by label listings the client reads and by the task store's sync
+    deltas, and kept current with the client's label write events, so
+    renames and deletions made through the server are reflected without
+    another listing.
+    """
+    
+    def __init__(self):
+        self._names: Dict[str, str] = {}
+        self._ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def _add(self, label: Dict[str, Any]) -> None:
+        self._discard(label["id"])
+        name = label.get("name")
+        if name:
+            self._names[label["id"]] = name
+            self._ids[name.casefold()] = label["id"]
+    
+    def _discard(self, label_id: str) -> None:
+        name = self._names.pop(label_id, None)
+        if name is not None and self._ids.get(name.casefold()) == label_id:
+            del self._ids[name.casefold()]
+    
+    def update(self, labels: Iterable[Dict[str, Any]]) -> None:
+        """Add or refresh labels seen in a response."""
+        with self._lock:
+            for label in labels:
+                self._add(label)
+    
+    def load(self, labels: Iterable[Dict[str, Any]]) -> None:
+        """Replace the index with a complete label listing."""
+        with self._lock:
+            self._names.clear()
+            self._ids.clear()
+            for label in labels:
+                self._add(label)
+    
+    def discard(self, label_id: str) -> None:
+        with self._lock:
+            self._discard(label_id)
+    
+    def handle_store_change(self, collection: str, object_id: str, obj: Optional[Dict[str, Any]]) -> None:
+        """Task store listener: follow labels seen in sync deltas."""
+        if collection != "labels":
+            return
+        if obj is None:
+            self.discard(object_id)
+        else:
+            self.update([obj])
+    
+    def handle_event(self, event: Any) -> None:
+        """Apply a label write made through the client."""
+        if event.entity_type != "labels":
+            return
+        with self._lock:
+            if event.action == "delete":
+                self._discard(event.entity_id)
+            elif isinstance(event.result, dict) and event.result.get("id"):
+                self._add(event.result)
+    
+    def name_for(self, value: str) -> Optional[str]:
+        """Canonical label name for a name (any case) or an ID, if known."""
+        with self._lock:
+            label_id = self._ids.get(value.casefold())
+            if label_id is not None:
+                return self._names[label_id]
+            return self._names.get(value)
+    
+    def id_for(self, value: str) -> Optional[str]:
+        """Label ID for a name (any case) or an ID, if known."""
+        with self._lock:
+            if value in self._names:
+                return value
+            return self._ids.get(value.casefold())
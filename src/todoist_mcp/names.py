@@ -0,0 +1,126 @@
+"""Fuzzy resolution of project, section and label names to IDs."""
+
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# Store collection -> entity kind reported to callers
+KINDS = {"projects": "project", "sections": "section", "labels": "label"}
+
+
+def normalize(name: str) -> str:
+    """Case-fold and collapse whitespace."""
+    return " ".join(name.casefold().split())
+
+
+def trigrams(name: str) -> FrozenSet[str]:
+    """Character trigrams of a normalized name, padded so short names still match."""
+    padded = f"  {normalize(name)} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """Maps names to entries through their character trigrams.
+    
+    Similarity is the Jaccard coefficient of the trigram sets; only entries
+    sharing at least one trigram with the query are scored.
+    """
+    
+    def __init__(self):
+        self._postings: Dict[str, set] = {}
+        self._entries: Dict[Any, Tuple[str, FrozenSet[str]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def add(self, key: Any, name: str) -> None:
+        """Index ``name`` under ``key``, replacing any previous name."""
+        self.discard(key)
+        grams = trigrams(name)
+        self._entries[key] = (normalize(name), grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+    
+    def discard(self, key: Any) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry[1]:
+            keys = self._postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self._postings[gram]
+    
+    def clear(self) -> None:
+        self._postings.clear()
+        self._entries.clear()
+    
+    def search(self, name: str, limit: int = 5, min_score: float = 0.2) -> List[Tuple[Any, float]]:
+        """Best ``(key, score)`` matches for a name; an exact match scores 1.0."""
+        query = normalize(name)
+        grams = trigrams(name)
+        shared: Dict[Any, int] = {}
+        for gram in grams:
+            for key in self._postings.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        
+        scored = []
+        for key, overlap in shared.items():
+            entry_name, entry_grams = self._entries[key]
+            if entry_name == query:
+                score = 1.0
+            else:
+                # Keep inexact matches below an exact one
+                score = min(0.99, overlap / (len(grams) + len(entry_grams) - overlap))
+            if score >= min_score:
+                scored.append((key, score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+
+class NameResolver:
+    """Trigram index over the names of projects, sections and labels in a task store.
+    
+    Registered as a store listener, so creates, renames and deletes made
+    through the server or seen in sync deltas update it in place.
+    """
+    
+    def __init__(self, store: Any):
+        self.store = store
+        self._lock = threading.Lock()
+        self._indexes = {collection: TrigramIndex() for collection in KINDS}
+        with store.lock:
+            for collection in KINDS:
+                for obj in getattr(store, collection).values():
+                    self._indexes[collection].add(obj["id"], obj.get("name", ""))
+            store.add_listener(self.handle_change)
+    
+    def handle_change(self, collection: str, object_id: str, obj: Optional[Dict[str, Any]]) -> None:
+        index = self._indexes.get(collection)
+        if index is None:
+            return
+        with self._lock:
+            if obj is None:
+                index.discard(object_id)
+            else:
+                index.add(object_id, obj.get("name", ""))
+    
+    def resolve(self, name: str, kinds: Optional[List[str]] = None,
+                limit: int = 3) -> List[Dict[str, Any]]:
+        """Ranked matches for one name across the requested entity kinds."""
+        matches = []
+        with self._lock:
+            for collection, kind in KINDS.items():
+                if kinds and kind not in kinds:
+                    continue
+                objects = getattr(self.store, collection)
+                for object_id, score in self._indexes[collection].search(name, limit=limit):
+                    obj = objects.get(object_id)
+                    if obj is None:
+                        continue
+                    match = {"type": kind, "id": object_id, "name": obj.get("name"),
+                             "score": round(score, 3)}
+                    if kind == "section":
+                        match["project_id"] = obj.get("project_id")
+                    matches.append(match)
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return matches[:limit]
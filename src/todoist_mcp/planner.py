@@ -0,0 +1,150 @@
+"""Cost-based choice between the local task store and upstream reads."""
+
+import logging
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CURSOR = "local:"
+
+# Todoist's default and maximum page sizes for list endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Plan(NamedTuple):
+    """How one read will be answered and what it is expected to cost."""
+    
+    path: str  # "local", "local_stale", "sync_local" or "upstream"
+    cost: float  # Estimated upstream requests
+    estimate: Optional[int]  # Estimated matching tasks, if known
+    reason: str
+
+
+class QueryPlanner:
+    """Chooses the cheapest way to answer a ``get_tasks``-style read.
+    
+    Costs are counted in upstream requests. A fresh store answers for free;
+    a stale one costs an incremental sync; reading upstream costs one
+    request per page of matching tasks, estimated from the store's indexes
+    when it has been synced before. Sync payloads grow with the time since
+    the last sync, so a sync counts as one request up to ``delta_horizon``
+    seconds of staleness and then grows towards ``full_sync_cost``, the cost
+    of a first full sync; ties go to the sync since it refreshes the whole
+    store. When less than ``reserve`` of the rate budget
+    is left, a stale store is served as is rather than spending requests.
+    """
+    
+    def __init__(self, store: Any, budget: Any = None, full_sync_cost: float = 2.0,
+                 delta_horizon: float = 3600.0, reserve: float = 0.05):
+        self.store = store
+        self._budget = budget
+        self.full_sync_cost = full_sync_cost
+        self.delta_horizon = delta_horizon
+        self.reserve = reserve
+    
+    @property
+    def budget(self) -> Any:
+        """Rate budget to plan against; the store client's by default."""
+        return self._budget if self._budget is not None else self.store.api.rate_budget
+    
+    def candidates(self, project_id: Optional[str] = None, section_id: Optional[str] = None,
+                   parent_id: Optional[str] = None, labels: Optional[List[str]] = None) -> Set[str]:
+        """IDs of store tasks matching the filters, intersected through the indexes."""
+        store = self.store
+        sets = []
+        if project_id:
+            sets.append(store.by_project.get(project_id))
+        if section_id:
+            sets.append(store.by_section.get(section_id))
+        if parent_id:
+            sets.append(store.by_parent.get(parent_id))
+        for label in labels or ():
+            sets.append(store.by_label.get(label))
+        if not sets:
+            return set(store.tasks)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for ids in sets[1:]:
+            result &= ids
+        return result
+    
+    def plan(self, filters: Dict[str, Any], limit: Optional[int] = None,
+             cursor: Optional[str] = None) -> Plan:
+        """Pick a path for a read with the given filters."""
+        store = self.store
+        if cursor and not cursor.startswith(LOCAL_CURSOR):
+            return Plan("upstream", 1.0, None, "continuing an upstream cursor")
+        page_size = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        
+        if store.last_sync is None:
+            if cursor:
+                return Plan("sync_local", self.full_sync_cost, None, "local cursor after restart")
+            # Without an index the selectivity is unknown; assume one page
+            return Plan("upstream", 1.0, None, "store not synced; one page cheaper than a full sync")
+        
+        estimate = len(self.candidates(**filters))
+        if store.is_fresh:
+            return Plan("local", 0.0, estimate, f"store fresh (age {store.age:.1f}s)")
+        if cursor:
+            return Plan("sync_local", 1.0, estimate, "continuing a local cursor")
+        budget = self.budget
+        if budget.remaining_ratio < self.reserve:
+            return Plan("local_stale", 0.0, estimate,
+                        f"rate budget low ({budget.remaining} left); serving store aged {store.age:.0f}s")
+        upstream_cost = float(max(1, math.ceil(estimate / page_size)))
+        sync_cost = min(self.full_sync_cost, max(1.0, store.age / self.delta_horizon))
+        comparison = f"sync ~{sync_cost:.1f} vs {upstream_cost:.0f} upstream page(s)"
+        if upstream_cost < sync_cost:
+            return Plan("upstream", upstream_cost, estimate, comparison)
+        return Plan("sync_local", sync_cost, estimate, comparison)
+    
+    def get_tasks(self, api: Any, project_id: Optional[str] = None, section_id: Optional[str] = None,
+                  parent_id: Optional[str] = None, labels: Optional[List[str]] = None,
+                  limit: Optional[int] = None, cursor: Optional[str] = None,
+                  upstream_filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Answer a task listing along the cheapest path.
+        
+        ``upstream_filters`` are the extra parameters sent when the read goes
+        upstream (they default to the local filters).
+        """
+        filters = {"project_id": project_id, "section_id": section_id,
+                   "parent_id": parent_id, "labels": labels}
+        plan = self.plan(filters, limit, cursor)
+        logger.debug("get_tasks %s -> %s (cost %.1f requests, estimate %s tasks): %s",
+                     {k: v for k, v in filters.items() if v}, plan.path, plan.cost,
+                     plan.estimate, plan.reason)
+        
+        if plan.path == "sync_local":
+            self.store.refresh()
+        elif plan.path == "upstream":
+            extra = upstream_filters if upstream_filters is not None else {
+                key: value for key, value in filters.items() if value and key != "project_id"
+            }
+            result = api.get_tasks(project_id=project_id, limit=limit, cursor=cursor, **extra)
+            if labels and len(labels) > 1 and isinstance(result, dict):
+                # Upstream filters on one label; apply the others to the page
+                wanted = set(labels)
+                result = dict(result, results=[
+                    task for task in result.get("results", []) if wanted <= set(task.get("labels") or ())
+                ])
+            return result
+        return self.local_page(filters, limit, cursor)
+    
+    def local_page(self, filters: Dict[str, Any], limit: Optional[int] = None,
+                   cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of matching store tasks, shaped like an API list response."""
+        page_size = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        offset = int(cursor[len(LOCAL_CURSOR):]) if cursor else 0
+        with self.store.lock:
+            tasks = sorted(
+                self.store.iter_tasks(self.candidates(**filters)),
+                key=lambda task: (task.get("child_order", 0), task["id"]),
+            )
+        page = tasks[offset:offset + page_size]
+        next_offset = offset + page_size
+        return {
+            "results": page,
+            "next_cursor": f"{LOCAL_CURSOR}{next_offset}" if next_offset < len(tasks) else None,
+        }
@@ -0,0 +1,69 @@
+"""Field projection for tool results."""
+
+import json
+from typing import Any, Dict, Iterable, Optional, Union
+
+
+def parse_fields(fields: Optional[Union[str, Iterable[str]]]) -> Optional[tuple]:
+    """Normalize a ``fields`` argument: a JSON list, a comma-separated string or a list."""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        text = fields.strip()
+        if text.startswith("["):
+            fields = json.loads(text)
+        else:
+            fields = text.split(",")
+    names = tuple(dict.fromkeys(name.strip() for name in fields if name and name.strip()))
+    return names or None
+
+
+class Projection:
+    """Selects a subset of fields from dicts, including nested ``a.b`` paths.
+    
+    Paths are compiled once into a tree; applying it walks only the
+    requested keys. Lists of dicts are projected element by element.
+    """
+    
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self._tree: Dict[str, Any] = {}
+        for path in self.fields:
+            node = self._tree
+            parts = path.split(".")
+            for part in parts[:-1]:
+                child = node.setdefault(part, {})
+                if child is None:
+                    break  # A parent path already selects the whole value
+                node = child
+            else:
+                node[parts[-1]] = None
+    
+    def __call__(self, value: Any) -> Any:
+        return self._apply(self._tree, value)
+    
+    def _apply(self, tree: Dict[str, Any], value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._apply(tree, item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        result = {}
+        for key, subtree in tree.items():
+            if key in value:
+                result[key] = value[key] if subtree is None else self._apply(subtree, value[key])
+        return result
+
+
+def projection(fields: Optional[Union[str, Iterable[str]]]) -> Optional[Projection]:
+    """A :class:`Projection` for a ``fields`` argument, or None to keep whole objects."""
+    names = parse_fields(fields)
+    return Projection(names) if names else None
+
+
+def project_result(result: Any, select: Optional[Projection]) -> Any:
+    """Apply ``select`` to a single object or to each item of a list response's ``results``."""
+    if select is None:
+        return result
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        return dict(result, results=select(result["results"]))
+    return select(result)
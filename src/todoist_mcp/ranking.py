@@ -0,0 +1,72 @@
+"""Importance scoring and top-K selection of tasks."""
+
+import datetime
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .filters import due_date, due_datetime, has_time
+
+DEFAULT_WEIGHTS = {"priority": 1.0, "due": 1.0, "overdue": 0.5}
+
+# Overdue-ness saturates after this many days
+OVERDUE_HORIZON = 30
+
+
+class TaskScorer:
+    """Weighted importance score of a task at a moment in time.
+    
+    Components, each in ``[0, 1]`` before weighting:
+    
+    - ``priority``: ``(priority - 1) / 3``, so p1 scores 1 and p4 scores 0
+    - ``due``: ``1 / (1 + days until due)``; 1 for tasks due today or overdue
+    - ``overdue``: grows logarithmically with days overdue, 1 at 30 days
+    
+    ``labels`` maps label names to weights added for each label on the task.
+    """
+    
+    def __init__(self, weights: Optional[Dict[str, Any]] = None,
+                 now: Optional[datetime.datetime] = None):
+        weights = dict(weights or {})
+        self.labels: Dict[str, float] = {
+            name.casefold(): float(value) for name, value in (weights.pop("labels", None) or {}).items()
+        }
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown score weight(s): {', '.join(sorted(unknown))}. "
+                             f"Choose from: {', '.join(list(DEFAULT_WEIGHTS) + ['labels'])}")
+        self.weights = dict(DEFAULT_WEIGHTS, **{name: float(value) for name, value in weights.items()})
+        self.now = now or datetime.datetime.now().astimezone()
+        self.today = self.now.date()
+    
+    def _days_until_due(self, task: Dict[str, Any]) -> Optional[float]:
+        if has_time(task):
+            return (due_datetime(task) - self.now).total_seconds() / 86400
+        date = due_date(task)
+        return None if date is None else float((date - self.today).days)
+    
+    def __call__(self, task: Dict[str, Any]) -> float:
+        weights = self.weights
+        score = weights["priority"] * (task.get("priority", 1) - 1) / 3
+        days = self._days_until_due(task)
+        if days is not None:
+            score += weights["due"] / (1 + max(days, 0.0))
+            if days < 0:
+                score += weights["overdue"] * min(1.0, math.log1p(-days) / math.log1p(OVERDUE_HORIZON))
+        if self.labels:
+            score += sum(self.labels.get(label.casefold(), 0.0) for label in task.get("labels") or ())
+        return score
+
+
+def top_k(tasks: Iterable[Dict[str, Any]], k: int,
+          scorer: TaskScorer) -> List[Tuple[Dict[str, Any], float]]:
+    """The ``k`` highest scoring tasks, best first, using a heap bounded at ``k``."""
+    heap: List[Tuple[float, int, Dict[str, Any]]] = []
+    for position, task in enumerate(tasks):
+        # Negated position keeps earlier tasks ahead on ties
+        entry = (scorer(task), -position, task)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return [(task, score) for score, _, task in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
@@ -0,0 +1,46 @@
+"""Client-side accounting of the Todoist request rate limit."""
+
+import threading
+import time
+from collections import deque
+
+
+class RateBudget:
+    """Sliding-window count of requests sent against a per-user limit.
+    
+    Todoist allows roughly 1000 requests per user per 15 minutes; the
+    client records every upstream request here so callers can tell how
+    much of the window is left before choosing an expensive path.
+    """
+    
+    def __init__(self, limit: int = 1000, window: float = 900.0):
+        self.limit = limit
+        self.window = window
+        self._sent: deque = deque()
+        self._lock = threading.Lock()
+    
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._sent and self._sent[0] <= cutoff:
+            self._sent.popleft()
+    
+    def record(self, count: int = 1) -> None:
+        """Account for ``count`` requests sent now."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._sent.extend([now] * count)
+    
+    @property
+    def used(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._sent)
+    
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+    
+    @property
+    def remaining_ratio(self) -> float:
+        return self.remaining / self.limit if self.limit else 0.0
@@ -0,0 +1,175 @@
+"""MCP resource URIs backed by the task store, with change subscriptions."""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Set
+
+from .scheduler import BACKGROUND, priority
+
+logger = logging.getLogger(__name__)
+
+PROJECTS = "todoist://projects"
+LABELS = "todoist://labels"
+SECTIONS = "todoist://sections"
+PROJECT_TASKS = "todoist://projects/{project_id}/tasks"
+PROJECT_SECTIONS = "todoist://projects/{project_id}/sections"
+
+
+def project_tasks_uri(project_id: str) -> str:
+    return PROJECT_TASKS.format(project_id=project_id)
+
+
+def project_sections_uri(project_id: str) -> str:
+    return PROJECT_SECTIONS.format(project_id=project_id)
+
+
+class ResourceNotifier:
+    """Sends ``resources/updated`` to sessions subscribed to changed resources.
+    
+    Registered with the task store as an index, so task changes arrive with
+    both the old and the new object (and thus both projects' task lists),
+    and as a listener for projects, sections and labels. Changes may come
+    from any thread; they are coalesced and sent once per event-loop turn.
+    While anything is subscribed, a watcher thread keeps the store synced
+    every ``watch_interval`` seconds so changes made elsewhere are noticed
+    without clients polling.
+    """
+    
+    def __init__(self, store: Any, watch_interval: Optional[float] = 60.0):
+        self.store = store
+        self.watch_interval = watch_interval
+        self._subscribers: Dict[str, "weakref.WeakSet[Any]"] = {}
+        self._section_projects: Dict[str, Optional[str]] = {}
+        self._dirty: Set[str] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        with store.lock:
+            for section in store.sections.values():
+                self._section_projects[section["id"]] = section.get("project_id")
+        store.add_index(self)
+        store.add_listener(self.handle_store_change)
+    
+    # Store index protocol
+    
+    def add(self, task: Dict[str, Any]) -> None:
+        self._mark(project_tasks_uri(task.get("project_id")))
+    
+    def discard(self, task: Dict[str, Any]) -> None:
+        self._mark(project_tasks_uri(task.get("project_id")))
+    
+    def handle_store_change(self, collection: str, object_id: str, obj: Optional[Dict[str, Any]]) -> None:
+        """Task store listener: mark container resources as changed."""
+        if collection == "projects":
+            self._mark(PROJECTS)
+        elif collection == "labels":
+            self._mark(LABELS)
+        elif collection == "sections":
+            if obj is None:
+                project_id = self._section_projects.pop(object_id, None)
+            else:
+                project_id = self._section_projects[object_id] = obj.get("project_id")
+            self._mark(SECTIONS)
+            if project_id:
+                self._mark(project_sections_uri(project_id))
+    
+    # Subscriptions
+    
+    def subscribe(self, uri: str, session: Any) -> None:
+        """Subscribe ``session``; must be called on the event loop that serves it."""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.setdefault(str(uri), weakref.WeakSet()).add(session)
+        self._start_watcher()
+    
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        with self._lock:
+            sessions = self._subscribers.get(str(uri))
+            if sessions is not None:
+                sessions.discard(session)
+                if not sessions:
+                    del self._subscribers[str(uri)]
+    
+    def subscriptions(self) -> Dict[str, int]:
+        """Number of subscribed sessions per URI."""
+        with self._lock:
+            return {uri: len(sessions) for uri, sessions in self._subscribers.items() if sessions}
+    
+    def _mark(self, uri: str) -> None:
+        with self._lock:
+            if uri not in self._subscribers:
+                return
+            self._dirty.add(uri)
+            if self._flush_scheduled or self._loop is None:
+                return
+            self._flush_scheduled = True
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(self._flush)
+        except RuntimeError:
+            # Event loop closed; nothing left to notify
+            with self._lock:
+                self._flush_scheduled = False
+    
+    def _flush(self) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._flush_scheduled = False
+            targets = [(uri, list(self._subscribers.get(uri, ()))) for uri in sorted(dirty)]
+        for uri, sessions in targets:
+            for session in sessions:
+                asyncio.ensure_future(self._send(uri, session))
+    
+    async def _send(self, uri: str, session: Any) -> None:
+        try:
+            await session.send_resource_updated(uri)
+        except Exception as exc:
+            logger.debug("Dropping subscription to %s: %s", uri, exc)
+            self.unsubscribe(uri, session)
+    
+    # Watcher
+    
+    def _start_watcher(self) -> None:
+        if not self.watch_interval or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="todoist-resource-watch", daemon=True)
+        self._watcher.start()
+    
+    def _watch(self) -> None:
+        while not self._stop.wait(self.watch_interval):
+            if not self.subscriptions():
+                continue
+            try:
+                with priority(BACKGROUND):
+                    self.store.ensure_fresh()
+            except Exception as exc:
+                logger.warning("Resource watch sync failed: %s", exc)
+    
+    def stop(self) -> None:
+        self._stop.set()
+    
+    # Reads
+    
+    def read(self, uri: str, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Current contents of a resource, from a fresh store."""
+        store = self.store
+        store.ensure_fresh()
+        with store.lock:
+            if uri == PROJECTS:
+                return sorted(store.projects.values(), key=lambda p: (p.get("child_order", 0), p["id"]))
+            if uri == LABELS:
+                return sorted(store.labels.values(), key=lambda l: (l.get("item_order", 0), l["id"]))
+            sections = sorted(store.sections.values(), key=lambda s: (s.get("section_order", 0), s["id"]))
+            if uri == SECTIONS:
+                return sections
+            if uri == PROJECT_SECTIONS:
+                return [section for section in sections if section.get("project_id") == project_id]
+            if uri == PROJECT_TASKS:
+                return sorted(store.iter_tasks(store.by_project.get(project_id)),
+                              key=lambda task: (task.get("child_order", 0), task["id"]))
+        raise ValueError(f"Unknown resource: {uri}")
@@ -0,0 +1,156 @@
+"""Priority dispatch of upstream requests."""
+
+import contextlib
+import contextvars
+import fnmatch
+import functools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+BACKGROUND = "background"
+
+# Highest first
+PRIORITIES = (INTERACTIVE, BULK, BACKGROUND)
+
+# Priority of tool calls by tool name pattern; other tools are interactive
+TOOL_PRIORITIES = {"batch_*": BULK}
+
+# Priority class of upstream requests made in the current context
+request_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "todoist_request_priority", default=INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def priority(level: str) -> Iterator[None]:
+    """Send upstream requests made inside the block at ``level``."""
+    if level not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {level}")
+    reset = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(reset)
+
+
+def tool_priority(tool: str) -> str:
+    for pattern, level in TOOL_PRIORITIES.items():
+        if fnmatch.fnmatchcase(tool, pattern):
+            return level
+    return INTERACTIVE
+
+
+def prioritized(tool: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``fn`` so its upstream requests go out at ``tool``'s priority."""
+    level = tool_priority(tool)
+    if level == INTERACTIVE:
+        return fn
+    
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        with priority(level):
+            return fn(*args, **kwargs)
+    return call
+
+
+class _Waiter:
+    __slots__ = ("enqueued", "ready")
+    
+    def __init__(self, enqueued: float):
+        self.enqueued = enqueued
+        self.ready = threading.Event()
+
+
+class RequestScheduler:
+    """Admits at most ``max_concurrent`` upstream requests at a time, by priority.
+    
+    Requests that find every slot taken queue by class and are dispatched
+    interactive first, then bulk, then background, FIFO within a class. A
+    waiting request is promoted one class for every ``aging`` seconds it
+    has waited, so bulk and background work keeps moving while interactive
+    calls arrive continuously.
+    """
+    
+    def __init__(self, max_concurrent: int = 4, aging: float = 1.0):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.aging = aging
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queues: Dict[str, Deque[_Waiter]] = {level: deque() for level in PRIORITIES}
+        self._stats = {
+            level: {"dispatched": 0, "waited": 0, "wait_seconds": 0.0, "max_wait": 0.0}
+            for level in PRIORITIES
+        }
+    
+    def _next(self, now: float) -> Optional[_Waiter]:
+        best = None
+        best_key = None
+        for rank, level in enumerate(PRIORITIES):
+            queue = self._queues[level]
+            if queue:
+                head = queue[0]
+                key = (rank - (now - head.enqueued) / self.aging, head.enqueued)
+                if best_key is None or key < best_key:
+                    best, best_key = level, key
+        return self._queues[best].popleft() if best is not None else None
+    
+    @contextlib.contextmanager
+    def slot(self, level: Optional[str] = None) -> Iterator[None]:
+        """Hold one request slot, waiting behind higher-priority requests if all are taken."""
+        level = level or request_priority.get()
+        queue = self._queues[level]
+        waiter = None
+        with self._lock:
+            if self._active < self.max_concurrent and not any(self._queues.values()):
+                self._active += 1
+            else:
+                waiter = _Waiter(time.monotonic())
+                queue.append(waiter)
+        waited = 0.0
+        if waiter is not None:
+            # The releasing request hands its slot over when it sets the event
+            waiter.ready.wait()
+            waited = time.monotonic() - waiter.enqueued
+        with self._lock:
+            stats = self._stats[level]
+            stats["dispatched"] += 1
+            if waiter is not None:
+                stats["waited"] += 1
+                stats["wait_seconds"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def _release(self) -> None:
+        with self._lock:
+            waiter = self._next(time.monotonic())
+            if waiter is None:
+                self._active -= 1
+            else:
+                waiter.ready.set()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "active": self._active,
+                "by_priority": {
+                    level: {
+                        "queued": len(self._queues[level]),
+                        "dispatched": stats["dispatched"],
+                        "waited": stats["waited"],
+                        "mean_wait_ms": round(1000 * stats["wait_seconds"] / stats["waited"], 1)
+                        if stats["waited"] else 0.0,
+                        "max_wait_ms": round(1000 * stats["max_wait"], 1),
+                    }
+                    for level, stats in self._stats.items()
+                },
+            }
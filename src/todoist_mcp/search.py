@@ -0,0 +1,192 @@
+"""Local full-text search over Todoist data."""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into case-folded word tokens, dropping stop words."""
+    if not text:
+        return []
+    return [token for token in _TOKEN_RE.findall(text.casefold()) if token not in STOP_WORDS]
+
+
+class _TermImpacts:
+    """Cached BM25 contributions of one term, with the statistics they assume."""
+    
+    __slots__ = ("count", "average_length", "df", "weight", "length_scale", "impacts", "ranked")
+    
+    def __init__(self, count: int, average_length: float, df: int, weight: float,
+                 length_scale: float, impacts: Dict[str, float]):
+        self.count = count
+        self.average_length = average_length
+        self.df = df
+        self.weight = weight
+        self.length_scale = length_scale
+        self.impacts = impacts
+        self.ranked: Optional[List[Tuple[str, float]]] = None
+
+
+class InvertedIndex:
+    """BM25-ranked inverted index over documents keyed by ID.
+    
+    Postings map each term to ``{doc_id: term_frequency}``; a query only
+    touches the postings of its own terms. Per-term BM25 contributions are
+    cached and maintained as documents come and go; they are recomputed
+    once the collection size, average document length or the term's
+    document frequency drifts by more than ``DRIFT`` from the values they
+    were computed with.
+    """
+    
+    DRIFT = 0.05
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._impacts: Dict[str, _TermImpacts] = {}
+    
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+    
+    def add_document(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous version."""
+        self.remove_document(doc_id)
+        terms = Counter(tokenize(text))
+        if not terms:
+            return
+        length = sum(terms.values())
+        postings = self._postings
+        length_norm = self.k1 * (1 - self.b)
+        for term, frequency in terms.items():
+            term_postings = postings.get(term)
+            if term_postings is None:
+                postings[term] = {doc_id: frequency}
+                continue
+            term_postings[doc_id] = frequency
+            cached = self._impacts.get(term)
+            if cached is not None:
+                cached.impacts[doc_id] = cached.weight * frequency / (
+                    frequency + length_norm + cached.length_scale * length
+                )
+                cached.ranked = None
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+    
+    def remove_document(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._impacts.pop(term, None)
+                continue
+            cached = self._impacts.get(term)
+            if cached is not None:
+                cached.impacts.pop(doc_id, None)
+                cached.ranked = None
+        self._total_length -= self._doc_lengths.pop(doc_id)
+    
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._impacts.clear()
+        self._total_length = 0
+    
+    def _drifted(self, cached: _TermImpacts, count: int, average_length: float, df: int) -> bool:
+        drift = self.DRIFT
+        return (abs(cached.count - count) > drift * count
+                or abs(cached.average_length - average_length) > drift * average_length
+                or abs(cached.df - df) > drift * df)
+    
+    def _term_impacts(self, term: str) -> _TermImpacts:
+        """BM25 contribution of ``term`` for each document containing it."""
+        postings = self._postings[term]
+        count = len(self._doc_lengths)
+        average_length = self._total_length / count
+        cached = self._impacts.get(term)
+        if cached is not None and not self._drifted(cached, count, average_length, len(postings)):
+            return cached
+        
+        k1 = self.k1
+        length_norm = k1 * (1 - self.b)
+        length_scale = k1 * self.b / average_length
+        idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+        weight = idf * (k1 + 1)
+        lengths = self._doc_lengths
+        impacts = {
+            doc_id: weight * frequency / (frequency + length_norm + length_scale * lengths[doc_id])
+            for doc_id, frequency in postings.items()
+        }
+        cached = _TermImpacts(count, average_length, len(postings), weight, length_scale, impacts)
+        self._impacts[term] = cached
+        return cached
+    
+    def search(self, query: str, limit: int = 20,
+               candidates: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Top ``limit`` ``(doc_id, score)`` pairs for a query, best first.
+        
+        ``candidates`` restricts results to the given document IDs.
+        """
+        terms = [term for term in set(tokenize(query)) if term in self._postings]
+        if not terms:
+            return []
+        per_term = [self._term_impacts(term) for term in terms]
+        
+        if len(per_term) == 1:
+            cached = per_term[0]
+            if cached.ranked is None:
+                cached.ranked = sorted(cached.impacts.items(), key=lambda item: item[1], reverse=True)
+            if candidates is None:
+                return cached.ranked[:limit]
+            return [item for item in cached.ranked if item[0] in candidates][:limit]
+        
+        # Start from a copy of the largest postings list, fold in the others
+        per_term.sort(key=lambda cached: len(cached.impacts), reverse=True)
+        scores = dict(per_term[0].impacts)
+        for cached in per_term[1:]:
+            get = scores.get
+            for doc_id, impact in cached.impacts.items():
+                scores[doc_id] = get(doc_id, 0.0) + impact
+        items = scores.items()
+        if candidates is not None:
+            items = [item for item in items if item[0] in candidates]
+        return heapq.nlargest(limit, items, key=lambda item: item[1])
+
+
+class TaskSearchIndex(InvertedIndex):
+    """Full-text index over task ``content`` and ``description``.
+    
+    Implements the task store index protocol, so it follows every add,
+    update, move and completion the store sees.
+    """
+    
+    @staticmethod
+    def _text(task: Dict[str, Any]) -> str:
+        return f"{task.get('content') or ''} {task.get('description') or ''}"
+    
+    def add(self, task: Dict[str, Any]) -> None:
+        self.add_document(task["id"], self._text(task))
+    
+    def discard(self, task: Dict[str, Any]) -> None:
+        self.remove_document(task["id"])
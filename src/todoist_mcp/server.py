@@ -1,78 +1,273 @@
 """Todoist MCP Server implementation using unified API v1."""
 
-import json
-from typing import Any, Dict, Optional, List
+import asyncio
+import contextlib
+import datetime
+import functools
+import itertools
+import sys
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, List
 from fastmcp import FastMCP
 from .api_v1 import TodoistV1Client
+from .cache import ResponseCache, SharedResponseCache
+from .executor import ToolExecutor
+from .comments import comment_owner
+from .filters import FilterContext, compile_filter, due_date, sort_key
+from .names import KINDS
+from .resources import LABELS, PROJECT_SECTIONS, PROJECT_TASKS, PROJECTS, SECTIONS
+from .budget import Continuations, ResponseBudget, json_size
+from .coercion import coercing
+from .formats import encode, row_size
+from .projection import parse_fields, project_result, projection
+from .ranking import TaskScorer, top_k
+from .scheduler import prioritized
+from .tenants import Tenant, TenantRegistry, current_tenant, tenant_key, token_from_request
 from .auth import AuthManager
+from .warmup import CacheWarmer
 
 class TodoistMCPServer:
     """FastMCP server wrapping Todoist unified API v1."""
     
-    def __init__(self, token: Optional[str] = None):
-        """Initialize server with Todoist API token."""
+    def __init__(self, token: Optional[str] = None, shared_cache_path: Optional[str] = None,
+                 max_workers: int = 8, tool_limits: Optional[Dict[str, int]] = None,
+                 max_response_bytes: Optional[int] = None, max_response_items: Optional[int] = None,
+                 multi_tenant: bool = False, max_tenants: int = 256,
+                 tenant_cache_bytes: int = 8 * 1024 * 1024, response_cache: bool = False,
+                 tenant_memory_bytes: Optional[int] = 32 * 1024 * 1024):
+        """Initialize server with Todoist API token.
+        
+        GET responses are cached for a short time only with ``response_cache``
+        (in memory) or ``shared_cache_path``, which points all server
+        processes on a host at one SQLite response cache.
+        Tool calls run on a pool of ``max_workers`` threads; ``tool_limits``
+        caps concurrent calls per tool name pattern (default ``{"batch_*": 2}``).
+        List responses larger than ``max_response_bytes``/``max_response_items``
+        are cut and resumed with ``continue_response``.
+        
+        With ``multi_tenant`` the server holds no token of its own: each HTTP
+        session authenticates with ``Authorization: Bearer <token>`` and gets
+        its own client, cache (``tenant_cache_bytes``), rate budget and local
+        store from an LRU registry of at most ``max_tenants`` accounts.
+        Accounts whose store and indexes are estimated to need more than
+        ``tenant_memory_bytes`` are dropped and refused for an hour.
+        """
         self.mcp = FastMCP("Todoist MCP Server")
+        self._session_keys: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+        self._session_numbers = itertools.count(1)
+        self.executor = ToolExecutor(max_workers=max_workers, limits=tool_limits,
+                                     session_key=self._session_key)
+        self.shared_cache_path = shared_cache_path
+        self.response_cache = response_cache
+        self.multi_tenant = multi_tenant
+        self.tenant_cache_bytes = tenant_cache_bytes
         
-        if token:
-            api_token = token
+        if multi_tenant:
+            self.tenants: Optional[TenantRegistry] = TenantRegistry(
+                self._create_tenant, max_tenants=max_tenants, max_tenant_bytes=tenant_memory_bytes
+            )
+            self._default_tenant: Optional[Tenant] = None
         else:
-            auth_manager = AuthManager()
-            api_token = auth_manager.get_token()
+            if token:
+                api_token = token
+            else:
+                auth_manager = AuthManager()
+                api_token = auth_manager.get_token()
+            self.tenants = None
+            self._default_tenant = self._create_tenant(api_token, tenant_key(api_token))
         
-        self.api = TodoistV1Client(api_token)
+        self.response_budget = ResponseBudget(max_response_bytes, max_response_items)
+        self.continuations = Continuations()
+        self.warmer: Optional[CacheWarmer] = None
         self._register_core_tools()
+        self._register_local_tools()
+        self._register_resources()
+    
+    def _session_key(self) -> str:
+        """Fair-queueing key of the MCP session making the current call."""
+        try:
+            session = self.mcp._mcp_server.request_context.session
+        except LookupError:
+            return "local"
+        # Numbered on first sight; id() could be reused by a later session
+        key = self._session_keys.get(session)
+        if key is None:
+            key = self._session_keys[session] = f"session-{next(self._session_numbers)}"
+        return key
+    
+    def _create_tenant(self, token: str, key: str) -> Tenant:
+        """Client, store and indexes for one API token."""
+        client_options: Dict[str, Any] = {}
+        if self.shared_cache_path:
+            client_options["cache"] = SharedResponseCache(self.shared_cache_path, namespace=key)
+        elif self.response_cache and self.multi_tenant:
+            client_options["cache"] = ResponseCache(max_bytes=self.tenant_cache_bytes)
+        elif self.response_cache:
+            client_options["cache"] = ResponseCache()
+        return Tenant(TodoistV1Client(token, **client_options), key=key)
+    
+    @property
+    def tenant(self) -> Tenant:
+        """The account the current call acts for."""
+        tenant = current_tenant.get()
+        if tenant is not None:
+            return tenant
+        if self._default_tenant is None:
+            raise ValueError("No tenant for this call; send 'Authorization: Bearer <Todoist API token>'")
+        return self._default_tenant
+    
+    @property
+    def api(self) -> TodoistV1Client:
+        """The current account's API client; other per-account state is on :attr:`tenant`."""
+        return self.tenant.api
+    
+    @contextlib.contextmanager
+    def _request_tenant(self) -> Iterator[Tenant]:
+        """The tenant for the current request: the default one, or by bearer token."""
+        if not self.multi_tenant:
+            yield self.tenant
+            return
+        with self.tenants.acquire(token_from_request()) as tenant:
+            yield tenant
+    
+    @contextlib.asynccontextmanager
+    async def _request_tenant_async(self) -> AsyncIterator[Tenant]:
+        """:meth:`_request_tenant` for handlers on the event loop.
+        
+        Building a new tenant, and closing evicted ones, happens on a worker
+        thread; the body of the block still runs on the loop.
+        """
+        context = self._request_tenant()
+        tenant = await asyncio.to_thread(context.__enter__)
+        try:
+            yield tenant
+        except BaseException:
+            if not await asyncio.to_thread(context.__exit__, *sys.exc_info()):
+                raise
+        else:
+            await asyncio.to_thread(context.__exit__, None, None, None)
+    
+    def _bind_tenant(self, fn):
+        """In multi-tenant mode, run ``fn`` as the tenant named by the request's token."""
+        if not self.multi_tenant:
+            return fn
+        
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            with self._request_tenant() as tenant:
+                reset = current_tenant.set(tenant)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    current_tenant.reset(reset)
+        return call
+    
+    def _tool(self, name: str):
+        """Register a blocking tool function that runs on the tool executor.
+        
+        Arguments are coerced and validated (JSON-string lists, integers, IDs)
+        by a coercer compiled from the function's signature here, once.
+        """
+        def register(fn):
+            return self.mcp.tool(name=name)(self.executor.wrap(name, self._bind_tenant(prioritized(name, coercing(fn)))))
+        return register
+    
+    def _resource(self, uri: str, name: str):
+        """Register a blocking resource (or template) reader that runs on the tool executor."""
+        def register(fn):
+            return self.mcp.resource(uri, name=name, mime_type="application/json")(
+                self.executor.wrap(f"resource:{name}", self._bind_tenant(fn))
+            )
+        return register
+    
+    def _list_result(self, result: Any, format: Optional[str], fields: Optional[str],
+                     max_bytes: Optional[int] = None, max_items: Optional[int] = None,
+                     budget: Optional[ResponseBudget] = None) -> Any:
+        """Cut a list response to the response budget and encode it in ``format``.
+        
+        ``budget`` replaces the server's budget, e.g. with the one a
+        continuation was cut with; per-call limits can only tighten it.
+        """
+        budget = (budget or self.response_budget).merge(max_bytes, max_items)
+        rows = result.get("results") if isinstance(result, dict) else None
+        size = row_size(rows, format, fields) if isinstance(rows, list) else json_size
+        page = self.continuations.cut(result, budget, size, {
+            "format": format, "fields": fields, "budget": budget, "tenant": self.tenant.key,
+        })
+        return encode(page, format, fields)
     
     def _register_core_tools(self):
         """Register core Todoist API tools with pagination support."""
         
-        @self.mcp.tool(name="get_projects")
-        async def get_projects(limit: Optional[int] = None, cursor: Optional[str] = None):
-            """Get projects with optional pagination."""
-            return self.api.get_projects(limit=limit, cursor=cursor)
+        @self._tool("get_projects")
+        def get_projects(limit: Optional[int] = None, cursor: Optional[str] = None,
+                         fields: Optional[str] = None, format: Optional[str] = "json",
+                         max_bytes: Optional[int] = None, max_items: Optional[int] = None):
+            """Get projects with optional pagination.
+            
+            ``fields`` selects the fields to return; ``format`` is 'json', or
+            'columns'/'tsv' for a header plus one row of values per project.
+            Responses over ``max_bytes``/``max_items`` are cut; resume them with
+            ``continue_response``.
+            """
+            return self._list_result(self.tenant.api.get_projects(limit=limit, cursor=cursor),
+                                     format, fields, max_bytes, max_items)
         
-        @self.mcp.tool(name="get_project")
-        async def get_project(project_id: str):
-            """Get a single project by ID."""
-            return self.api.get_project(project_id=project_id)
+        @self._tool("get_project")
+        def get_project(project_id: str, fields: Optional[str] = None):
+            """Get a single project by ID; ``fields`` selects the fields to return."""
+            return project_result(self.tenant.api.get_project(project_id=project_id), projection(fields))
         
-        @self.mcp.tool(name="add_project")
-        async def add_project(name: str, parent_id: Optional[str] = None, color: Optional[str] = None):
+        @self._tool("add_project")
+        def add_project(name: str, parent_id: Optional[str] = None, color: Optional[str] = None):
             """Create a new project."""
-            return self.api.add_project(name=name, parent_id=parent_id, color=color)
+            return self.tenant.api.add_project(name=name, parent_id=parent_id, color=color)
         
-        @self.mcp.tool(name="get_tasks")
-        async def get_tasks(
+        @self._tool("get_tasks")
+        def get_tasks(
             project_id: Optional[str] = None,
             section_id: Optional[str] = None,
             parent_id: Optional[str] = None,
-            label_ids: Optional[str] = None,  # JSON string like '["important"]'
+            label_ids: Optional[str] = None,  # JSON string like '["important"]' (names or IDs)
             limit: Optional[int] = None,
-            cursor: Optional[str] = None
+            cursor: Optional[str] = None,
+            fields: Optional[str] = None,  # JSON string like '["id", "content", "due.date"]'
+            format: Optional[str] = "json",  # "json", "columns" or "tsv"
+            max_bytes: Optional[int] = None,
+            max_items: Optional[int] = None
         ):
-            """Get tasks with optional pagination and filters."""
+            """Get tasks with optional pagination and filters.
+            
+            ``label_ids`` accepts label names or label IDs; tasks must carry all of them.
+            ``fields`` selects the task fields to return, e.g. '["id", "content", "due.date"]'.
+            ``format`` 'columns' or 'tsv' returns a header plus one row of values per task.
+            Responses over ``max_bytes``/``max_items`` are cut; resume them with
+            ``continue_response``.
+            """
             filters = {}
             if section_id:
                 filters["section_id"] = section_id
             if parent_id:
                 filters["parent_id"] = parent_id
+            
+            labels = None
             if label_ids:
-                filters["label_ids"] = label_ids  # Pass as-is (JSON string)
+                labels = self.tenant.api.resolve_label_names(label_ids)
+                filters["label"] = labels[0]
             
-            result = self.api.get_tasks(
-                project_id=project_id,
-                limit=limit,
-                cursor=cursor,
-                **filters
-            )
-            return result
+            # Answered from the local store or upstream, whichever is cheaper
+            return self._list_result(self.tenant.planner.get_tasks(
+                self.tenant.api, project_id=project_id, section_id=section_id, parent_id=parent_id,
+                labels=labels, limit=limit, cursor=cursor, upstream_filters=filters
+            ), format, fields, max_bytes, max_items)
         
-        @self.mcp.tool(name="get_task")
-        async def get_task(task_id: str):
-            """Get a single task by ID."""
-            return self.api.get_task(task_id=task_id)
+        @self._tool("get_task")
+        def get_task(task_id: str, fields: Optional[str] = None):
+            """Get a single task by ID; ``fields`` selects the fields to return."""
+            return project_result(self.tenant.api.get_task(task_id=task_id), projection(fields))
         
-        @self.mcp.tool(name="add_task")
-        async def add_task(content: str, description: Optional[str] = None, 
+        @self._tool("add_task")
+        def add_task(content: str, description: Optional[str] = None, 
                          project_id: Optional[str] = None, section_id: Optional[str] = None,
                          parent_id: Optional[str] = None, order: Optional[int] = None,
                          labels: Optional[str] = None,  # JSON string like '["urgent", "work"]'
@@ -82,29 +277,16 @@ class TodoistMCPServer:
                          assignee_id: Optional[str] = None, duration: Optional[int] = None,
                          duration_unit: Optional[str] = None):
             """Create a new task."""
-            # Parse labels from JSON string if provided
-            parsed_labels = None
-            if labels:
-                if isinstance(labels, str):
-                    try:
-                        parsed_labels = json.loads(labels)
-                    except json.JSONDecodeError:
-                        # If it's not valid JSON, treat it as a single label
-                        parsed_labels = [labels]
-                else:
-                    # Already a list, use as-is
-                    parsed_labels = labels
-            
-            return self.api.add_task(
+            return self.tenant.api.add_task(
                 content=content, description=description, project_id=project_id,
                 section_id=section_id, parent_id=parent_id, order=order,
-                labels=parsed_labels, priority=priority, due_string=due_string,
+                labels=labels, priority=priority, due_string=due_string,
                 due_date=due_date, due_datetime=due_datetime, due_lang=due_lang,
                 assignee_id=assignee_id, duration=duration, duration_unit=duration_unit
             )
         
-        @self.mcp.tool(name="update_task")
-        async def update_task(task_id: str, content: Optional[str] = None,
+        @self._tool("update_task")
+        def update_task(task_id: str, content: Optional[str] = None,
                             description: Optional[str] = None, 
                             labels: Optional[str] = None,  # JSON string like '["urgent", "work"]'
                             priority: Optional[int] = None, due_string: Optional[str] = None,
@@ -112,179 +294,148 @@ class TodoistMCPServer:
                             due_lang: Optional[str] = None, assignee_id: Optional[str] = None,
                             duration: Optional[int] = None, duration_unit: Optional[str] = None):
             """Update an existing task."""
-            # Parse labels from JSON string if provided
-            parsed_labels = None
-            if labels:
-                if isinstance(labels, str):
-                    try:
-                        parsed_labels = json.loads(labels)
-                    except json.JSONDecodeError:
-                        # If it's not valid JSON, treat it as a single label
-                        parsed_labels = [labels]
-                else:
-                    # Already a list, use as-is
-                    parsed_labels = labels
-            
-            return self.api.update_task(
+            return self.tenant.api.update_task(
                 task_id=task_id, content=content, description=description,
-                labels=parsed_labels, priority=priority, due_string=due_string,
+                labels=labels, priority=priority, due_string=due_string,
                 due_date=due_date, due_datetime=due_datetime, due_lang=due_lang,
                 assignee_id=assignee_id, duration=duration, duration_unit=duration_unit
             )
         
-        @self.mcp.tool(name="get_comments")
-        async def get_comments(
+        @self._tool("get_comments")
+        def get_comments(
             task_id: Optional[str] = None,
             project_id: Optional[str] = None,
             limit: Optional[int] = None,
-            cursor: Optional[str] = None
+            cursor: Optional[str] = None,
+            fields: Optional[str] = None,  # JSON string like '["id", "content"]'
+            format: Optional[str] = "json",  # "json", "columns" or "tsv"
+            max_bytes: Optional[int] = None,
+            max_items: Optional[int] = None
         ):
             """Get comments for a task or project with optional pagination."""
-            return self.api.get_comments(
+            return self._list_result(self.tenant.api.get_comments(
                 task_id=task_id, project_id=project_id,
                 limit=limit, cursor=cursor
-            )
+            ), format, fields, max_bytes, max_items)
         
-        @self.mcp.tool(name="add_comment")
-        async def add_comment(
+        @self._tool("add_comment")
+        def add_comment(
             content: str,
             task_id: Optional[str] = None,
             project_id: Optional[str] = None
         ):
             """Add a comment to a task or project."""
-            return self.api.add_comment(
+            return self.tenant.api.add_comment(
                 content=content, task_id=task_id, project_id=project_id
             )
         
-        @self.mcp.tool(name="get_comment")
-        async def get_comment(comment_id: str):
-            """Get a single comment by ID."""
-            return self.api.get_comment(comment_id=comment_id)
+        @self._tool("get_comment")
+        def get_comment(comment_id: str, fields: Optional[str] = None):
+            """Get a single comment by ID; ``fields`` selects the fields to return."""
+            return project_result(self.tenant.api.get_comment(comment_id=comment_id), projection(fields))
         
-        @self.mcp.tool(name="update_comment")
-        async def update_comment(comment_id: str, content: str):
+        @self._tool("update_comment")
+        def update_comment(comment_id: str, content: str):
             """Update an existing comment."""
-            return self.api.update_comment(
+            return self.tenant.api.update_comment(
                 comment_id=comment_id, content=content
             )
         
-        @self.mcp.tool(name="delete_comment")
-        async def delete_comment(comment_id: str):
+        @self._tool("delete_comment")
+        def delete_comment(comment_id: str):
             """Delete a comment."""
-            return self.api.delete_comment(comment_id=comment_id)
+            return self.tenant.api.delete_comment(comment_id=comment_id)
         
-        @self.mcp.tool(name="move_task")
-        async def move_task(
+        @self._tool("move_task")
+        def move_task(
             task_id: str,
             project_id: Optional[str] = None,
             section_id: Optional[str] = None,
             parent_id: Optional[str] = None
         ):
             """Move a task to a different project, section, or parent."""
-            return self.api.move_task(
+            return self.tenant.api.move_task(
                 task_id=task_id,
                 project_id=project_id,
                 section_id=section_id,
                 parent_id=parent_id
             )
         
-        @self.mcp.tool(name="get_labels")
-        async def get_labels(
+        @self._tool("get_labels")
+        def get_labels(
             limit: Optional[int] = None,
-            cursor: Optional[str] = None
+            cursor: Optional[str] = None,
+            fields: Optional[str] = None,  # JSON string like '["id", "name"]'
+            format: Optional[str] = "json",  # "json", "columns" or "tsv"
+            max_bytes: Optional[int] = None,
+            max_items: Optional[int] = None
         ):
             """Get labels with optional pagination."""
-            return self.api.get_labels(limit=limit, cursor=cursor)
+            return self._list_result(self.tenant.api.get_labels(limit=limit, cursor=cursor),
+                                     format, fields, max_bytes, max_items)
         
-        @self.mcp.tool(name="get_label")
-        async def get_label(label_id: str):
-            """Get a single label by ID."""
-            return self.api.get_label(label_id=label_id)
+        @self._tool("get_label")
+        def get_label(label_id: str, fields: Optional[str] = None):
+            """Get a single label by ID; ``fields`` selects the fields to return."""
+            return project_result(self.tenant.api.get_label(label_id=label_id), projection(fields))
         
-        @self.mcp.tool(name="add_label")
-        async def add_label(
+        @self._tool("add_label")
+        def add_label(
             name: str,
             color: Optional[str] = None,
             order: Optional[int] = None
         ):
             """Create a new label."""
-            return self.api.add_label(name=name, color=color, order=order)
+            return self.tenant.api.add_label(name=name, color=color, order=order)
         
-        @self.mcp.tool(name="update_label")
-        async def update_label(
+        @self._tool("update_label")
+        def update_label(
             label_id: str,
             name: Optional[str] = None,
             color: Optional[str] = None,
             order: Optional[int] = None
         ):
             """Update an existing label."""
-            return self.api.update_label(
+            return self.tenant.api.update_label(
                 label_id=label_id,
                 name=name,
                 color=color,
                 order=order
             )
         
-        @self.mcp.tool(name="delete_label")
-        async def delete_label(label_id: str):
+        @self._tool("delete_label")
+        def delete_label(label_id: str):
             """Delete a label."""
-            return self.api.delete_label(label_id=label_id)
+            return self.tenant.api.delete_label(label_id=label_id)
         
-        @self.mcp.tool(name="batch_move_tasks")
-        async def batch_move_tasks(
+        @self._tool("batch_move_tasks")
+        def batch_move_tasks(
             task_ids: str,  # JSON string like '["task1", "task2"]'
             project_id: Optional[str] = None,
             section_id: Optional[str] = None
         ):
             """Batch move multiple tasks to a project or section."""
-            # Parse task_ids from JSON string
-            parsed_task_ids = json.loads(task_ids) if isinstance(task_ids, str) else task_ids
-            
-            return self.api.batch_move_tasks(
-                task_ids=parsed_task_ids,
+            return self.tenant.api.batch_move_tasks(
+                task_ids=task_ids,
                 project_id=project_id,
                 section_id=section_id
             )
         
-        @self.mcp.tool(name="batch_update_labels")
-        async def batch_update_labels(
+        @self._tool("batch_update_labels")
+        def batch_update_labels(
             task_ids: str,  # JSON string like '["task1", "task2"]'
             add_labels: Optional[str] = None,  # JSON string like '["urgent", "work"]'
             remove_labels: Optional[str] = None  # JSON string like '["old-label"]'
         ):
             """Batch update labels for multiple tasks."""
-            # Parse task_ids from JSON string
-            parsed_task_ids = json.loads(task_ids) if isinstance(task_ids, str) else task_ids
-            
-            # Parse labels from JSON strings if provided
-            parsed_add_labels = None
-            if add_labels:
-                if isinstance(add_labels, str):
-                    try:
-                        parsed_add_labels = json.loads(add_labels)
-                    except json.JSONDecodeError:
-                        parsed_add_labels = [add_labels]
-                else:
-                    parsed_add_labels = add_labels
-            
-            parsed_remove_labels = None
-            if remove_labels:
-                if isinstance(remove_labels, str):
-                    try:
-                        parsed_remove_labels = json.loads(remove_labels)
-                    except json.JSONDecodeError:
-                        parsed_remove_labels = [remove_labels]
-                else:
-                    parsed_remove_labels = remove_labels
-            
-            return self.api.batch_update_labels(
-                task_ids=parsed_task_ids,
-                add_labels=parsed_add_labels,
-                remove_labels=parsed_remove_labels
+            return self.tenant.api.batch_update_labels(
+                task_ids=task_ids,
+                add_labels=add_labels,
+                remove_labels=remove_labels
             )
         
-        @self.mcp.tool(name="batch_update_tasks")
-        async def batch_update_tasks(
+        @self._tool("batch_update_tasks")
+        def batch_update_tasks(
             task_ids: str,  # JSON string like '["task1", "task2"]'
             content: Optional[str] = None,
             description: Optional[str] = None,
@@ -299,85 +450,410 @@ class TodoistMCPServer:
             duration_unit: Optional[str] = None
         ):
             """Batch update multiple tasks with same properties."""
-            # Parse task_ids from JSON string
-            parsed_task_ids = json.loads(task_ids) if isinstance(task_ids, str) else task_ids
-            
-            # Parse labels from JSON string if provided
-            parsed_labels = None
-            if labels:
-                if isinstance(labels, str):
-                    try:
-                        parsed_labels = json.loads(labels)
-                    except json.JSONDecodeError:
-                        parsed_labels = [labels]
-                else:
-                    parsed_labels = labels
-            
-            kwargs = self.api._build_params(
-                content=content, description=description, labels=parsed_labels,
+            kwargs = self.tenant.api._build_params(
+                content=content, description=description, labels=labels,
                 priority=priority, due_string=due_string, due_date=due_date,
                 due_datetime=due_datetime, due_lang=due_lang,
                 assignee_id=assignee_id, duration=duration,
                 duration_unit=duration_unit
             )
-            return self.api.batch_update_tasks(task_ids=parsed_task_ids, **kwargs)
+            return self.tenant.api.batch_update_tasks(task_ids=task_ids, **kwargs)
         
-        @self.mcp.tool(name="batch_complete_tasks")
-        async def batch_complete_tasks(task_ids: str):  # JSON string like '["task1", "task2"]'
+        @self._tool("batch_complete_tasks")
+        def batch_complete_tasks(task_ids: str):  # JSON string like '["task1", "task2"]'
             """Batch complete multiple tasks."""
-            # Parse task_ids from JSON string
-            parsed_task_ids = json.loads(task_ids) if isinstance(task_ids, str) else task_ids
-            
-            return self.api.batch_complete_tasks(task_ids=parsed_task_ids)
+            return self.tenant.api.batch_complete_tasks(task_ids=task_ids)
         
-
-        @self.mcp.tool(name="get_sections")
-        async def get_sections(
+        
+        @self._tool("get_sections")
+        def get_sections(
             project_id: str,
             limit: Optional[int] = None,
-            cursor: Optional[str] = None
+            cursor: Optional[str] = None,
+            fields: Optional[str] = None,  # JSON string like '["id", "name"]'
+            format: Optional[str] = "json",  # "json", "columns" or "tsv"
+            max_bytes: Optional[int] = None,
+            max_items: Optional[int] = None
         ):
             """Get all sections for a project with optional pagination."""
-            return self.api.get_sections(
+            return self._list_result(self.tenant.api.get_sections(
                 project_id=project_id,
                 limit=limit or 100,
                 cursor=cursor
-            )
+            ), format, fields, max_bytes, max_items)
         
-        @self.mcp.tool(name="get_section")
-        async def get_section(section_id: str):
-            """Get a single section by ID."""
-            return self.api.get_section(section_id=section_id)
+        @self._tool("get_section")
+        def get_section(section_id: str, fields: Optional[str] = None):
+            """Get a single section by ID; ``fields`` selects the fields to return."""
+            return project_result(self.tenant.api.get_section(section_id=section_id), projection(fields))
         
-        @self.mcp.tool(name="add_section")
-        async def add_section(
+        @self._tool("add_section")
+        def add_section(
             project_id: str,
             name: str,
             order: Optional[int] = None
         ):
             """Create a new section."""
-            return self.api.add_section(
+            return self.tenant.api.add_section(
                 project_id=project_id,
                 name=name,
                 order=order
             )
         
-        @self.mcp.tool(name="update_section")
-        async def update_section(section_id: str, name: str):
+        @self._tool("update_section")
+        def update_section(section_id: str, name: str):
             """Update an existing section."""
-            return self.api.update_section(
+            return self.tenant.api.update_section(
                 section_id=section_id,
                 name=name
             )
         
-        @self.mcp.tool(name="delete_section")
-        async def delete_section(section_id: str):
+        @self._tool("delete_section")
+        def delete_section(section_id: str):
             """Delete a section."""
-            return self.api.delete_section(section_id=section_id)
+            return self.tenant.api.delete_section(section_id=section_id)
+        
+        @self._tool("get_cache_stats")
+        def get_cache_stats():
+            """Get cache hit ratio, memory usage and evictions per entity type."""
+            return self.tenant.api.cache_stats()
+        
+        @self._tool("get_executor_stats")
+        def get_executor_stats():
+            """Get tool thread pool usage: active and queued calls overall, per tool and per session."""
+            stats = self.executor.stats()
+            stats["upstream"] = self.tenant.api.scheduler_stats()
+            if self.tenants is not None:
+                stats["tenants"] = self.tenants.stats()
+            return stats
+        
+        @self._tool("continue_response")
+        def continue_response(handle: str, max_bytes: Optional[int] = None, max_items: Optional[int] = None):
+            """Get the next part of a list response that was cut to the response budget.
+            
+            ``handle`` is the ``continuation`` of the previous part; the items are
+            served from memory, without reading upstream again. Limits given on the
+            first call still apply; ``max_bytes``/``max_items`` can tighten them.
+            """
+            continuation = self.continuations.take(handle, tenant=self.tenant.key)
+            return self._list_result(continuation.result, continuation.state.get("format"),
+                                     continuation.state.get("fields"), max_bytes, max_items,
+                                     budget=continuation.state.get("budget"))
+    
+    def _register_local_tools(self):
+        """Register tools answered from the local task store."""
+        
+        @self._tool("filter_tasks")
+        def filter_tasks(query: str, limit: Optional[int] = None, fields: Optional[str] = None,
+                         format: Optional[str] = "json", max_bytes: Optional[int] = None,
+                         max_items: Optional[int] = None):
+            """Filter tasks with Todoist filter syntax, e.g. 'today & #Work' or '(p1 | p2) & !@waiting'.
+            
+            Escape operator characters in names with a backslash, e.g. '#R\\&D'.
+            """
+            store = self.tenant.store
+            store.ensure_fresh()
+            results = sorted(compile_filter(query).select(store), key=sort_key)
+            count = len(results)
+            if limit:
+                results = results[:limit]
+            return self._list_result({"results": results, "count": count},
+                                     format, fields, max_bytes, max_items)
+        
+        @self._tool("search_tasks")
+        def search_tasks(query: str, filter: Optional[str] = None, limit: Optional[int] = 20,
+                         fields: Optional[str] = None):
+            """Full-text search over task content and descriptions, ranked by relevance (BM25).
+            
+            Optionally restrict results with a Todoist filter expression;
+            ``fields`` selects the task fields to return (the score is always included).
+            """
+            select = projection(fields) or dict
+            tenant = self.tenant
+            tenant.store.ensure_fresh()
+            with tenant.store.lock:
+                candidates = None
+                if filter:
+                    candidates = {task["id"] for task in compile_filter(filter).select(tenant.store)}
+                hits = tenant.search_index.search(query, limit=limit or 20, candidates=candidates)
+                results = [
+                    dict(select(tenant.store.tasks[task_id]), score=round(score, 4))
+                    for task_id, score in hits
+                ]
+            return {"results": results}
+        
+        @self._tool("resolve_names")
+        def resolve_names(
+            names: str,  # JSON string like '["Q3 planning", "waiting"]'
+            types: Optional[str] = None,  # JSON string like '["project", "label"]'
+            limit: Optional[int] = 3
+        ):
+            """Resolve fuzzy project, section and label names to IDs, best matches first."""
+            unknown = set(types or ()) - set(KINDS.values())
+            if unknown:
+                raise ValueError(f"Unknown types: {sorted(unknown)}")
+            
+            tenant = self.tenant
+            tenant.store.ensure_fresh()
+            return {
+                "results": {
+                    name: tenant.names.resolve(name, kinds=types, limit=limit or 3)
+                    for name in names or ()
+                }
+            }
+        
+        @self._tool("search_comments")
+        def search_comments(
+            query: str,
+            project_ids: Optional[str] = None,  # JSON string like '["proj1", "proj2"]'
+            limit: Optional[int] = 20,
+            fields: Optional[str] = None  # JSON string like '["id", "content"]'
+        ):
+            """Full-text search over task and project comments, ranked by relevance.
+            
+            Comments of the given projects (all projects by default) are ingested
+            first; only tasks whose comment count changed are re-fetched.
+            ``fields`` selects the comment fields to return (score and owner are
+            always included).
+            """
+            select = projection(fields) or dict
+            tenant = self.tenant
+            if not project_ids:
+                tenant.store.ensure_fresh()
+                project_ids = list(tenant.store.projects)
+            
+            tenant.comment_index.ingest(project_ids)
+            results = []
+            for comment, score in tenant.comment_index.search(
+                query, limit=limit or 20, project_ids=project_ids
+            ):
+                kind, owner_id = comment_owner(comment)
+                if kind == "task":
+                    task = tenant.store.get_task(owner_id) or {}
+                    owner = {"type": "task", "id": owner_id, "content": task.get("content")}
+                else:
+                    project = tenant.store.projects.get(owner_id) or {}
+                    owner = {"type": "project", "id": owner_id, "name": project.get("name")}
+                results.append(dict(select(comment), score=round(score, 4), owner=owner))
+            return {"results": results}
+        
+        @self._tool("agenda")
+        def agenda(
+            start: Optional[str] = None,
+            days: Optional[int] = 7,
+            filter: Optional[str] = None,
+            include_overdue: Optional[bool] = False,
+            fields: Optional[str] = None  # JSON string like '["id", "content", "due.date"]'
+        ):
+            """Tasks due in a date window, bucketed by day.
+            
+            ``start`` is an ISO date (default today); ``filter`` is an optional
+            Todoist filter expression applied to the tasks in the window;
+            ``fields`` selects the task fields to return.
+            """
+            project = projection(fields) or dict
+            days = days or 7
+            if days < 1:
+                raise ValueError("days must be at least 1")
+            first = datetime.date.fromisoformat(start) if start else datetime.date.today()
+            last = first + datetime.timedelta(days=days - 1)
+            compiled = compile_filter(filter) if filter else None
+            
+            store = self.tenant.store
+            store.ensure_fresh()
+            with store.lock:
+                ctx = FilterContext(store)
+                
+                def select(task_ids):
+                    tasks = store.iter_tasks(task_ids)
+                    if compiled:
+                        tasks = [task for task in tasks if compiled.matches(task, ctx)]
+                    return tasks
+                
+                buckets: Dict[str, List[Dict[str, Any]]] = {}
+                for task in select(store.by_due.between_dates(first, last)):
+                    buckets.setdefault(due_date(task).isoformat(), []).append(project(task))
+                result = {
+                    "start": first.isoformat(),
+                    "end": last.isoformat(),
+                    "days": [{"date": date, "tasks": tasks} for date, tasks in buckets.items()],
+                }
+                if include_overdue:
+                    result["overdue"] = [project(task) for task in select(
+                        store.by_due.between_dates(None, first - datetime.timedelta(days=1))
+                    )]
+            return result
+        
+        @self._tool("get_task_tree")
+        def get_task_tree(
+            task_id: str,
+            depth: Optional[int] = None,
+            fields: Optional[str] = None  # JSON string like '["id", "content", "due.date"]'
+        ):
+            """Get a task with its whole subtask tree in one call.
+            
+            ``depth`` limits how many levels of subtasks are included (0 returns
+            only the task); ``fields`` selects the task fields to return.
+            """
+            select = projection(fields)
+            store = self.tenant.store
+            store.ensure_fresh()
+            with store.lock:
+                task = store.get_task(task_id)
+                if task is None:
+                    raise ValueError(f"Task {task_id} not found among active tasks")
+                
+                def build(node: Dict[str, Any], level: int) -> Dict[str, Any]:
+                    result = dict(select(node) if select else node)
+                    if depth is None or level < depth:
+                        result["children"] = [build(child, level + 1)
+                                              for child in store.children(node["id"])]
+                    return result
+                
+                tree = build(task, 0)
+                tree["ancestor_ids"] = store.ancestor_ids(task_id)
+            return tree
+        
+        @self._tool("get_task_stats")
+        def get_task_stats(group_by: Optional[str] = "project"):
+            """Count open tasks grouped by one or two of: project, section, label, priority, assignee.
+            
+            ``group_by`` is a dimension name or a pair, e.g. 'project,priority'.
+            """
+            dimensions = parse_fields(group_by or "project")
+            tenant = self.tenant
+            tenant.store.ensure_fresh()
+            with tenant.store.lock:
+                groups = []
+                for group, count in tenant.task_counts.counts(dimensions):
+                    row = {}
+                    for dimension, value in group.items():
+                        if dimension == "project":
+                            row["project_id"] = value
+                            row["project"] = (tenant.store.projects.get(value) or {}).get("name")
+                        elif dimension == "section":
+                            row["section_id"] = value
+                            row["section"] = (tenant.store.sections.get(value) or {}).get("name")
+                        elif dimension == "assignee":
+                            row["assignee_id"] = value
+                        else:
+                            row[dimension] = value
+                    row["count"] = count
+                    groups.append(row)
+                total = tenant.task_counts.total
+            groups.sort(key=lambda row: row["count"], reverse=True)
+            return {"group_by": list(dimensions), "total": total, "groups": groups}
+        
+        @self._tool("top_tasks")
+        def top_tasks(
+            k: Optional[int] = 10,
+            filter: Optional[str] = None,
+            weights: Optional[str] = None,  # JSON string like '{"priority": 2, "labels": {"urgent": 1}}'
+            fields: Optional[str] = None  # JSON string like '["id", "content", "due.date"]'
+        ):
+            """The K most important open tasks by priority, due proximity, overdue-ness and labels.
+            
+            ``weights`` overrides the score weights (priority, due, overdue) and
+            adds per-label weights; ``filter`` restricts the tasks considered;
+            ``fields`` selects the task fields to return (the score is always included).
+            """
+            select = projection(fields) or dict
+            k = k or 10
+            if k < 1:
+                raise ValueError("k must be at least 1")
+            scorer = TaskScorer(weights)
+            
+            store = self.tenant.store
+            store.ensure_fresh()
+            with store.lock:
+                if filter:
+                    tasks = compile_filter(filter).select(store, now=scorer.now)
+                else:
+                    tasks = store.iter_tasks()
+                ranked = top_k(tasks, k, scorer)
+            return {
+                "results": [dict(select(task), score=round(score, 4)) for task, score in ranked],
+                "considered": len(tasks),
+            }
+    
+    def _register_resources(self):
+        """Expose projects, labels, sections and project task lists as subscribable resources."""
+        
+        @self._resource(PROJECTS, "projects")
+        def projects():
+            """All active projects."""
+            return self.tenant.resources.read(PROJECTS)
+        
+        @self._resource(LABELS, "labels")
+        def labels():
+            """All personal labels."""
+            return self.tenant.resources.read(LABELS)
+        
+        @self._resource(SECTIONS, "sections")
+        def sections():
+            """All sections of active projects."""
+            return self.tenant.resources.read(SECTIONS)
+        
+        @self._resource(PROJECT_SECTIONS, "project_sections")
+        def project_sections(project_id: str):
+            """Sections of one project."""
+            return self.tenant.resources.read(PROJECT_SECTIONS, project_id=project_id)
+        
+        @self._resource(PROJECT_TASKS, "project_tasks")
+        def project_tasks(project_id: str):
+            """Active tasks of one project."""
+            return self.tenant.resources.read(PROJECT_TASKS, project_id=project_id)
+        
+        server = self.mcp._mcp_server
+        
+        @server.subscribe_resource()
+        async def subscribe(uri):
+            if not str(uri).startswith("todoist://"):
+                raise ValueError(f"Unknown resource: {uri}")
+            session = server.request_context.session
+            async with self._request_tenant_async() as tenant:
+                # Subscriptions are bound to the loop that serves the session
+                tenant.resources.subscribe(str(uri), session)
+        
+        @server.unsubscribe_resource()
+        async def unsubscribe(uri):
+            session = server.request_context.session
+            async with self._request_tenant_async() as tenant:
+                tenant.resources.unsubscribe(str(uri), session)
+        
+        # The low-level server always advertises subscribe=False and FastMCP
+        # has no hook for it; the mcp/fastmcp versions are pinned for this
+        # patch, and tests/test_resources.py checks it on every transport
+        get_capabilities = server.get_capabilities
+        
+        def get_capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+        server.get_capabilities = get_capabilities_with_subscribe
+    
+    def warm_cache(self) -> CacheWarmer:
+        """Start loading projects, labels, sections, recent tasks and the task store in the background."""
+        if self.multi_tenant:
+            raise ValueError("Cache warming needs a single token; tenants load their data on first use")
+        if not (self.response_cache or self.shared_cache_path):
+            raise ValueError("Cache warming needs a response cache (response_cache=True or shared_cache_path)")
+        if self.warmer is None:
+            self.warmer = CacheWarmer(self.tenant.api, store=self.tenant.store).start()
+        return self.warmer
     
-    def run(self, **kwargs):
-        """Run the server."""
+    def run(self, warm_cache: bool = False, **kwargs):
+        """Run the server, optionally warming the cache in the background."""
+        if warm_cache:
+            self.warm_cache()
         try:
             self.mcp.run(**kwargs)
         finally:
-            self.api.close()
+            if self.warmer is not None:
+                self.warmer.stop()
+            self.executor.shutdown()
+            if self.tenants is not None:
+                self.tenants.close()
+            else:
+                self._default_tenant.close()
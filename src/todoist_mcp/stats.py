@@ -0,0 +1,67 @@
+"""Materialized task counts over the local task store."""
+
+import itertools
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# Dimension name -> extractor returning the task's values for it
+DIMENSIONS = {
+    "project": lambda task: (task.get("project_id"),),
+    "section": lambda task: (task.get("section_id"),),
+    "label": lambda task: tuple(task.get("labels") or ()) or (None,),
+    "priority": lambda task: (task.get("priority", 1),),
+    "assignee": lambda task: (task.get("responsible_uid") or task.get("assignee_id"),),
+}
+
+
+class TaskCounts:
+    """Task counts grouped by every dimension and every pair of dimensions.
+    
+    Implements the task store index protocol, so each add or removal updates
+    the affected counters in place and a grouped count costs O(groups).
+    A task with several labels is counted once under each label.
+    """
+    
+    def __init__(self, dimensions: Sequence[str] = tuple(DIMENSIONS)):
+        self.dimensions = tuple(dimensions)
+        self.total = 0
+        self._views: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], int]] = {}
+        for size in (1, 2):
+            for group in itertools.combinations(self.dimensions, size):
+                self._views[group] = {}
+    
+    def _update(self, task: Dict[str, Any], delta: int) -> None:
+        values = {dimension: DIMENSIONS[dimension](task) for dimension in self.dimensions}
+        for group, counts in self._views.items():
+            for key in itertools.product(*(values[dimension] for dimension in group)):
+                count = counts.get(key, 0) + delta
+                if count:
+                    counts[key] = count
+                else:
+                    del counts[key]
+        self.total += delta
+    
+    def add(self, task: Dict[str, Any]) -> None:
+        self._update(task, 1)
+    
+    def discard(self, task: Dict[str, Any]) -> None:
+        self._update(task, -1)
+    
+    def clear(self) -> None:
+        for counts in self._views.values():
+            counts.clear()
+        self.total = 0
+    
+    def counts(self, group_by: Iterable[str]) -> List[Tuple[Dict[str, Any], int]]:
+        """``(group, count)`` pairs for one dimension or a pair of dimensions."""
+        group_by = tuple(group_by)
+        unknown = [dimension for dimension in group_by if dimension not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Unknown group_by dimension(s): {', '.join(unknown)}. "
+                             f"Choose from: {', '.join(self.dimensions)}")
+        if not 1 <= len(group_by) <= 2 or len(set(group_by)) != len(group_by):
+            raise ValueError("group_by must name one or two different dimensions")
+        
+        # Views are stored under the dimensions' canonical order
+        ordered = tuple(sorted(group_by, key=self.dimensions.index))
+        counts = self._views[ordered]
+        return [(dict(zip(ordered, key)), count) for key, count in counts.items()]
@@ -0,0 +1,463 @@
+"""Local replica of Todoist account data with incrementally maintained indexes."""
+
+import bisect
+import contextlib
+import datetime
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .api_v1 import ChangeEvent
+from .cache import estimate_size
+from .filters import due_datetime
+
+
+# Sync API resource type -> (store collection, client cache entity type, negative cache type)
+RESOURCES = {
+    "items": ("tasks", "tasks", "task"),
+    "projects": ("projects", "projects", "project"),
+    "sections": ("sections", "sections", "section"),
+    "labels": ("labels", "labels", "label"),
+}
+
+
+def is_active(obj: Dict[str, Any]) -> bool:
+    """Whether a synced object is live (not deleted, archived or completed)."""
+    return not (obj.get("is_deleted") or obj.get("is_archived") or obj.get("checked"))
+
+
+class FieldIndex:
+    """Maps the value of one task field to the IDs of tasks having it.
+    
+    With ``multi=True`` the field holds a list (e.g. ``labels``) and the
+    task is indexed under each element.
+    """
+    
+    def __init__(self, field: str, multi: bool = False):
+        self.field = field
+        self.multi = multi
+        self._ids: Dict[Any, Set[str]] = {}
+    
+    def _values(self, task: Dict[str, Any]) -> Iterable[Any]:
+        value = task.get(self.field)
+        if self.multi:
+            return value or ()
+        return (value,)
+    
+    def add(self, task: Dict[str, Any]) -> None:
+        for value in self._values(task):
+            self._ids.setdefault(value, set()).add(task["id"])
+    
+    def discard(self, task: Dict[str, Any]) -> None:
+        for value in self._values(task):
+            ids = self._ids.get(value)
+            if ids is not None:
+                ids.discard(task["id"])
+                if not ids:
+                    del self._ids[value]
+    
+    def clear(self) -> None:
+        self._ids.clear()
+    
+    def get(self, value: Any) -> Set[str]:
+        """IDs of tasks with the given value (do not mutate)."""
+        return self._ids.get(value, set())
+    
+    def values(self) -> List[Any]:
+        return list(self._ids)
+
+
+def local_midnight(date: datetime.date) -> datetime.datetime:
+    """Start of a calendar day in the local timezone."""
+    return datetime.datetime.combine(date, datetime.time()).astimezone()
+
+
+class DueDateIndex:
+    """Task IDs kept sorted by due moment for range queries.
+    
+    Due moments are normalized to UTC timestamps; all-day and floating due
+    dates are placed in the local timezone, matching how filters assign
+    tasks to calendar days.
+    """
+    
+    def __init__(self):
+        self._entries: List[Tuple[float, str]] = []
+        self._keys: Dict[str, Tuple[float, str]] = {}
+        self._loading = False
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def add(self, task: Dict[str, Any]) -> None:
+        moment = due_datetime(task)
+        if moment is None:
+            return
+        key = (moment.timestamp(), task["id"])
+        self._keys[task["id"]] = key
+        if self._loading:
+            self._entries.append(key)
+        else:
+            bisect.insort(self._entries, key)
+    
+    def discard(self, task: Dict[str, Any]) -> None:
+        key = self._keys.pop(task["id"], None)
+        if key is None:
+            return
+        if self._loading:
+            self._entries.remove(key)
+            return
+        position = bisect.bisect_left(self._entries, key)
+        if position < len(self._entries) and self._entries[position] == key:
+            del self._entries[position]
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+    
+    @contextlib.contextmanager
+    def bulk(self) -> Iterator[None]:
+        """Append adds made inside the block and sort once at the end.
+        
+        Used for full syncs, where inserting each task in order would be
+        quadratic in the number of tasks.
+        """
+        self._loading = True
+        try:
+            yield
+        finally:
+            self._loading = False
+            self._entries.sort()
+    
+    def range(self, start: Optional[datetime.datetime] = None,
+              end: Optional[datetime.datetime] = None) -> List[str]:
+        """IDs of tasks due in ``[start, end)`` ordered by due moment; None is unbounded."""
+        low = bisect.bisect_left(self._entries, (start.timestamp(),)) if start else 0
+        high = bisect.bisect_left(self._entries, (end.timestamp(),)) if end else len(self._entries)
+        return [task_id for _, task_id in self._entries[low:high]]
+    
+    def between_dates(self, first: Optional[datetime.date], last: Optional[datetime.date]) -> List[str]:
+        """IDs of tasks due on local calendar days ``first`` through ``last`` inclusive."""
+        return self.range(
+            local_midnight(first) if first else None,
+            local_midnight(last + datetime.timedelta(days=1)) if last else None,
+        )
+
+
+class TaskStore:
+    """Local replica of active tasks, projects, sections and labels.
+    
+    The store is filled with a full Sync API read and then kept current with
+    incremental sync deltas and with the :class:`ChangeEvent` notifications
+    the client emits for writes made through this server. Secondary indexes
+    registered with :meth:`add_index` receive ``add(task)`` and
+    ``discard(task)`` calls for every change, so they never need a rescan.
+    A full sync empties indexes that have ``clear()`` in one call and loads
+    the new tasks inside the ``bulk()`` context of those that have one.
+    """
+    
+    def __init__(self, api: Any, max_age: float = 30.0):
+        self.api = api
+        self.max_age = max_age
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self.labels: Dict[str, Dict[str, Any]] = {}
+        self.sync_token: Optional[str] = None
+        self.last_sync: Optional[float] = None
+        # Estimated JSON size of the replica, kept current on every change
+        self.size_bytes = 0
+        self.lock = threading.RLock()
+        self._indexes: List[Any] = []
+        self._listeners: List[Callable[[str, str, Optional[Dict[str, Any]]], None]] = []
+        
+        self.by_project = self.add_index(FieldIndex("project_id"))
+        self.by_section = self.add_index(FieldIndex("section_id"))
+        self.by_label = self.add_index(FieldIndex("labels", multi=True))
+        self.by_priority = self.add_index(FieldIndex("priority"))
+        self.by_due = self.add_index(DueDateIndex())
+        self.by_parent = self.add_index(FieldIndex("parent_id"))
+        
+        api.add_listener(self.handle_event)
+    
+    def add_index(self, index: Any) -> Any:
+        """Register a secondary index and fill it from the current tasks."""
+        with self.lock:
+            self._indexes.append(index)
+            for task in self.tasks.values():
+                index.add(task)
+        return index
+    
+    def add_listener(self, listener: Callable[[str, str, Optional[Dict[str, Any]]], None]) -> None:
+        """Register ``listener(collection, object_id, obj)`` for every change.
+        
+        ``obj`` is the new object, or None when it was removed.
+        """
+        self._listeners.append(listener)
+    
+    def _changed(self, collection: str, object_id: str, obj: Optional[Dict[str, Any]]) -> None:
+        for listener in list(self._listeners):
+            listener(collection, object_id, obj)
+    
+    # Freshness and sync
+    
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last sync, or None if never synced."""
+        if self.last_sync is None:
+            return None
+        return time.monotonic() - self.last_sync
+    
+    @property
+    def is_fresh(self) -> bool:
+        age = self.age
+        return age is not None and age < self.max_age
+    
+    def ensure_fresh(self) -> None:
+        """Sync if the replica is missing or older than ``max_age``.
+        
+        Concurrent callers on the tool pool wait for one sync instead of
+        each starting their own.
+        """
+        if not self.is_fresh:
+            with self.lock:
+                if not self.is_fresh:
+                    self.refresh()
+    
+    def refresh(self) -> Dict[str, int]:
+        """Pull changes with the Sync API; returns the number of changes per collection."""
+        with self.lock:
+            payload = self.api.sync(
+                sync_token=self.sync_token or "*", resource_types=list(RESOURCES)
+            )
+            return self.apply_sync(payload)
+    
+    def apply_sync(self, payload: Dict[str, Any]) -> Dict[str, int]:
+        """Apply a Sync API response (full or incremental) to the replica."""
+        with self.lock, contextlib.ExitStack() as bulk:
+            if payload.get("full_sync"):
+                self._clear()
+                for index in self._indexes:
+                    if hasattr(index, "bulk"):
+                        bulk.enter_context(index.bulk())
+            changes = {}
+            for resource, (collection, cache_type, negative_type) in RESOURCES.items():
+                objects = payload.get(resource) or []
+                for obj in objects:
+                    self.api.negative_cache.discard(negative_type, obj["id"])
+                    self._upsert(collection, obj)
+                changes[collection] = len(objects)
+                if objects and not payload.get("full_sync"):
+                    self.api.cache.invalidate(cache_type)
+            self.sync_token = payload.get("sync_token", self.sync_token)
+            self.last_sync = time.monotonic()
+            return changes
+    
+    def _clear(self) -> None:
+        # Empty the indexes that can be at once instead of task by task
+        others = []
+        for index in self._indexes:
+            if hasattr(index, "clear"):
+                index.clear()
+            else:
+                others.append(index)
+        for collection in ("tasks", "projects", "sections", "labels"):
+            objects = getattr(self, collection)
+            for object_id in list(objects):
+                old = objects.pop(object_id)
+                if collection == "tasks":
+                    for index in others:
+                        index.discard(old)
+                self._changed(collection, object_id, None)
+        self.size_bytes = 0
+    
+    def _upsert(self, collection: str, obj: Dict[str, Any]) -> None:
+        if not is_active(obj):
+            self._remove(collection, obj["id"])
+            return
+        objects = getattr(self, collection)
+        old = objects.get(obj["id"])
+        if collection == "tasks":
+            if old is not None:
+                for index in self._indexes:
+                    index.discard(old)
+            for index in self._indexes:
+                index.add(obj)
+        if old is not None:
+            self.size_bytes -= estimate_size(old)
+        self.size_bytes += estimate_size(obj)
+        objects[obj["id"]] = obj
+        self._changed(collection, obj["id"], obj)
+    
+    def _remove(self, collection: str, object_id: str) -> None:
+        old = getattr(self, collection).pop(object_id, None)
+        if old is None:
+            return
+        self.size_bytes -= estimate_size(old)
+        if collection == "tasks":
+            for index in self._indexes:
+                index.discard(old)
+        self._changed(collection, object_id, None)
+    
+    # Mutations
+    
+    def upsert_task(self, task: Dict[str, Any]) -> None:
+        """Insert or replace a task, removing it if it is completed or deleted."""
+        with self.lock:
+            self._upsert("tasks", task)
+    
+    def remove_task(self, task_id: str) -> None:
+        with self.lock:
+            self._remove("tasks", task_id)
+    
+    def patch_task(self, task_id: str, **fields: Any) -> None:
+        """Update fields of a known task in place of a full object."""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                self._upsert("tasks", dict(task, **fields))
+    
+    def handle_event(self, event: ChangeEvent) -> None:
+        """Apply a write made through the client to the replica."""
+        with self.lock:
+            if event.entity_type == "tasks":
+                self._handle_task_event(event)
+            elif event.entity_type in ("projects", "sections", "labels"):
+                self._handle_container_event(event)
+    
+    def _handle_task_event(self, event: ChangeEvent) -> None:
+        task = self.tasks.get(event.entity_id)
+        if event.action == "close" and task is not None and (task.get("due") or {}).get("is_recurring"):
+            # Todoist keeps a completed recurring task open and moves it to its
+            # next date, which the close response does not include
+            if isinstance(event.result, dict) and event.result.get("id"):
+                self._upsert("tasks", event.result)
+            else:
+                self.last_sync = None
+        elif event.action in ("close", "delete"):
+            # Completing a non-recurring task completes its subtasks too
+            if task is not None:
+                for task_id in self.descendant_ids(event.entity_id):
+                    self._remove("tasks", task_id)
+            self._remove("tasks", event.entity_id)
+        elif isinstance(event.result, dict) and event.result.get("id"):
+            self._upsert("tasks", event.result)
+            if event.action == "move":
+                self._move_subtree(event.entity_id)
+        elif event.action == "move" and event.data:
+            task = self.tasks.get(event.entity_id)
+            if task is not None:
+                moved = dict(task, **event.data)
+                if event.data.get("parent_id") in self.tasks:
+                    parent = self.tasks[event.data["parent_id"]]
+                    moved.update(project_id=parent.get("project_id"), section_id=parent.get("section_id"))
+                elif "project_id" in event.data:
+                    moved.update(section_id=None, parent_id=None)
+                elif "section_id" in event.data:
+                    moved.update(parent_id=None)
+                self._upsert("tasks", moved)
+                self._move_subtree(event.entity_id)
+    
+    def _move_subtree(self, task_id: str) -> None:
+        """Carry a moved task's project and section over to its descendants."""
+        task = self.tasks.get(task_id)
+        if task is None:
+            return
+        for descendant_id in self.descendant_ids(task_id):
+            descendant = self.tasks[descendant_id]
+            if (descendant.get("project_id"), descendant.get("section_id")) != (
+                task.get("project_id"), task.get("section_id")
+            ):
+                self._upsert("tasks", dict(
+                    descendant, project_id=task.get("project_id"), section_id=task.get("section_id")
+                ))
+    
+    def _handle_container_event(self, event: ChangeEvent) -> None:
+        collection = event.entity_type
+        if event.action == "delete":
+            old = getattr(self, collection).get(event.entity_id)
+            self._remove(collection, event.entity_id)
+            if collection in ("projects", "sections"):
+                index = self.by_project if collection == "projects" else self.by_section
+                for task_id in list(index.get(event.entity_id)):
+                    self._remove("tasks", task_id)
+            elif old is not None:
+                # Deleting a label removes it from every task
+                self._relabel(old.get("name"), None)
+        elif isinstance(event.result, dict) and event.result.get("id"):
+            old = getattr(self, collection).get(event.result["id"])
+            self._upsert(collection, event.result)
+            if collection == "labels" and old is not None and old.get("name") != event.result.get("name"):
+                self._relabel(old.get("name"), event.result.get("name"))
+    
+    def _relabel(self, old_name: Optional[str], new_name: Optional[str]) -> None:
+        """Rename a label on every task carrying it, or drop it if ``new_name`` is None."""
+        for task_id in list(self.by_label.get(old_name)):
+            task = self.tasks[task_id]
+            labels = [label for label in task.get("labels", []) if label != old_name]
+            if new_name is not None and new_name not in labels:
+                labels.append(new_name)
+            self._upsert("tasks", dict(task, labels=labels))
+    
+    # Queries
+    
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        return self.tasks.get(task_id)
+    
+    def iter_tasks(self, task_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Tasks for the given IDs (all tasks if None), skipping unknown IDs."""
+        with self.lock:
+            if task_ids is None:
+                return list(self.tasks.values())
+            return [self.tasks[task_id] for task_id in task_ids if task_id in self.tasks]
+    
+    def children(self, task_id: str) -> List[Dict[str, Any]]:
+        """Direct subtasks of a task in their display order."""
+        with self.lock:
+            tasks = self.iter_tasks(self.by_parent.get(task_id))
+        return sorted(tasks, key=lambda task: task.get("child_order", 0))
+    
+    def descendant_ids(self, task_id: str) -> List[str]:
+        """IDs of all subtasks below a task, parents before children."""
+        with self.lock:
+            result = []
+            queue = [task_id]
+            while queue:
+                children = self.by_parent.get(queue.pop())
+                result.extend(children)
+                queue.extend(children)
+            return result
+    
+    def ancestor_ids(self, task_id: str) -> List[str]:
+        """IDs of a task's parents, nearest first."""
+        with self.lock:
+            result = []
+            task = self.tasks.get(task_id)
+            while task is not None and task.get("parent_id") and task["parent_id"] not in result:
+                result.append(task["parent_id"])
+                task = self.tasks.get(task["parent_id"])
+            return result
+    
+    def find_projects(self, name: str) -> List[Dict[str, Any]]:
+        """Projects whose name matches case-insensitively."""
+        name = name.casefold()
+        return [p for p in self.projects.values() if p.get("name", "").casefold() == name]
+    
+    def find_sections(self, name: str) -> List[Dict[str, Any]]:
+        """Sections whose name matches case-insensitively."""
+        name = name.casefold()
+        return [s for s in self.sections.values() if s.get("name", "").casefold() == name]
+    
+    def subproject_ids(self, project_id: str) -> Set[str]:
+        """A project ID plus the IDs of all of its descendant projects."""
+        children: Dict[str, List[str]] = {}
+        for project in self.projects.values():
+            if project.get("parent_id"):
+                children.setdefault(project["parent_id"], []).append(project["id"])
+        result = set()
+        stack = [project_id]
+        while stack:
+            current = stack.pop()
+            if current not in result:
+                result.add(current)
+                stack.extend(children.get(current, ()))
+        return result
@@ -0,0 +1,226 @@
+"""Per-account state and an LRU registry for serving many Todoist users."""
+
+import contextlib
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .comments import CommentIndex
+from .names import NameResolver
+from .planner import QueryPlanner
+from .resources import ResourceNotifier
+from .search import TaskSearchIndex
+from .stats import TaskCounts
+from .store import TaskStore
+
+logger = logging.getLogger(__name__)
+
+# Decoded objects plus the store's search, name, count and field indexes
+# take about this many bytes per byte of replica JSON (measured on a
+# 5,000-task account)
+MEMORY_PER_JSON_BYTE = 6
+
+# Tenant serving the current tool call in multi-tenant mode
+current_tenant: contextvars.ContextVar[Optional["Tenant"]] = contextvars.ContextVar(
+    "todoist_tenant", default=None
+)
+
+
+def tenant_key(token: str) -> str:
+    """Stable, non-reversible key for an API token."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def token_from_request() -> str:
+    """The Todoist token sent as ``Authorization: Bearer <token>`` on the current HTTP request."""
+    from fastmcp.server.dependencies import get_http_request
+    
+    try:
+        request = get_http_request()
+    except RuntimeError:
+        raise ValueError("Multi-tenant mode needs an HTTP transport (sse or streamable-http)") from None
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise ValueError("Missing 'Authorization: Bearer <Todoist API token>' header")
+    return token.strip()
+
+
+class Tenant:
+    """One account's API client with its local store and the indexes built on it."""
+    
+    def __init__(self, api: Any, key: Optional[str] = None):
+        self.key = key
+        self.api = api
+        self.store = TaskStore(api)
+        self.search_index = self.store.add_index(TaskSearchIndex())
+        self.names = NameResolver(self.store)
+        self.task_counts = self.store.add_index(TaskCounts())
+        self.planner = QueryPlanner(self.store)
+        self.store.add_listener(
+            lambda collection, object_id, obj: self.api.labels.handle_store_change(collection, object_id, obj)
+        )
+        # Changed tasks come from sync, so project comments can be re-read less often
+        self.comment_index = CommentIndex(self.api, max_age=300.0, store=self.store)
+        self.resources = ResourceNotifier(self.store)
+        self.active = 0
+        self.last_used = time.monotonic()
+    
+    def memory_bytes(self) -> int:
+        """Estimated memory held by the local replica, its indexes and indexed comments.
+        
+        The response cache is not included; it has its own byte cap.
+        """
+        return (self.store.size_bytes + self.comment_index.size_bytes) * MEMORY_PER_JSON_BYTE
+    
+    @property
+    def in_use(self) -> bool:
+        """Whether a call is in flight or a session is subscribed to a resource."""
+        return bool(self.active or self.resources.subscriptions())
+    
+    def close(self) -> None:
+        self.resources.stop()
+        self.api.close()
+
+
+class TenantRegistry:
+    """LRU registry of tenants keyed by API token.
+    
+    Tenants are created on first use by ``factory(token, key)``, outside the
+    registry lock so that a slow build does not hold up other accounts. Beyond
+    ``max_tenants``, or after ``idle_ttl`` seconds without a call, the least
+    recently used tenants are closed and dropped; tenants with calls in
+    flight or resource subscriptions are never evicted, so the registry may
+    exceed its cap. Tokens themselves are not kept, only their hashed keys.
+    
+    A tenant whose estimated memory (:meth:`Tenant.memory_bytes`) exceeds
+    ``max_tenant_bytes`` once its calls finish is closed, and its token is
+    refused for ``reject_ttl`` seconds, so memory stays within about
+    ``max_tenants * max_tenant_bytes`` plus the response caches.
+    """
+    
+    def __init__(self, factory: Callable[[str, str], Tenant], max_tenants: int = 256,
+                 idle_ttl: Optional[float] = 3600.0, max_tenant_bytes: Optional[int] = 32 * 1024 * 1024,
+                 reject_ttl: float = 3600.0):
+        self.factory = factory
+        self.max_tenants = max_tenants
+        self.idle_ttl = idle_ttl
+        self.max_tenant_bytes = max_tenant_bytes
+        self.reject_ttl = reject_ttl
+        self._tenants: "OrderedDict[str, Tenant]" = OrderedDict()
+        # Keys of tenants over the memory cap -> (refused until, estimated bytes)
+        self._rejected: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+        self.rejected = 0
+    
+    def __len__(self) -> int:
+        return len(self._tenants)
+    
+    def _evict(self, now: float) -> List[Tenant]:
+        evicted = []
+        for key, tenant in list(self._tenants.items()):
+            over_cap = len(self._tenants) > self.max_tenants
+            idle = self.idle_ttl is not None and now - tenant.last_used > self.idle_ttl
+            if not (over_cap or idle):
+                break  # Ordered oldest first; the rest were used more recently
+            if tenant.in_use:
+                continue
+            del self._tenants[key]
+            evicted.append(tenant)
+        self.evicted += len(evicted)
+        return evicted
+    
+    @contextlib.contextmanager
+    def acquire(self, token: str) -> Iterator[Tenant]:
+        """The tenant for ``token``, marked busy for the duration of the block."""
+        key = tenant_key(token)
+        with self._lock:
+            self._check_rejected(key, time.monotonic())
+            tenant = self._tenants.get(key)
+        built = None
+        if tenant is None:
+            # Build without the lock, then insert unless another call won the race
+            built = self.factory(token, key)
+        now = time.monotonic()
+        with self._lock:
+            tenant = self._tenants.get(key)
+            if tenant is None:
+                tenant = self._tenants[key] = built
+                built = None
+                self.created += 1
+            self._tenants.move_to_end(key)
+            tenant.active += 1
+            tenant.last_used = now
+            evicted = self._evict(now)
+        if built is not None:
+            built.close()
+        for old in evicted:
+            logger.debug("Evicting tenant %s", old.key)
+            old.close()
+        try:
+            yield tenant
+        finally:
+            with self._lock:
+                tenant.active -= 1
+                tenant.last_used = time.monotonic()
+                over_budget = self._reject_over_budget(tenant)
+            if over_budget is not None:
+                over_budget.close()
+    
+    def _check_rejected(self, key: str, now: float) -> None:
+        rejected = self._rejected.get(key)
+        if rejected is None:
+            return
+        until, size = rejected
+        if now >= until:
+            del self._rejected[key]
+            return
+        raise ValueError(
+            f"This Todoist account needs about {size // (1024 * 1024)} MiB of server memory, "
+            f"over the {self.max_tenant_bytes // (1024 * 1024)} MiB limit per account"
+        )
+    
+    def _reject_over_budget(self, tenant: Tenant) -> Optional[Tenant]:
+        """Drop ``tenant`` and refuse its key if it is idle and over the memory cap."""
+        if self.max_tenant_bytes is None or tenant.active or self._tenants.get(tenant.key) is not tenant:
+            return None
+        size = tenant.memory_bytes()
+        if size <= self.max_tenant_bytes:
+            return None
+        logger.warning("Tenant %s needs about %d bytes, over the %d byte cap; refusing it",
+                       tenant.key, size, self.max_tenant_bytes)
+        del self._tenants[tenant.key]
+        self._rejected[tenant.key] = (time.monotonic() + self.reject_ttl, size)
+        while len(self._rejected) > self.max_tenants:
+            self._rejected.popitem(last=False)
+        self.rejected += 1
+        return tenant
+    
+    def tenants(self) -> List[Tenant]:
+        with self._lock:
+            return list(self._tenants.values())
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tenants": len(self._tenants),
+                "max_tenants": self.max_tenants,
+                "max_tenant_bytes": self.max_tenant_bytes,
+                "memory_bytes": sum(tenant.memory_bytes() for tenant in self._tenants.values()),
+                "active": sum(1 for tenant in self._tenants.values() if tenant.active),
+                "subscribed": sum(1 for tenant in self._tenants.values() if tenant.resources.subscriptions()),
+                "created": self.created,
+                "evicted": self.evicted,
+                "rejected": self.rejected,
+            }
+    
+    def close(self) -> None:
+        with self._lock:
+            tenants, self._tenants = list(self._tenants.values()), OrderedDict()
+        for tenant in tenants:
+            tenant.close()
@@ -0,0 +1,76 @@
+"""Background cache warming for the Todoist MCP server."""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+
+from .scheduler import BACKGROUND, priority
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer:
+    """Load commonly requested collections into the client cache in the background.
+    
+    Loads use the same arguments the read tools send by default, so tool calls
+    that arrive while a load is in flight wait on it through the client's
+    single-flight reads instead of issuing duplicate requests. When a local
+    task store is given it is synced as well, so the first tool that reads
+    it does not wait on a full sync.
+    """
+    
+    def __init__(self, api: Any, max_workers: int = 4, store: Any = None):
+        self.api = api
+        self.store = store
+        # Section loads are submitted from a pool thread and waited on there
+        self.max_workers = max(2, max_workers)
+        self.errors: List[str] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futures: List[Future] = []
+    
+    def start(self) -> "CacheWarmer":
+        """Start loading projects, labels, sections, recent tasks and the store concurrently."""
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="todoist-warmup"
+        )
+        self._futures = [
+            self._submit(self._load_projects_and_sections),
+            self._submit(self.api.get_labels),
+            self._submit(self.api.get_tasks),
+        ]
+        if self.store is not None:
+            self._futures.append(self._submit(self.store.ensure_fresh))
+        return self
+    
+    def _submit(self, fn, *args, **kwargs) -> Future:
+        return self._pool.submit(self._load, fn, *args, **kwargs)
+    
+    def _load(self, fn, *args, **kwargs) -> None:
+        try:
+            with priority(BACKGROUND):
+                fn(*args, **kwargs)
+        except Exception as e:
+            logger.warning("Cache warm-up load failed: %s", e)
+            self.errors.append(str(e))
+    
+    def _load_projects_and_sections(self) -> None:
+        projects = self.api.get_projects() or {}
+        section_loads = [
+            self._submit(self.api.get_sections, project_id=project["id"])
+            for project in projects.get("results", [])
+        ]
+        wait(section_loads)
+    
+    @property
+    def done(self) -> bool:
+        return all(future.done() for future in self._futures)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the initial loads finish; returns False on timeout."""
+        _, not_done = wait(self._futures, timeout=timeout)
+        return not not_done
+    
+    def stop(self) -> None:
+        """Cancel loads that have not started yet."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import Mock, patch
 from todoist_api_python.api import TodoistAPI
+from todoist_mcp.store import TaskStore
 
 
 @pytest.fixture
@@ -33,3 +34,27 @@ def todoist_api_patch():
     """Patch TodoistAPI constructor for testing."""
     with patch('todoist_api_python.api.TodoistAPI') as mock_class:
         yield mock_class
+
+
+@pytest.fixture
+def make_store():
+    """Build task stores synced from a mocked full sync response.
+    
+    Keyword arguments are indexes to register before the sync, set as
+    attributes of the store under the same names.
+    """
+    def make(payload, **indexes):
+        api = Mock()
+        api.sync.return_value = payload
+        store = TaskStore(api)
+        for name, index in indexes.items():
+            setattr(store, name, store.add_index(index))
+        store.refresh()
+        return store
+    return make
+
+
+@pytest.fixture
+def store(make_store, sync_payload):
+    """Task store synced from the test module's ``sync_payload`` fixture."""
+    return make_store(sync_payload)
@@ -0,0 +1,130 @@
+"""Tests for the due-date index and the agenda tool."""
+
+import datetime
+import pytest
+from unittest.mock import patch
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.store import DueDateIndex
+
+UTC = datetime.timezone.utc
+
+
+def task(task_id, due=None, **fields):
+    return dict({"id": task_id, "content": task_id, "project_id": "work", "labels": [],
+                 "due": {"date": due[:10], "datetime": due if len(due) > 10 else None} if due else None},
+                **fields)
+
+
+@pytest.fixture
+def sync_payload():
+    """Full sync response with tasks spread over a week."""
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [{"id": "work", "name": "Work"}, {"id": "home", "name": "Home"}],
+        "items": [
+            task("late", "2025-06-05"),
+            task("mon", "2025-06-09"),
+            task("mon-home", "2025-06-09", project_id="home"),
+            task("wed", "2025-06-11"),
+            task("later", "2025-06-30"),
+            task("undated"),
+        ],
+    }
+
+
+class TestDueDateIndex:
+    def test_orders_by_normalized_moment(self):
+        """Test due moments in different offsets are compared in UTC."""
+        index = DueDateIndex()
+        index.add(task("b", "2025-06-10T08:00:00Z"))
+        index.add(task("a", "2025-06-10T09:00:00+02:00"))
+        index.add(task("none"))
+        
+        assert index.range() == ["a", "b"]
+        assert len(index) == 2
+        start = datetime.datetime(2025, 6, 10, 7, 30, tzinfo=UTC)
+        assert index.range(start, datetime.datetime(2025, 6, 10, 8, 0, tzinfo=UTC)) == []
+        assert index.range(start, None) == ["b"]
+    
+    def test_discard(self):
+        index = DueDateIndex()
+        first = task("a", "2025-06-10T08:00:00Z")
+        index.add(first)
+        index.add(task("b", "2025-06-10T08:00:00Z"))
+        index.discard(first)
+        index.discard(task("missing", "2025-06-10"))
+        
+        assert index.range() == ["b"]
+    
+    def test_between_dates(self):
+        index = DueDateIndex()
+        for task_id, due in [("d1", "2025-06-01"), ("d2", "2025-06-02"), ("d3", "2025-06-03")]:
+            index.add(task(task_id, due))
+        
+        assert index.between_dates(datetime.date(2025, 6, 2), datetime.date(2025, 6, 3)) == ["d2", "d3"]
+        assert index.between_dates(None, datetime.date(2025, 6, 1)) == ["d1"]
+    
+    def test_store_keeps_index_current(self, store):
+        """Test adds, reschedules and completions update the index incrementally."""
+        store.handle_event(ChangeEvent("create", "tasks", None, {}, task("new", "2025-06-10")))
+        store.handle_event(ChangeEvent("update", "tasks", "wed", {}, task("wed", "2025-07-01")))
+        store.handle_event(ChangeEvent("close", "tasks", "mon", None, None))
+        
+        week = store.by_due.between_dates(datetime.date(2025, 6, 9), datetime.date(2025, 6, 15))
+        assert week == ["mon-home", "new"]
+    
+    def test_bulk_load_sorts_once(self):
+        """Test adds inside bulk() are appended and sorted when the block ends."""
+        index = DueDateIndex()
+        with patch("todoist_mcp.store.bisect.insort") as insort:
+            with index.bulk():
+                index.add(task("c", "2025-06-12"))
+                index.add(task("a", "2025-06-10"))
+                index.add(task("b", "2025-06-11"))
+                index.discard(task("c", "2025-06-12"))
+        
+        assert not insort.called
+        assert index.range() == ["a", "b"]
+        index.add(task("c", "2025-06-12"))
+        assert index.range() == ["a", "b", "c"]
+    
+    def test_full_sync_reloads_in_bulk(self, store, sync_payload):
+        with patch("todoist_mcp.store.bisect.insort") as insort:
+            store.apply_sync(dict(sync_payload, items=[task("only", "2025-06-10")]))
+        
+        assert not insort.called
+        assert store.by_due.range() == ["only"]
+        assert store.by_project.get("work") == {"only"}
+
+
+class TestAgendaTool:
+    @pytest.mark.asyncio
+    async def test_agenda_buckets_by_day(self, sync_payload):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["agenda"].fn(start="2025-06-09", days=7, include_overdue=True)
+            filtered = await tools["agenda"].fn(start="2025-06-09", days=1, filter="#Home")
+        
+        assert result["start"] == "2025-06-09"
+        assert result["end"] == "2025-06-15"
+        assert [(day["date"], [t["id"] for t in day["tasks"]]) for day in result["days"]] == [
+            ("2025-06-09", ["mon", "mon-home"]),
+            ("2025-06-11", ["wed"]),
+        ]
+        assert [t["id"] for t in result["overdue"]] == ["late"]
+        assert [t["id"] for day in filtered["days"] for t in day["tasks"]] == ["mon-home"]
+        assert "overdue" not in filtered
+    
+    @pytest.mark.asyncio
+    async def test_agenda_rejects_empty_window(self):
+        with patch("todoist_mcp.server.TodoistV1Client"):
+            server = TodoistMCPServer(token="test_token")
+            tools = await server.mcp.get_tools()
+            
+            with pytest.raises(ValueError):
+                await tools["agenda"].fn(days=-1)
@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import Mock, patch
 from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.api_v1 import TodoistV1Client
 
 
 @pytest.fixture
@@ -27,6 +28,31 @@ def server(mock_auth_manager, mock_api_client):
     return TodoistMCPServer()
 
 
+@pytest.fixture
+def mock_httpx_client():
+    """Mock httpx.Client for testing."""
+    with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+        mock_instance = Mock()
+        mock_class.return_value = mock_instance
+        yield mock_instance
+
+
+@pytest.fixture
+def api_client(mock_httpx_client):
+    """Create API client with mocked httpx."""
+    return TodoistV1Client("test_token")
+
+
+def json_response(payload):
+    """Build a successful mock response."""
+    response = Mock()
+    response.status_code = 200
+    response.content = b'{}'
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+
 class TestBatchOperations:
     """Test suite for batch operations - ALL SHOULD FAIL INITIALLY."""
     
@@ -277,3 +303,78 @@ class TestBatchOperations:
         
         with pytest.raises(ValueError, match="Maximum 100 tasks allowed"):
             server.api.batch_complete_tasks(task_ids=task_ids)
+
+
+class TestBatchUpdateLabelsClient:
+    """Test batch_update_labels at the API client level."""
+    
+    def test_single_bulk_read_then_writes(self, api_client, mock_httpx_client):
+        """Test labels are read in one request and only writes follow."""
+        mock_httpx_client.request.side_effect = [
+            json_response({
+                "results": [
+                    {"id": "task1", "labels": ["work"]},
+                    {"id": "task2", "labels": []}
+                ],
+                "next_cursor": None
+            }),
+            json_response({"id": "task1"}),
+            json_response({"id": "task2"}),
+        ]
+        
+        result = api_client.batch_update_labels(["task1", "task2"], add_labels=["urgent"])
+        
+        calls = mock_httpx_client.request.call_args_list
+        assert len(calls) == 3
+        assert calls[0][0] == ("GET", "https://api.todoist.com/api/v1/tasks")
+        assert calls[0][1]["params"] == {"ids": "task1,task2", "limit": 200}
+        assert calls[1][1]["json"] == {"labels": ["work", "urgent"]}
+        assert calls[2][1]["json"] == {"labels": ["urgent"]}
+        assert result == {"updated": ["task1", "task2"], "unchanged": [], "failed": []}
+    
+    def test_unchanged_tasks_are_skipped(self, api_client, mock_httpx_client):
+        """Test tasks whose labels would not change are not written."""
+        mock_httpx_client.request.side_effect = [
+            json_response({
+                "results": [
+                    {"id": "task1", "labels": ["urgent"]},
+                    {"id": "task2", "labels": ["old"]}
+                ],
+                "next_cursor": None
+            }),
+            json_response({"id": "task2"}),
+        ]
+        
+        result = api_client.batch_update_labels(
+            ["task1", "task2"], add_labels=["urgent"], remove_labels=["old"]
+        )
+        
+        assert mock_httpx_client.request.call_count == 2
+        assert mock_httpx_client.request.call_args[1]["json"] == {"labels": ["urgent"]}
+        assert result["updated"] == ["task2"]
+        assert result["unchanged"] == ["task1"]
+    
+    def test_missing_tasks_fail_without_writes(self, api_client, mock_httpx_client):
+        """Test tasks absent from the bulk read are reported as not found."""
+        mock_httpx_client.request.side_effect = [
+            json_response({"results": [], "next_cursor": None}),
+        ]
+        
+        result = api_client.batch_update_labels(["gone"], remove_labels=["x"])
+        
+        assert mock_httpx_client.request.call_count == 1
+        assert result["failed"] == [{"task_id": "gone", "error": "Task not found"}]
+    
+    def test_bulk_read_follows_cursor(self, api_client, mock_httpx_client):
+        """Test the bulk read paginates through next_cursor."""
+        mock_httpx_client.request.side_effect = [
+            json_response({"results": [{"id": "task1", "labels": []}], "next_cursor": "c1"}),
+            json_response({"results": [{"id": "task2", "labels": ["a"]}], "next_cursor": None}),
+            json_response({"id": "task1"}),
+        ]
+        
+        result = api_client.batch_update_labels(["task1", "task2"], add_labels=["a"])
+        
+        assert mock_httpx_client.request.call_args_list[1][1]["params"]["cursor"] == "c1"
+        assert result["updated"] == ["task1"]
+        assert result["unchanged"] == ["task2"]
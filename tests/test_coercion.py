@@ -0,0 +1,93 @@
+"""Tests for tool argument coercion."""
+
+import pytest
+from typing import Optional
+from unittest.mock import patch
+from todoist_mcp.coercion import ArgumentCoercion, coercing, id_list, integer, string_list
+from todoist_mcp.server import TodoistMCPServer
+
+
+class TestCoercers:
+    def test_string_list(self):
+        coerce = string_list()
+        
+        assert coerce("labels", '["urgent", "work"]') == ["urgent", "work"]
+        assert coerce("labels", "urgent") == ["urgent"]
+        assert coerce("labels", ["a", 1]) == ["a", "1"]
+        assert coerce("labels", "[]") == []
+        assert coerce("labels", None) is None
+    
+    def test_string_list_rejects_bad_input(self):
+        with pytest.raises(ValueError, match="invalid JSON"):
+            string_list()("labels", '["urgent"')
+        with pytest.raises(ValueError, match="non-empty strings"):
+            string_list()("labels", '["ok", ""]')
+        with pytest.raises(ValueError, match="expected a list"):
+            string_list()("labels", '{"a": 1}')
+    
+    def test_id_list(self):
+        coerce = id_list(max_items=3, required=True)
+        
+        assert coerce("task_ids", '["t1", "t2", "t1"]') == ["t1", "t2"]
+        assert coerce("task_ids", "t1") == ["t1"]
+        with pytest.raises(ValueError, match="cannot be empty"):
+            coerce("task_ids", "[]")
+        with pytest.raises(ValueError, match="at most 3"):
+            coerce("task_ids", ["a", "b", "c", "d"])
+    
+    def test_integer(self):
+        assert integer("limit", " 5 ") == 5
+        assert integer("limit", 5.0) == 5
+        with pytest.raises(ValueError):
+            integer("limit", True)
+        with pytest.raises(ValueError):
+            integer("limit", "five")
+
+
+class TestArgumentCoercion:
+    def test_compiled_from_signature(self):
+        def tool(task_ids: str, project_id: Optional[str] = None, limit: Optional[int] = None,
+                 content: Optional[str] = None):
+            return task_ids, project_id, limit, content
+        
+        assert set(ArgumentCoercion(tool).coercers) == {"task_ids", "project_id", "limit"}
+        assert coercing(tool)('["t1"]', project_id=12, limit="3", content=" x ") == (["t1"], "12", 3, " x ")
+    
+    def test_no_coercion_returns_function(self):
+        def tool(content: str):
+            return content
+        
+        assert coercing(tool) is tool
+
+
+class TestToolCoercion:
+    @pytest.mark.asyncio
+    async def test_bad_batch_rejected_before_api_call(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api = mock_api_client.return_value
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            with pytest.raises(ValueError, match="at most 100"):
+                await tools["batch_complete_tasks"].fn(task_ids=[f"t{i}" for i in range(101)])
+            with pytest.raises(ValueError, match="invalid JSON"):
+                await tools["batch_update_labels"].fn(task_ids='["t1"', add_labels="urgent")
+        
+        mock_api.batch_complete_tasks.assert_not_called()
+        mock_api.batch_update_labels.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_lists_are_parsed_for_the_body(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api = mock_api_client.return_value
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            await tools["batch_update_labels"].fn(task_ids='["t1", "t2"]', add_labels="urgent")
+            await tools["add_task"].fn(content="Write", labels='["a", "b"]', priority="4")
+        
+        mock_api.batch_update_labels.assert_called_once_with(
+            task_ids=["t1", "t2"], add_labels=["urgent"], remove_labels=None
+        )
+        assert mock_api.add_task.call_args.kwargs["labels"] == ["a", "b"]
+        assert mock_api.add_task.call_args.kwargs["priority"] == 4
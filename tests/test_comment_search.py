@@ -0,0 +1,196 @@
+"""Tests for the comment search index."""
+
+import pytest
+from unittest.mock import Mock, patch
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.comments import CommentIndex
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.store import TaskStore
+
+
+def page(results):
+    return {"results": results, "next_cursor": None}
+
+
+class FakeComments:
+    """Serves get_tasks/get_comments from in-memory data and counts calls."""
+    
+    def __init__(self):
+        self.tasks = {
+            "work": [{"id": "t1", "note_count": 1}, {"id": "t2", "note_count": 0}],
+        }
+        self.comments = {
+            ("task", "t1"): [{"id": "c1", "task_id": "t1", "content": "We decided to ship on Friday"}],
+            ("project", "work"): [{"id": "c2", "project_id": "work", "content": "Kickoff agenda"}],
+        }
+        self.comment_calls = []
+    
+    def get_tasks(self, project_id=None, limit=None, cursor=None):
+        return page(self.tasks.get(project_id, []))
+    
+    def get_comments(self, task_id=None, project_id=None, limit=None, cursor=None):
+        owner = ("task", task_id) if task_id else ("project", project_id)
+        self.comment_calls.append(owner)
+        return page(self.comments.get(owner, []))
+
+
+@pytest.fixture
+def fake():
+    return FakeComments()
+
+
+@pytest.fixture
+def index(fake):
+    api = Mock()
+    api.get_tasks.side_effect = fake.get_tasks
+    api.get_comments.side_effect = fake.get_comments
+    return CommentIndex(api, max_age=0)
+
+
+class TestCommentIndex:
+    def test_ingest_and_search(self, index, fake):
+        result = index.ingest(["work"])
+        
+        assert result == {"projects": 1, "tasks": 1}
+        assert set(fake.comment_calls) == {("task", "t1"), ("project", "work")}
+        assert index.search("decided")[0][0]["id"] == "c1"
+        assert index.search("kickoff")[0][0]["id"] == "c2"
+    
+    def test_reingest_only_fetches_changed_tasks(self, index, fake):
+        """Test tasks whose comment count is unchanged are not re-fetched."""
+        index.ingest(["work"])
+        fake.comment_calls.clear()
+        fake.tasks["work"][1]["note_count"] = 1
+        fake.comments[("task", "t2")] = [{"id": "c3", "task_id": "t2", "content": "Budget approved"}]
+        
+        result = index.ingest(["work"])
+        
+        assert result["tasks"] == 1
+        assert ("task", "t1") not in fake.comment_calls
+        assert ("task", "t2") in fake.comment_calls
+        assert index.search("budget")[0][0]["id"] == "c3"
+    
+    def test_recently_ingested_projects_skipped(self, fake):
+        api = Mock()
+        api.get_tasks.side_effect = fake.get_tasks
+        api.get_comments.side_effect = fake.get_comments
+        index = CommentIndex(api, max_age=60)
+        
+        index.ingest(["work"])
+        assert index.ingest(["work"]) == {"projects": 0, "tasks": 0}
+        assert api.get_tasks.call_count == 1
+    
+    def test_tasks_leaving_project_are_dropped(self, index, fake):
+        index.ingest(["work"])
+        fake.tasks["work"] = [{"id": "t2", "note_count": 0}]
+        
+        index.ingest(["work"])
+        assert index.search("decided") == []
+    
+    def test_client_writes_update_index(self, index, fake):
+        """Test comment writes apply without triggering a refetch."""
+        index.ingest(["work"])
+        index.handle_event(ChangeEvent("create", "comments", "c4", {}, {
+            "id": "c4", "task_id": "t1", "content": "Moved launch to Monday"
+        }))
+        index.handle_event(ChangeEvent("delete", "comments", "c1", None, None))
+        fake.tasks["work"][0]["note_count"] = 1
+        fake.comment_calls.clear()
+        
+        index.ingest(["work"])
+        
+        assert ("task", "t1") not in fake.comment_calls
+        assert index.search("launch")[0][0]["id"] == "c4"
+        assert index.search("decided") == []
+    
+    def test_search_limited_to_projects(self, index):
+        index.ingest(["work"])
+        
+        assert index.search("decided", project_ids=["home"]) == []
+        assert len(index.search("decided", project_ids=["work"])) == 1
+
+
+class TestStoreBackedCommentIndex:
+    @pytest.fixture
+    def store(self):
+        store = TaskStore(Mock(), max_age=60)
+        store.apply_sync({
+            "full_sync": True,
+            "sync_token": "token1",
+            "items": [
+                {"id": "t1", "project_id": "work", "note_count": 1},
+                {"id": "t2", "project_id": "work", "note_count": 0},
+            ],
+        })
+        return store
+    
+    @pytest.fixture
+    def index(self, fake, store):
+        api = Mock()
+        api.get_comments.side_effect = fake.get_comments
+        return CommentIndex(api, max_age=60, store=store)
+    
+    def test_changed_tasks_come_from_sync(self, index, fake, store):
+        """Test tasks are never listed; only tasks whose count moved in a sync are fetched."""
+        assert index.ingest(["work"]) == {"projects": 1, "tasks": 1}
+        fake.comment_calls.clear()
+        fake.comments[("task", "t2")] = [{"id": "c3", "task_id": "t2", "content": "Budget approved"}]
+        store.apply_sync({"sync_token": "token2", "items": [{"id": "t2", "project_id": "work", "note_count": 1}]})
+        
+        result = index.ingest(["work"])
+        
+        assert result == {"projects": 0, "tasks": 1}
+        assert fake.comment_calls == [("task", "t2")]
+        assert not index.api.get_tasks.called
+        assert index.search("budget")[0][0]["id"] == "c3"
+    
+    def test_failed_fetch_is_retried(self, index, fake, store):
+        """Test a task whose comment fetch fails is fetched again on the next ingest."""
+        index.ingest(["work"])
+        fake.comment_calls.clear()
+        fake.comments[("task", "t2")] = [{"id": "c3", "task_id": "t2", "content": "Budget approved"}]
+        store.apply_sync({"sync_token": "token2", "items": [{"id": "t2", "project_id": "work", "note_count": 1}]})
+        index.api.get_comments.side_effect = RuntimeError("down")
+        
+        with pytest.raises(RuntimeError):
+            index.ingest(["work"])
+        assert index.search("budget") == []
+        
+        index.api.get_comments.side_effect = fake.get_comments
+        assert index.ingest(["work"]) == {"projects": 0, "tasks": 1}
+        assert fake.comment_calls == [("task", "t2")]
+        assert index.search("budget")[0][0]["id"] == "c3"
+        assert index.ingest(["work"]) == {"projects": 0, "tasks": 0}
+    
+    def test_tasks_leaving_project_are_dropped(self, index, store):
+        index.ingest(["work"])
+        store.apply_sync({"sync_token": "token2", "items": [{"id": "t1", "project_id": "work", "checked": True}]})
+        
+        assert index.search("decided") == []
+        assert index.ingest(["work"]) == {"projects": 0, "tasks": 0}
+
+
+class TestSearchCommentsTool:
+    @pytest.mark.asyncio
+    async def test_search_comments_tool(self, fake):
+        """Test results name the task or project each comment belongs to."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            api = mock_api_client.return_value
+            api.sync.return_value = {
+                "full_sync": True,
+                "sync_token": "token1",
+                "projects": [{"id": "work", "name": "Work"}],
+                "items": [{"id": "t1", "content": "Plan release", "project_id": "work", "labels": [],
+                           "note_count": 1}],
+            }
+            api.get_tasks.side_effect = fake.get_tasks
+            api.get_comments.side_effect = fake.get_comments
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            decided = await tools["search_comments"].fn(query="ship friday")
+            kickoff = await tools["search_comments"].fn(query="kickoff", project_ids='["work"]')
+        
+        assert decided["results"][0]["id"] == "c1"
+        assert decided["results"][0]["owner"] == {"type": "task", "id": "t1", "content": "Plan release"}
+        assert kickoff["results"][0]["owner"] == {"type": "project", "id": "work", "name": "Work"}
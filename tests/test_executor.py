@@ -0,0 +1,223 @@
+"""Tests for the tool thread pool and per-tool concurrency caps."""
+
+import asyncio
+import contextvars
+import gc
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from mcp.server.lowlevel.server import request_ctx
+from todoist_mcp.executor import ToolExecutor
+from todoist_mcp.server import TodoistMCPServer
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class TestToolExecutor:
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop_thread(self):
+        executor = ToolExecutor(max_workers=2)
+        loop_thread = threading.get_ident()
+        
+        thread = await executor.run("get_tasks", threading.get_ident)
+        
+        assert thread != loop_thread
+        assert executor.stats()["by_tool"]["get_tasks"] == {"queued": 0, "active": 0, "completed": 1}
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_pattern_cap(self):
+        executor = ToolExecutor(max_workers=8, limits={"batch_*": 2})
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+        
+        def work():
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(0.02)
+            with lock:
+                running["now"] -= 1
+        
+        calls = [executor.run("batch_update_tasks", work) for _ in range(6)]
+        pending = asyncio.gather(*calls)
+        await asyncio.sleep(0.005)
+        assert executor.queue_depth == 4
+        await pending
+        
+        assert running["peak"] == 2
+        assert executor.queue_depth == 0
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_uncapped_tools_share_the_pool(self):
+        executor = ToolExecutor(max_workers=4, limits={})
+        barrier = threading.Barrier(3, timeout=1)
+        
+        await asyncio.gather(*(executor.run("get_task", barrier.wait) for _ in range(3)))
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_context_variables_propagate(self):
+        executor = ToolExecutor()
+        request_id.set("abc")
+        
+        assert await executor.run("get_task", request_id.get) == "abc"
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self):
+        executor = ToolExecutor()
+        
+        def fail():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError, match="boom"):
+            await executor.run("get_task", fail)
+        assert executor.stats()["active"] == 0
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_wrap_keeps_signature(self):
+        executor = ToolExecutor()
+        
+        def add(a: int, b: int = 1) -> int:
+            """Add numbers."""
+            return a + b
+        
+        wrapped = executor.wrap("add", add)
+        
+        assert wrapped.__name__ == "add"
+        assert wrapped.__doc__ == "Add numbers."
+        assert await wrapped(2, b=3) == 5
+        executor.shutdown()
+
+
+session_id = contextvars.ContextVar("session_id", default="local")
+
+
+async def call_from(executor, session, tool, fn, *args):
+    session_id.set(session)
+    return await executor.run(tool, fn, *args)
+
+
+async def flood_behind_gate(executor, calls):
+    """Queue ``calls`` of ``(session, tool, name)`` while the only worker is busy; returns run order."""
+    order = []
+    gate = threading.Event()
+    blocked = asyncio.ensure_future(call_from(executor, "setup", "get_task", gate.wait))
+    await asyncio.sleep(0.01)
+    pending = asyncio.gather(*(call_from(executor, session, tool, order.append, name)
+                               for session, tool, name in calls))
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.gather(blocked, pending)
+    return order
+
+
+class TestFairQueueing:
+    @pytest.mark.asyncio
+    async def test_sessions_take_turns(self):
+        executor = ToolExecutor(max_workers=1, session_key=session_id.get)
+        calls = [("flood", "get_task", f"a{i}") for i in range(6)] + \
+            [("polite", "get_task", f"b{i}") for i in range(2)]
+        
+        order = await flood_behind_gate(executor, calls)
+        
+        assert order == ["a0", "b0", "a1", "b1", "a2", "a3", "a4", "a5"]
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_costly_calls_spend_more_turns(self):
+        executor = ToolExecutor(max_workers=1, limits={}, session_key=session_id.get, costs={"batch_*": 3})
+        calls = [("bulk", "batch_update_tasks", f"batch{i}") for i in range(2)] + \
+            [("reader", "get_task", f"get{i}") for i in range(6)]
+        
+        order = await flood_behind_gate(executor, calls)
+        
+        assert order == ["get0", "get1", "batch0", "get2", "get3", "get4", "batch1", "get5"]
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_capped_calls_do_not_hold_up_other_sessions(self):
+        """Test a session flooding a capped pattern does not queue other sessions behind it."""
+        executor = ToolExecutor(max_workers=1, limits={"batch_*": 1}, costs={}, session_key=session_id.get)
+        calls = [("flood", "batch_update_tasks", f"flood{i}") for i in range(3)] + \
+            [("polite", "batch_complete_tasks", "polite0")]
+        
+        order = await flood_behind_gate(executor, calls)
+        
+        assert order == ["flood0", "polite0", "flood1", "flood2"]
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_per_session_depth_and_wait(self):
+        executor = ToolExecutor(max_workers=1, session_key=session_id.get)
+        gate = threading.Event()
+        blocked = asyncio.ensure_future(call_from(executor, "setup", "get_task", gate.wait))
+        await asyncio.sleep(0.01)
+        queued = [asyncio.ensure_future(call_from(executor, "flood", "get_task", time.sleep, 0)) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        
+        assert executor.session_queue_depth("flood") == 3
+        queued[0].cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        await blocked
+        await asyncio.gather(*queued[1:])
+        stats = executor.stats()["by_session"]
+        
+        assert stats["flood"]["queued"] == 0
+        assert stats["flood"]["completed"] == 2
+        assert stats["flood"]["max_wait_ms"] >= 20
+        assert stats["setup"]["completed"] == 1
+        executor.shutdown()
+
+
+class TestServerExecutor:
+    @pytest.mark.asyncio
+    async def test_tools_run_on_the_pool(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            threads = []
+            mock_api_client.return_value.get_task.side_effect = lambda task_id: threads.append(
+                threading.current_thread().name) or {"id": task_id}
+            server = TodoistMCPServer(token="test_token", tool_limits={"get_*": 1})
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["get_task"].fn(task_id="t1")
+            stats = await tools["get_executor_stats"].fn()
+        
+        assert result == {"id": "t1"}
+        assert threads[0].startswith("todoist-tool")
+        assert stats["limits"] == {"get_*": 1}
+        assert stats["by_tool"]["get_task"]["completed"] == 1
+        assert stats["by_session"]["local"]["completed"] == 1
+        assert "task_id" in tools["get_task"].parameters["properties"]
+        server.executor.shutdown()
+    
+    def test_session_keys_are_not_reused(self):
+        """Test sessions keep one key and a new session never inherits an old one's."""
+        with patch("todoist_mcp.server.TodoistV1Client"):
+            server = TodoistMCPServer(token="test_token")
+        
+        def key_for(session):
+            reset = request_ctx.set(Mock(session=session))
+            try:
+                return server._session_key()
+            finally:
+                request_ctx.reset(reset)
+        
+        class Session:
+            pass
+        
+        first = Session()
+        keys = [key_for(first), key_for(first)]
+        del first
+        gc.collect()
+        keys.append(key_for(Session()))
+        
+        assert keys[0] == keys[1]
+        assert keys[2] != keys[0]
+        assert server._session_key() == "local"
+        server.executor.shutdown()
@@ -0,0 +1,175 @@
+"""Tests for the local task store and the Todoist filter language."""
+
+import datetime
+import pytest
+from unittest.mock import patch
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.filters import Node, compile_filter, sort_key
+from todoist_mcp.server import TodoistMCPServer
+
+NOW = datetime.datetime(2025, 6, 10, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def sync_payload():
+    """Full sync response with a small account."""
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [
+            {"id": "work", "name": "Work"},
+            {"id": "clients", "name": "Clients", "parent_id": "work"},
+            {"id": "home", "name": "Home"},
+        ],
+        "sections": [{"id": "sec1", "name": "Backlog", "project_id": "work"}],
+        "labels": [{"id": "l1", "name": "urgent"}, {"id": "l2", "name": "waiting"}],
+        "items": [
+            {"id": "t1", "content": "Ship release", "project_id": "work", "priority": 4,
+             "labels": ["urgent"], "due": {"date": "2025-06-10"}},
+            {"id": "t2", "content": "Call client", "project_id": "clients", "priority": 3,
+             "labels": ["waiting"], "due": {"date": "2025-06-08"}},
+            {"id": "t3", "content": "Buy milk", "project_id": "home", "priority": 1,
+             "labels": [], "due": None},
+            {"id": "t4", "content": "Plan sprint", "project_id": "work", "section_id": "sec1",
+             "priority": 2, "labels": ["urgent"], "due": {"date": "2025-06-14"}},
+            {"id": "t5", "content": "Done already", "project_id": "work", "checked": True,
+             "labels": []},
+        ],
+    }
+
+
+def ids(expression, store):
+    return sorted(task["id"] for task in compile_filter(expression).select(store, now=NOW))
+
+
+class TestTaskStore:
+    def test_full_sync_loads_active_objects(self, store):
+        """Test completed tasks are not kept."""
+        assert sorted(store.tasks) == ["t1", "t2", "t3", "t4"]
+        assert store.by_label.get("urgent") == {"t1", "t4"}
+        assert store.sync_token == "token1"
+        assert store.is_fresh
+    
+    def test_incremental_sync_applies_delta(self, store):
+        """Test incremental syncs update indexes and invalidate the response cache."""
+        store.api.sync.return_value = {
+            "full_sync": False,
+            "sync_token": "token2",
+            "items": [
+                {"id": "t1", "content": "Ship release", "project_id": "home", "priority": 4, "labels": []},
+                {"id": "t3", "is_deleted": True},
+            ],
+        }
+        changes = store.refresh()
+        
+        store.api.sync.assert_called_with(sync_token="token1", resource_types=["items", "projects", "sections", "labels"])
+        assert changes["tasks"] == 2
+        assert "t3" not in store.tasks
+        assert store.by_project.get("home") == {"t1"}
+        assert store.by_label.get("urgent") == {"t4"}
+        store.api.cache.invalidate.assert_called_with("tasks")
+        store.api.negative_cache.discard.assert_any_call("task", "t3")
+    
+    def test_client_events_update_store(self, store):
+        """Test writes made through the client are applied without a sync."""
+        store.handle_event(ChangeEvent("update", "tasks", "t3", {"priority": 4},
+                                       {"id": "t3", "content": "Buy milk", "project_id": "home",
+                                        "priority": 4, "labels": []}))
+        store.handle_event(ChangeEvent("close", "tasks", "t2", None, None))
+        
+        assert store.by_priority.get(4) == {"t1", "t3"}
+        assert "t2" not in store.tasks
+    
+    def test_deleting_project_drops_its_tasks(self, store):
+        """Test project deletion removes its tasks from the replica."""
+        store.handle_event(ChangeEvent("delete", "projects", "home", None, None))
+        
+        assert "home" not in store.projects
+        assert "t3" not in store.tasks
+    
+    def test_ensure_fresh_skips_recent_sync(self, store):
+        """Test a fresh store does not sync again."""
+        store.ensure_fresh()
+        assert store.api.sync.call_count == 1
+
+
+class TestFilterLanguage:
+    def test_priority(self, store):
+        assert ids("p1", store) == ["t1"]
+        assert ids("no priority", store) == ["t3"]
+    
+    def test_project_and_subprojects(self, store):
+        assert ids("#Work", store) == ["t1", "t4"]
+        assert ids("##work", store) == ["t1", "t2", "t4"]
+    
+    def test_section_and_label(self, store):
+        assert ids("/Backlog", store) == ["t4"]
+        assert ids("@urgent", store) == ["t1", "t4"]
+        assert ids("@wait*", store) == ["t2"]
+        assert ids("no labels", store) == ["t3"]
+    
+    def test_dates(self, store):
+        assert ids("today", store) == ["t1"]
+        assert ids("overdue", store) == ["t2"]
+        assert ids("no date", store) == ["t3"]
+        assert ids("next 7 days", store) == ["t1", "t4"]
+        assert ids("due before: 2025-06-10", store) == ["t2"]
+        assert ids("due after: today", store) == ["t4"]
+    
+    def test_operators_and_precedence(self, store):
+        assert ids("@urgent & !p1", store) == ["t4"]
+        assert ids("p1 | p3 & #Home", store) == ["t1"]
+        assert ids("(p1 | p3) & #Home", store) == []
+        assert ids("(today | overdue) & ##Work", store) == ["t1", "t2"]
+        assert ids("!(@urgent | @waiting)", store) == ["t3"]
+    
+    def test_index_narrowing(self, store):
+        """Test indexed terms narrow the candidate set before evaluation."""
+        compiled = compile_filter("#Work & today")
+        with patch.object(store, "iter_tasks", wraps=store.iter_tasks) as iter_tasks:
+            compiled.select(store, now=NOW)
+        assert iter_tasks.call_args[0][0] == {"t1"}
+    
+    def test_compiled_filters_are_memoized(self):
+        assert compile_filter("p1 & @urgent") is compile_filter("p1  &   @urgent")
+    
+    def test_escaped_operators_in_names(self, make_store, sync_payload):
+        """Test a backslash lets names contain operator characters."""
+        payload = dict(sync_payload, projects=[{"id": "rd", "name": "R&D (old)"}], items=[
+            {"id": "r1", "content": "Prototype", "project_id": "rd", "priority": 4, "labels": ["a|b"]},
+            {"id": "r2", "content": "Report", "project_id": "rd", "priority": 1, "labels": []},
+        ])
+        store = make_store(payload)
+        
+        assert ids(r"#R\&D \(old\)", store) == ["r1", "r2"]
+        assert ids(r"#R\&D \(old\) & @a\|b", store) == ["r1"]
+        assert ids(r"!@a\|b", store) == ["r2"]
+    
+    def test_abstract_node(self):
+        with pytest.raises(TypeError):
+            Node()
+    
+    @pytest.mark.parametrize("expression", ["", "p1 &", "(p1", "bogus term", "due before: someday",
+                                            "#R&D", "@waiting\\"])
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(ValueError):
+            compile_filter(expression)
+    
+    def test_sort_key(self, store):
+        tasks = sorted(store.iter_tasks(), key=sort_key)
+        assert [task["id"] for task in tasks] == ["t2", "t1", "t4", "t3"]
+
+
+class TestFilterTasksTool:
+    @pytest.mark.asyncio
+    async def test_filter_tasks_tool(self, sync_payload):
+        """Test filter_tasks syncs the store and returns matching tasks."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["filter_tasks"].fn(query="@urgent", limit=1)
+        
+        assert result["count"] == 2
+        assert [task["id"] for task in result["results"]] == ["t1"]
@@ -0,0 +1,73 @@
+"""Tests for tabular response formats."""
+
+import pytest
+from unittest.mock import patch
+from todoist_mcp.formats import encode, encode_tsv
+from todoist_mcp.server import TodoistMCPServer
+
+PAGE = {
+    "results": [
+        {"id": "t1", "content": "Write\treport", "due": {"date": "2025-06-10"}, "labels": ["a", "b"]},
+        {"id": "t2", "content": "Call", "due": None, "is_done": True},
+    ],
+    "next_cursor": "abc",
+}
+
+
+class TestEncode:
+    def test_columns(self):
+        assert encode(PAGE, "columns", "id,due.date") == {
+            "columns": ["id", "due.date"],
+            "rows": [["t1", "2025-06-10"], ["t2", None]],
+            "next_cursor": "abc",
+        }
+    
+    def test_columns_default_to_all_keys(self):
+        result = encode(PAGE, "columns")
+        
+        assert result["columns"] == ["id", "content", "due", "labels", "is_done"]
+        assert result["rows"][1] == ["t2", "Call", None, None, True]
+    
+    def test_tsv(self):
+        result = encode(PAGE, "tsv", '["id", "content", "labels", "is_done"]')
+        
+        assert result["tsv"] == (
+            "id\tcontent\tlabels\tis_done\n"
+            't1\tWrite\\treport\t["a","b"]\t\n'
+            "t2\tCall\t\ttrue"
+        )
+        assert result["next_cursor"] == "abc"
+    
+    def test_tsv_without_rows(self):
+        assert encode_tsv([], ["id"]) == "id"
+    
+    def test_json_projects_fields(self):
+        assert encode(PAGE, "json", "id")["results"] == [{"id": "t1"}, {"id": "t2"}]
+        assert encode(PAGE, None) is PAGE
+    
+    def test_errors(self):
+        with pytest.raises(ValueError, match="Unknown format"):
+            encode(PAGE, "csv")
+        with pytest.raises(ValueError, match="list results"):
+            encode({"id": "t1"}, "tsv")
+
+
+class TestListToolFormats:
+    @pytest.mark.asyncio
+    async def test_list_tools(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api = mock_api_client.return_value
+            mock_api.get_labels.return_value = {
+                "results": [{"id": "l1", "name": "urgent", "color": "red"}], "next_cursor": None
+            }
+            mock_api.get_sections.return_value = {
+                "results": [{"id": "s1", "name": "Next"}], "next_cursor": None
+            }
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            labels = await tools["get_labels"].fn(format="columns", fields="id,name")
+            sections = await tools["get_sections"].fn(project_id="p1", format="tsv")
+        
+        assert labels == {"columns": ["id", "name"], "rows": [["l1", "urgent"]], "next_cursor": None}
+        assert sections["tsv"] == "id\tname\ns1\tNext"
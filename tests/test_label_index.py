@@ -0,0 +1,174 @@
+"""Tests for label name/ID translation."""
+
+import pytest
+from unittest.mock import Mock, patch
+from todoist_mcp.api_v1 import ChangeEvent, TodoistV1Client
+from todoist_mcp.labels import LabelIndex
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.store import TaskStore
+
+
+@pytest.fixture
+def mock_httpx_client():
+    """Mock httpx.Client for testing."""
+    with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+        mock_instance = Mock()
+        mock_class.return_value = mock_instance
+        yield mock_instance
+
+
+@pytest.fixture
+def api_client(mock_httpx_client):
+    """Create API client with mocked httpx."""
+    return TodoistV1Client("test_token")
+
+
+def json_response(payload):
+    """Build a successful mock response."""
+    response = Mock()
+    response.status_code = 200
+    response.content = b'{}'
+    response.json.return_value = payload
+    return response
+
+
+LABELS = {"results": [{"id": "l1", "name": "Urgent"}, {"id": "l2", "name": "waiting"}], "next_cursor": None}
+
+
+class TestLabelIndex:
+    def test_both_directions(self):
+        index = LabelIndex()
+        index.load(LABELS["results"])
+        
+        assert index.name_for("urgent") == "Urgent"
+        assert index.name_for("l2") == "waiting"
+        assert index.id_for("URGENT") == "l1"
+        assert index.id_for("l1") == "l1"
+        assert index.name_for("missing") is None
+    
+    def test_rename_and_delete_events(self):
+        index = LabelIndex()
+        index.load(LABELS["results"])
+        index.handle_event(ChangeEvent("update", "labels", "l1", {"name": "Critical"},
+                                       {"id": "l1", "name": "Critical"}))
+        index.handle_event(ChangeEvent("delete", "labels", "l2", None, None))
+        
+        assert index.name_for("l1") == "Critical"
+        assert index.id_for("urgent") is None
+        assert index.id_for("waiting") is None
+        assert len(index) == 1
+
+
+class TestClientLabelResolution:
+    def test_resolves_names_and_ids(self, api_client, mock_httpx_client):
+        """Test one listing serves later translations."""
+        mock_httpx_client.request.return_value = json_response(LABELS)
+        
+        assert api_client.resolve_label_names(["l1", "WAITING"]) == ["Urgent", "waiting"]
+        assert api_client.resolve_label_ids(["urgent", "l2"]) == ["l1", "l2"]
+        assert mock_httpx_client.request.call_count == 1
+    
+    def test_unknown_values(self, api_client, mock_httpx_client):
+        mock_httpx_client.request.return_value = json_response(LABELS)
+        
+        assert api_client.resolve_label_names(["shared-label"]) == ["shared-label"]
+        with pytest.raises(ValueError, match="Unknown label"):
+            api_client.resolve_label_ids(["nope"])
+    
+    def test_unknown_values_reload_at_most_once_per_interval(self, api_client, mock_httpx_client):
+        """Test shared label names do not trigger a listing on every call."""
+        mock_httpx_client.request.return_value = json_response(LABELS)
+        
+        for _ in range(3):
+            assert api_client.resolve_label_names(["shared-label"]) == ["shared-label"]
+        assert mock_httpx_client.request.call_count == 1
+        
+        api_client._labels_loaded -= api_client.LABEL_RELOAD_INTERVAL
+        api_client.resolve_label_names(["shared-label"])
+        assert mock_httpx_client.request.call_count == 2
+    
+    def test_rename_through_client(self, api_client, mock_httpx_client):
+        mock_httpx_client.request.return_value = json_response(LABELS)
+        api_client.load_labels()
+        
+        mock_httpx_client.request.return_value = json_response({"id": "l1", "name": "Critical"})
+        api_client.update_label("l1", name="Critical")
+        
+        assert api_client.resolve_label_names(["l1"]) == ["Critical"]
+
+
+class TestStoreLabelConsistency:
+    @pytest.fixture
+    def store(self):
+        api = Mock()
+        api.sync.return_value = {
+            "full_sync": True,
+            "sync_token": "token1",
+            "labels": [{"id": "l1", "name": "Urgent"}],
+            "items": [
+                {"id": "t1", "project_id": "work", "labels": ["Urgent", "home"]},
+                {"id": "t2", "project_id": "work", "labels": []},
+            ],
+        }
+        store = TaskStore(api)
+        store.refresh()
+        return store
+    
+    def test_rename_updates_tasks(self, store):
+        store.handle_event(ChangeEvent("update", "labels", "l1", {"name": "Critical"},
+                                       {"id": "l1", "name": "Critical"}))
+        
+        assert store.tasks["t1"]["labels"] == ["home", "Critical"]
+        assert store.by_label.get("Critical") == {"t1"}
+        assert store.by_label.get("Urgent") == set()
+    
+    def test_delete_removes_from_tasks(self, store):
+        store.handle_event(ChangeEvent("delete", "labels", "l1", None, None))
+        
+        assert store.tasks["t1"]["labels"] == ["home"]
+        assert store.by_label.get("Urgent") == set()
+
+
+class TestGetTasksLabels:
+    @pytest.mark.asyncio
+    async def test_label_ids_filter_locally(self, mock_httpx_client):
+        """Test get_tasks accepts label IDs and answers from a fresh store without requests."""
+        sync = {
+            "full_sync": True,
+            "sync_token": "token1",
+            "labels": LABELS["results"],
+            "items": [
+                {"id": "t1", "project_id": "work", "labels": ["Urgent"]},
+                {"id": "t2", "project_id": "work", "labels": ["Urgent", "waiting"]},
+                {"id": "t3", "project_id": "work", "labels": []},
+            ],
+        }
+        mock_httpx_client.request.return_value = json_response(sync)
+        server = TodoistMCPServer(token="test_token")
+        server.tenant.store.refresh()
+        mock_httpx_client.request.reset_mock()
+        
+        tools = await server.mcp.get_tools()
+        by_id = await tools["get_tasks"].fn(label_ids='["l1"]')
+        by_names = await tools["get_tasks"].fn(label_ids='["urgent", "Waiting"]')
+        
+        assert [t["id"] for t in by_id["results"]] == ["t1", "t2"]
+        assert [t["id"] for t in by_names["results"]] == ["t2"]
+        mock_httpx_client.request.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_upstream_filters_remaining_labels(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            api = mock_api_client.return_value
+            api.resolve_label_names.side_effect = lambda values: values
+            api.get_tasks.return_value = {
+                "results": [{"id": "t1", "labels": ["a"]}, {"id": "t2", "labels": ["a", "b"]}],
+                "next_cursor": None,
+            }
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["get_tasks"].fn(label_ids='["a", "b"]')
+        
+        api.get_tasks.assert_called_once_with(project_id=None, limit=None, cursor=None, label="a")
+        assert [t["id"] for t in result["results"]] == ["t2"]
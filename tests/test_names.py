@@ -0,0 +1,118 @@
+"""Tests for fuzzy name resolution."""
+
+import pytest
+from unittest.mock import patch
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.names import NameResolver, TrigramIndex, trigrams
+from todoist_mcp.server import TodoistMCPServer
+
+
+@pytest.fixture
+def sync_payload():
+    """Full sync response with projects, sections and labels."""
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [
+            {"id": "p1", "name": "Q3 Planning"},
+            {"id": "p2", "name": "Home"},
+            {"id": "p3", "name": "Q4 Planning"},
+        ],
+        "sections": [{"id": "s1", "name": "Planning notes", "project_id": "p2"}],
+        "labels": [{"id": "l1", "name": "waiting"}, {"id": "l2", "name": "urgent"}],
+        "items": [],
+    }
+
+
+class TestTrigramIndex:
+    def test_trigrams_normalize(self):
+        assert trigrams("Q3  Planning") == trigrams("q3 planning")
+        assert "  q" in trigrams("q")
+    
+    def test_exact_match_ranks_first(self):
+        index = TrigramIndex()
+        index.add("a", "Planning")
+        index.add("b", "Planning ahead")
+        
+        results = index.search("planning")
+        assert results[0] == ("a", 1.0)
+        assert results[1][0] == "b"
+        assert results[1][1] < 1.0
+    
+    def test_typos_still_match(self):
+        index = TrigramIndex()
+        index.add("a", "Groceries")
+        index.add("b", "Work")
+        
+        assert [key for key, _ in index.search("grocerys")] == ["a"]
+    
+    def test_rename_and_discard(self):
+        index = TrigramIndex()
+        index.add("a", "Errands")
+        index.add("a", "Shopping")
+        
+        assert index.search("errands") == []
+        assert index.search("shopping")[0][0] == "a"
+        index.discard("a")
+        assert index.search("shopping") == []
+        assert len(index) == 0
+
+
+class TestNameResolver:
+    def test_resolves_across_kinds(self, store):
+        resolver = NameResolver(store)
+        matches = resolver.resolve("q3 planing")
+        
+        assert matches[0]["id"] == "p1"
+        assert matches[0]["type"] == "project"
+        assert {match["id"] for match in matches} <= {"p1", "p3", "s1"}
+    
+    def test_kind_filter_and_section_project(self, store):
+        resolver = NameResolver(store)
+        matches = resolver.resolve("planning notes", kinds=["section"])
+        
+        assert matches == [{"type": "section", "id": "s1", "name": "Planning notes",
+                            "score": 1.0, "project_id": "p2"}]
+    
+    def test_follows_client_writes(self, store):
+        """Test adds, renames and deletes made through the client update the index."""
+        resolver = NameResolver(store)
+        store.handle_event(ChangeEvent("create", "labels", "l3", {"name": "someday"},
+                                       {"id": "l3", "name": "someday"}))
+        store.handle_event(ChangeEvent("update", "projects", "p2", {"name": "Household"},
+                                       {"id": "p2", "name": "Household"}))
+        store.handle_event(ChangeEvent("delete", "labels", "l1", None, None))
+        
+        assert resolver.resolve("someday")[0]["id"] == "l3"
+        assert resolver.resolve("household")[0]["id"] == "p2"
+        assert resolver.resolve("home") == []
+        assert resolver.resolve("waiting") == []
+
+
+class TestResolveNamesTool:
+    @pytest.mark.asyncio
+    async def test_resolve_names_tool(self, sync_payload):
+        """Test several names are resolved in one call."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["resolve_names"].fn(names='["Q3 planning", "urgnt"]', limit=1)
+            single = await tools["resolve_names"].fn(names="Q3 planning", limit=1)
+            as_list = await tools["resolve_names"].fn(names=["urgnt"], limit=1)
+        
+        assert result["results"]["Q3 planning"][0]["id"] == "p1"
+        assert result["results"]["urgnt"][0]["id"] == "l2"
+        assert single["results"]["Q3 planning"][0]["id"] == "p1"
+        assert as_list["results"]["urgnt"][0]["id"] == "l2"
+        assert mock_api_client.return_value.sync.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_resolve_names_rejects_unknown_type(self):
+        with patch("todoist_mcp.server.TodoistV1Client"):
+            server = TodoistMCPServer(token="test_token")
+            tools = await server.mcp.get_tools()
+            
+            with pytest.raises(ValueError):
+                await tools["resolve_names"].fn(names='["x"]', types='["task"]')
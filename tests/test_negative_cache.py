@@ -0,0 +1,179 @@
+"""Tests for negative caching of missing and forbidden entities."""
+
+import pytest
+from unittest.mock import Mock, patch
+import httpx
+from todoist_mcp.api_v1 import TodoistV1Client
+from todoist_mcp.cache import NegativeCache
+
+
+@pytest.fixture
+def mock_httpx_client():
+    """Mock httpx.Client for testing."""
+    with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+        mock_instance = Mock()
+        mock_class.return_value = mock_instance
+        yield mock_instance
+
+
+@pytest.fixture
+def api_client(mock_httpx_client):
+    """Create API client with mocked httpx."""
+    return TodoistV1Client("test_token")
+
+
+def error_response(status_code):
+    """Build a mock response whose raise_for_status fails with status_code."""
+    response = Mock()
+    response.status_code = status_code
+    response.content = b''
+    response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        f"{status_code} Not Found" if status_code == 404 else f"{status_code} Forbidden",
+        request=Mock(),
+        response=Mock(status_code=status_code)
+    )
+    return response
+
+
+def ok_response(payload):
+    """Build a successful mock response."""
+    response = Mock()
+    response.status_code = 200
+    response.content = b'{}'
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+
+class TestNegativeCache:
+    def test_add_and_get(self):
+        """Test entries are returned while fresh."""
+        cache = NegativeCache(ttl=60)
+        error = httpx.HTTPStatusError("404 Not Found", request=Mock(), response=Mock(status_code=404))
+        cache.add("task", "task1", error)
+
+        assert cache.get("task", "task1") is error
+        assert cache.get("comment", "task1") is None
+
+    def test_entries_expire(self):
+        """Test entries are dropped after the TTL."""
+        cache = NegativeCache(ttl=60)
+        error = httpx.HTTPStatusError("404 Not Found", request=Mock(), response=Mock(status_code=404))
+
+        with patch("todoist_mcp.cache.time.monotonic", return_value=100.0):
+            cache.add("task", "task1", error)
+        with patch("todoist_mcp.cache.time.monotonic", return_value=161.0):
+            assert cache.get("task", "task1") is None
+        assert len(cache) == 0
+
+    def test_max_entries(self):
+        """Test oldest entries are evicted beyond max_entries."""
+        cache = NegativeCache(ttl=60, max_entries=2)
+        error = httpx.HTTPStatusError("404 Not Found", request=Mock(), response=Mock(status_code=404))
+        for task_id in ["a", "b", "c"]:
+            cache.add("task", task_id, error)
+
+        assert cache.get("task", "a") is None
+        assert cache.get("task", "c") is error
+
+    def test_zero_ttl_disables(self):
+        """Test a zero TTL disables caching."""
+        cache = NegativeCache(ttl=0)
+        error = httpx.HTTPStatusError("404 Not Found", request=Mock(), response=Mock(status_code=404))
+        cache.add("task", "task1", error)
+        assert len(cache) == 0
+
+
+class TestClientNegativeCaching:
+    def test_get_task_fails_fast_after_404(self, api_client, mock_httpx_client):
+        """Test a second lookup of a missing task skips the network."""
+        mock_httpx_client.request.return_value = error_response(404)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            api_client.get_task("missing")
+        with pytest.raises(httpx.HTTPStatusError) as exc_info:
+            api_client.get_task("missing")
+
+        assert mock_httpx_client.request.call_count == 1
+        assert exc_info.value.response.status_code == 404
+
+    def test_get_comment_fails_fast_after_403(self, api_client, mock_httpx_client):
+        """Test forbidden comments are cached as well."""
+        mock_httpx_client.request.return_value = error_response(403)
+
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                api_client.get_comment("secret")
+
+        assert mock_httpx_client.request.call_count == 1
+
+    def test_forbidden_write_not_cached(self, api_client, mock_httpx_client):
+        """Test a 403 on a write does not block later reads of the entity."""
+        mock_httpx_client.request.return_value = error_response(403)
+        with pytest.raises(httpx.HTTPStatusError):
+            api_client.update_comment("shared", content="Edit")
+
+        mock_httpx_client.request.return_value = ok_response({"id": "shared", "content": "Visible"})
+        result = api_client.get_comment("shared")
+
+        assert result["content"] == "Visible"
+        assert mock_httpx_client.request.call_count == 2
+
+    def test_other_errors_not_cached(self, api_client, mock_httpx_client):
+        """Test server errors are not negatively cached."""
+        mock_httpx_client.request.return_value = error_response(500)
+
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                api_client.get_task("task1")
+
+        assert mock_httpx_client.request.call_count == 2
+
+    def test_write_clears_entry(self, api_client, mock_httpx_client):
+        """Test a write touching the entity clears its negative entry."""
+        mock_httpx_client.request.return_value = error_response(404)
+        with pytest.raises(httpx.HTTPStatusError):
+            api_client.get_task("task1")
+
+        mock_httpx_client.request.return_value = ok_response({"id": "task1", "content": "Back"})
+        api_client.update_task("task1", content="Back")
+        result = api_client.get_task("task1")
+
+        assert result["content"] == "Back"
+        assert mock_httpx_client.request.call_count == 3
+
+    def test_batch_complete_skips_known_missing(self, api_client, mock_httpx_client):
+        """Test batch_complete_tasks does not retry IDs already reported missing."""
+        mock_httpx_client.request.return_value = error_response(404)
+        first = api_client.batch_complete_tasks(["gone"])
+        second = api_client.batch_complete_tasks(["gone"])
+
+        assert mock_httpx_client.request.call_count == 1
+        assert first["failed"][0]["error"] == "Task not found"
+        assert second["failed"][0]["error"] == "Task not found"
+
+    def test_batch_update_labels_remembers_missing(self, api_client, mock_httpx_client):
+        """Test IDs absent from the bulk read are negatively cached for later batches."""
+        mock_httpx_client.request.return_value = ok_response({"results": [], "next_cursor": None})
+        first = api_client.batch_update_labels(["gone"], add_labels=["urgent"])
+        second = api_client.batch_complete_tasks(["gone"])
+
+        assert first["failed"] == [{"task_id": "gone", "error": "Task not found"}]
+        assert second["failed"] == [{"task_id": "gone", "error": "Task not found"}]
+        assert mock_httpx_client.request.call_count == 1
+        with pytest.raises(httpx.HTTPStatusError) as exc_info:
+            api_client.get_task("gone")
+        assert exc_info.value.response.status_code == 404
+
+    def test_batch_move_skips_known_missing(self, api_client, mock_httpx_client):
+        """Test batch_move_tasks fails fast for cached IDs."""
+        mock_httpx_client.request.return_value = error_response(404)
+        with pytest.raises(httpx.HTTPStatusError):
+            api_client.get_task("gone")
+
+        mock_httpx_client.request.return_value = ok_response({"id": "task2"})
+        result = api_client.batch_move_tasks(["gone", "task2"], project_id="proj1")
+
+        assert result["moved"] == ["task2"]
+        assert result["failed"][0]["task_id"] == "gone"
+        assert mock_httpx_client.request.call_count == 2
@@ -0,0 +1,161 @@
+"""Tests for the rate budget and the get_tasks query planner."""
+
+import logging
+import pytest
+from unittest.mock import Mock, patch
+from todoist_mcp.api_v1 import TodoistV1Client
+from todoist_mcp.planner import QueryPlanner
+from todoist_mcp.ratelimit import RateBudget
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.store import TaskStore
+
+
+@pytest.fixture
+def sync_payload():
+    """Full sync response with tasks in two projects."""
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [{"id": "work", "name": "Work"}, {"id": "home", "name": "Home"}],
+        "items": [
+            {"id": f"w{i}", "project_id": "work", "child_order": i, "labels": ["urgent"] if i % 2 else []}
+            for i in range(5)
+        ] + [{"id": "h1", "project_id": "home", "labels": []}],
+    }
+
+
+@pytest.fixture
+def store(make_store, sync_payload):
+    store = make_store(sync_payload)
+    store.api.get_tasks.return_value = {"results": [{"id": "upstream"}], "next_cursor": None}
+    return store
+
+
+@pytest.fixture
+def planner(store):
+    return QueryPlanner(store, budget=RateBudget(limit=100))
+
+
+def make_stale(store, age):
+    store.last_sync -= store.max_age + age
+
+
+class TestRateBudget:
+    def test_sliding_window(self):
+        budget = RateBudget(limit=10, window=60)
+        with patch("todoist_mcp.ratelimit.time.monotonic", return_value=100.0):
+            budget.record(4)
+        with patch("todoist_mcp.ratelimit.time.monotonic", return_value=120.0):
+            budget.record()
+            assert budget.remaining == 5
+        with patch("todoist_mcp.ratelimit.time.monotonic", return_value=161.0):
+            assert budget.used == 1
+            assert budget.remaining_ratio == 0.9
+    
+    def test_client_records_requests(self):
+        with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+            response = Mock(status_code=200, content=b'{}')
+            response.json.return_value = {"results": []}
+            mock_class.return_value.request.return_value = response
+            client = TodoistV1Client("test_token")
+            
+            client.get_projects()
+            client.add_project(name="New")
+        
+        assert client.rate_budget.used == 2
+
+
+class TestQueryPlanner:
+    def test_unsynced_store_goes_upstream(self):
+        planner = QueryPlanner(TaskStore(Mock()), budget=RateBudget())
+        assert planner.plan({}).path == "upstream"
+    
+    def test_fresh_store_is_local(self, planner):
+        plan = planner.plan({"project_id": "work", "labels": ["urgent"]})
+        
+        assert plan.path == "local"
+        assert plan.cost == 0
+        assert plan.estimate == 2
+    
+    def test_stale_store_prefers_incremental_sync(self, planner, store):
+        make_stale(store, 60)
+        assert planner.plan({"project_id": "work"}).path == "sync_local"
+    
+    def test_long_stale_selective_read_goes_upstream(self, planner, store):
+        """Test a selective read skips a sync whose delta is likely large."""
+        make_stale(store, 7200)
+        plan = planner.plan({"project_id": "home"})
+        
+        assert plan.path == "upstream"
+        assert plan.cost == 1
+    
+    def test_long_stale_broad_read_syncs(self, planner, store):
+        make_stale(store, 7200)
+        assert planner.plan({}, limit=2).path == "sync_local"
+    
+    def test_low_budget_serves_stale_store(self, planner, store):
+        make_stale(store, 60)
+        planner.budget.record(99)
+        assert planner.plan({}).path == "local_stale"
+    
+    def test_upstream_cursor_stays_upstream(self, planner):
+        assert planner.plan({}, cursor="abc123").path == "upstream"
+    
+    def test_local_pages(self, planner, store):
+        first = planner.get_tasks(store.api, project_id="work", limit=3)
+        second = planner.get_tasks(store.api, project_id="work", limit=3, cursor=first["next_cursor"])
+        
+        assert [t["id"] for t in first["results"]] == ["w0", "w1", "w2"]
+        assert [t["id"] for t in second["results"]] == ["w3", "w4"]
+        assert second["next_cursor"] is None
+        store.api.get_tasks.assert_not_called()
+    
+    def test_decisions_logged(self, planner, store, caplog):
+        with caplog.at_level(logging.DEBUG, logger="todoist_mcp.planner"):
+            planner.get_tasks(store.api, project_id="work")
+        
+        assert "-> local (cost 0.0 requests, estimate 5 tasks)" in caplog.text
+    
+    def test_upstream_path_calls_api(self, planner, store):
+        make_stale(store, 7200)
+        result = planner.get_tasks(store.api, project_id="home", upstream_filters={"section_id": "s1"})
+        
+        assert result["results"][0]["id"] == "upstream"
+        store.api.get_tasks.assert_called_once_with(project_id="home", limit=None, cursor=None, section_id="s1")
+
+
+class TestGetTasksTool:
+    @pytest.mark.asyncio
+    async def test_get_tasks_answers_locally_when_fresh(self, sync_payload):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            api = mock_api_client.return_value
+            api.sync.return_value = sync_payload
+            api.rate_budget = RateBudget()
+            api.resolve_label_names.side_effect = lambda values: values
+            server = TodoistMCPServer(token="test_token")
+            server.tenant.store.refresh()
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["get_tasks"].fn(project_id="work", label_ids='["urgent"]')
+            as_list = await tools["get_tasks"].fn(project_id="work", label_ids=["urgent"])
+            plain = await tools["get_tasks"].fn(project_id="work", label_ids="urgent")
+        
+        assert [t["id"] for t in result["results"]] == ["w1", "w3"]
+        assert as_list == result and plain == result
+        api.get_tasks.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_get_tasks_upstream_before_first_sync(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            api = mock_api_client.return_value
+            api.get_tasks.return_value = {"results": [], "next_cursor": None}
+            api.resolve_label_names.side_effect = lambda values: values
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            await tools["get_tasks"].fn(project_id="work", label_ids='["urgent"]')
+        
+        api.get_tasks.assert_called_once_with(
+            project_id="work", limit=None, cursor=None, label="urgent"
+        )
+        api.sync.assert_not_called()
@@ -0,0 +1,78 @@
+"""Tests for the fields projection on read tools."""
+
+import datetime
+import pytest
+from unittest.mock import patch
+from todoist_mcp.projection import project_result, projection
+from todoist_mcp.server import TodoistMCPServer
+
+TASK = {
+    "id": "t1",
+    "content": "Write report",
+    "description": "Long text",
+    "project_id": "work",
+    "labels": [],
+    "due": {"date": datetime.date.today().isoformat(), "string": "today", "is_recurring": False},
+}
+
+
+class TestProjectResult:
+    def test_list_response(self):
+        page = {"results": [TASK], "next_cursor": "abc"}
+        
+        assert project_result(page, projection("id,due.date")) == {
+            "results": [{"id": "t1", "due": {"date": TASK["due"]["date"]}}],
+            "next_cursor": "abc",
+        }
+    
+    def test_single_object(self):
+        assert project_result(TASK, projection('["content"]')) == {"content": "Write report"}
+    
+    def test_no_fields(self):
+        assert project_result(TASK, projection(None)) is TASK
+
+
+class TestReadToolFields:
+    @pytest.mark.asyncio
+    async def test_upstream_and_cached_reads(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api = mock_api_client.return_value
+            mock_api.get_task.return_value = TASK
+            mock_api.get_projects.return_value = {
+                "results": [{"id": "work", "name": "Work", "color": "red"}], "next_cursor": None
+            }
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            task = await tools["get_task"].fn(task_id="t1", fields='["id", "due.date"]')
+            projects = await tools["get_projects"].fn(fields="id,name")
+        
+        assert task == {"id": "t1", "due": {"date": TASK["due"]["date"]}}
+        assert projects["results"] == [{"id": "work", "name": "Work"}]
+        assert "description" in TASK
+    
+    @pytest.mark.asyncio
+    async def test_local_reads(self):
+        payload = {
+            "full_sync": True,
+            "sync_token": "token1",
+            "projects": [{"id": "work", "name": "Work"}],
+            "items": [TASK],
+        }
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            filtered = await tools["filter_tasks"].fn(query="today", fields='["id"]')
+            found = await tools["search_tasks"].fn(query="report", fields='["id"]')
+            agenda = await tools["agenda"].fn(fields='["content"]')
+            top = await tools["top_tasks"].fn(fields='["id"]')
+            listed = await tools["get_tasks"].fn(fields='["id", "content"]')  # store now fresh
+        
+        assert listed["results"] == [{"id": "t1", "content": "Write report"}]
+        assert filtered == {"results": [{"id": "t1"}], "count": 1}
+        assert found["results"][0].keys() == {"id", "score"}
+        assert agenda["days"][0]["tasks"] == [{"content": "Write report"}]
+        assert top["results"][0].keys() == {"id", "score"}
+        assert server.tenant.store.tasks["t1"]["description"] == "Long text"
@@ -0,0 +1,135 @@
+"""Tests for store-backed MCP resources and change subscriptions."""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+from fastmcp import Client
+from mcp import types
+from mcp.server.lowlevel.server import NotificationOptions
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.resources import PROJECTS, ResourceNotifier, project_sections_uri, project_tasks_uri
+from todoist_mcp.server import TodoistMCPServer
+
+
+@pytest.fixture
+def sync_payload():
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [{"id": "work", "name": "Work", "child_order": 2}, {"id": "home", "name": "Home", "child_order": 1}],
+        "sections": [{"id": "s1", "name": "Next", "project_id": "work"}],
+        "labels": [{"id": "l1", "name": "urgent"}],
+        "items": [
+            {"id": "t2", "content": "Second", "project_id": "work", "child_order": 2},
+            {"id": "t1", "content": "First", "project_id": "work", "child_order": 1},
+            {"id": "h1", "content": "Home task", "project_id": "home"},
+        ],
+    }
+
+
+class Session:
+    """Records notifications like an MCP server session would send them."""
+    
+    def __init__(self):
+        self.updated = []
+    
+    async def send_resource_updated(self, uri):
+        self.updated.append(str(uri))
+
+
+class TestResourceNotifier:
+    def test_reads(self, store):
+        notifier = ResourceNotifier(store, watch_interval=None)
+        
+        assert [p["id"] for p in notifier.read(PROJECTS)] == ["home", "work"]
+        assert [t["id"] for t in notifier.read("todoist://projects/{project_id}/tasks", "work")] == ["t1", "t2"]
+        with pytest.raises(ValueError):
+            notifier.read("todoist://nothing")
+    
+    @pytest.mark.asyncio
+    async def test_changes_are_coalesced_per_subscription(self, store):
+        notifier = ResourceNotifier(store, watch_interval=None)
+        session = Session()
+        notifier.subscribe(project_tasks_uri("work"), session)
+        notifier.subscribe(project_tasks_uri("home"), session)
+        
+        # Moving a task changes both projects' task lists
+        store.patch_task("t1", project_id="home")
+        store.patch_task("t2", content="Renamed")
+        store.patch_task("h1", content="Renamed too")
+        await asyncio.sleep(0.01)
+        
+        assert sorted(session.updated) == [project_tasks_uri("home"), project_tasks_uri("work")]
+    
+    @pytest.mark.asyncio
+    async def test_container_changes_and_unsubscribe(self, store):
+        notifier = ResourceNotifier(store, watch_interval=None)
+        session = Session()
+        notifier.subscribe(project_sections_uri("work"), session)
+        notifier.subscribe(PROJECTS, session)
+        
+        store.handle_event(ChangeEvent("delete", "sections", "s1", None, None))
+        await asyncio.sleep(0.01)
+        notifier.unsubscribe(PROJECTS, session)
+        store.handle_event(ChangeEvent("update", "projects", "work", {}, {"id": "work", "name": "Job"}))
+        await asyncio.sleep(0.01)
+        
+        assert session.updated == [project_sections_uri("work")]
+        assert notifier.subscriptions() == {project_sections_uri("work"): 1}
+    
+    @pytest.mark.asyncio
+    async def test_watcher_syncs_while_subscribed(self, store):
+        notifier = ResourceNotifier(store, watch_interval=0.01)
+        store.last_sync -= store.max_age
+        session = Session()  # Subscriptions hold sessions weakly
+        notifier.subscribe(PROJECTS, session)
+        await asyncio.sleep(0.1)
+        notifier.stop()
+        
+        assert store.api.sync.call_count >= 2
+
+
+class TestResourceProtocol:
+    def test_subscribe_capability_advertised(self):
+        """Test the capability patch reaches the options every transport initializes with."""
+        with patch("todoist_mcp.server.TodoistV1Client"):
+            server = TodoistMCPServer(token="test_token")
+        
+        low_level = server.mcp._mcp_server
+        # stdio passes tools_changed; the HTTP transports use the defaults
+        for options in (low_level.create_initialization_options(),
+                        low_level.create_initialization_options(NotificationOptions(tools_changed=True))):
+            assert options.capabilities.resources.subscribe is True
+    
+    @pytest.mark.asyncio
+    async def test_read_subscribe_and_notify(self, sync_payload):
+        updates = []
+        
+        async def message_handler(message):
+            if isinstance(message, types.ServerNotification) and \
+                    isinstance(message.root, types.ResourceUpdatedNotification):
+                updates.append(str(message.root.params.uri))
+        
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            
+            async with Client(server.mcp, message_handler=message_handler) as client:
+                assert client.initialize_result.capabilities.resources.subscribe is True
+                templates = await client.list_resource_templates()
+                contents = await client.read_resource("todoist://projects/work/tasks")
+                await client.session.subscribe_resource("todoist://projects/work/tasks")
+                
+                server.tenant.store.patch_task("t2", content="Changed")
+                for _ in range(50):
+                    if updates:
+                        break
+                    await asyncio.sleep(0.01)
+            server.tenant.resources.stop()
+        
+        assert {t.uriTemplate for t in templates} == {
+            "todoist://projects/{project_id}/tasks", "todoist://projects/{project_id}/sections"
+        }
+        assert [task["id"] for task in json.loads(contents[0].text)] == ["t1", "t2"]
+        assert updates == ["todoist://projects/work/tasks"]
@@ -0,0 +1,115 @@
+"""Tests for response budgets and continuation handles."""
+
+import pytest
+from unittest.mock import patch
+from todoist_mcp.budget import Continuations, ResponseBudget, json_size
+from todoist_mcp.server import TodoistMCPServer
+
+PAGE = {
+    "results": [{"id": f"t{i}", "content": "x" * 20} for i in range(10)],
+    "next_cursor": "upstream-2",
+}
+
+
+class TestResponseBudget:
+    def test_merge_takes_tighter_limit(self):
+        budget = ResponseBudget(max_bytes=1000).merge(max_bytes=5000, max_items=3)
+        
+        assert budget == ResponseBudget(1000, 3)
+        with pytest.raises(ValueError):
+            budget.merge(max_items=0)
+    
+    def test_fit_by_bytes(self):
+        item_size = json_size(PAGE["results"][0])
+        budget = ResponseBudget(max_bytes=2 + item_size * 3 + 2)
+        
+        assert budget.fit(PAGE["results"], json_size) == 3
+    
+    def test_fit_keeps_one_oversized_item(self):
+        assert ResponseBudget(max_bytes=5).fit(PAGE["results"], json_size) == 1
+
+
+class TestContinuations:
+    def test_cut_and_resume(self):
+        continuations = Continuations()
+        budget = ResponseBudget(max_items=4)
+        
+        first = continuations.cut(PAGE, budget)
+        assert [task["id"] for task in first["results"]] == ["t0", "t1", "t2", "t3"]
+        assert first["remaining"] == 6
+        assert "next_cursor" not in first
+        
+        rest = continuations.take(first["continuation"])
+        second = continuations.cut(rest.result, ResponseBudget(max_items=10))
+        assert [task["id"] for task in second["results"]] == [f"t{i}" for i in range(4, 10)]
+        assert second["next_cursor"] == "upstream-2"
+    
+    def test_handles_are_single_use(self):
+        continuations = Continuations()
+        handle = continuations.cut(PAGE, ResponseBudget(max_items=1))["continuation"]
+        continuations.take(handle)
+        
+        with pytest.raises(ValueError, match="Unknown or expired"):
+            continuations.take(handle)
+    
+    def test_expiry_and_capacity(self):
+        continuations = Continuations(max_entries=2, ttl=60)
+        with patch("todoist_mcp.budget.time.monotonic", return_value=100.0):
+            handles = [continuations.cut(PAGE, ResponseBudget(max_items=1))["continuation"] for _ in range(3)]
+            assert len(continuations) == 2
+            with pytest.raises(ValueError):
+                continuations.take(handles[0])
+        with patch("todoist_mcp.budget.time.monotonic", return_value=200.0):
+            with pytest.raises(ValueError):
+                continuations.take(handles[2])
+    
+    def test_within_budget_is_unchanged(self):
+        assert Continuations().cut(PAGE, ResponseBudget(max_items=50)) is PAGE
+
+
+class TestContinueResponseTool:
+    @pytest.mark.asyncio
+    async def test_resume_without_refetching(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api = mock_api_client.return_value
+            mock_api.get_comments.return_value = PAGE
+            server = TodoistMCPServer(token="test_token", max_response_items=6)
+            
+            tools = await server.mcp.get_tools()
+            first = await tools["get_comments"].fn(task_id="task1", fields="id", format="columns")
+            second = await tools["continue_response"].fn(handle=first["continuation"], max_items=3)
+            third = await tools["continue_response"].fn(handle=second["continuation"])
+        
+        assert first["rows"] == [[f"t{i}"] for i in range(6)]
+        assert second == {"columns": ["id"], "rows": [["t6"], ["t7"], ["t8"]],
+                          "continuation": second["continuation"], "remaining": 1}
+        assert third == {"columns": ["id"], "rows": [["t9"]], "next_cursor": "upstream-2"}
+        assert mock_api.get_comments.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_per_call_limits_carry_over(self):
+        """Test a continuation keeps the first call's limits and can only tighten them."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.get_comments.return_value = PAGE
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            first = await tools["get_comments"].fn(task_id="task1", max_items=4)
+            second = await tools["continue_response"].fn(handle=first["continuation"])
+            third = await tools["continue_response"].fn(handle=second["continuation"], max_items=10)
+        
+        assert [len(part["results"]) for part in (first, second, third)] == [4, 4, 2]
+    
+    @pytest.mark.asyncio
+    async def test_byte_budget_sized_in_output_format(self):
+        """Test tsv rows are sized as tsv, not as the JSON objects they come from."""
+        row_bytes = len("t0\t" + "x" * 20) + 1
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.get_comments.return_value = PAGE
+            server = TodoistMCPServer(token="test_token", max_response_bytes=2 + 5 * row_bytes)
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["get_comments"].fn(task_id="task1", format="tsv")
+        
+        assert server.response_budget.fit(PAGE["results"], json_size) < 5
+        assert len(result["tsv"].splitlines()) == 1 + 5
@@ -0,0 +1,215 @@
+"""Tests for the memory-budgeted response cache."""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from todoist_mcp.api_v1 import TodoistV1Client
+from todoist_mcp.cache import ResponseCache
+from todoist_mcp.server import TodoistMCPServer
+
+
+@pytest.fixture
+def mock_httpx_client():
+    """Mock httpx.Client for testing."""
+    with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+        mock_instance = Mock()
+        mock_class.return_value = mock_instance
+        yield mock_instance
+
+
+@pytest.fixture
+def api_client(mock_httpx_client):
+    """Create API client with mocked httpx and a response cache."""
+    return TodoistV1Client("test_token", cache=ResponseCache())
+
+
+def json_response(payload, body=b'{"results": []}'):
+    """Build a successful mock response."""
+    response = Mock()
+    response.status_code = 200
+    response.content = body
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+
+class TestResponseCache:
+    def test_hit_and_miss_accounting(self):
+        """Test hits and misses are counted per entity type."""
+        cache = ResponseCache(max_bytes=10_000)
+        key = cache.make_key("tasks", {"limit": 5})
+        
+        assert cache.get(key, "tasks", default=None) is None
+        cache.put(key, "tasks", {"results": []}, size=100)
+        assert cache.get(key, "tasks") == {"results": []}
+        
+        stats = cache.stats()
+        assert stats["by_entity"]["tasks"]["hits"] == 1
+        assert stats["by_entity"]["tasks"]["misses"] == 1
+        assert stats["by_entity"]["tasks"]["hit_ratio"] == 0.5
+        assert stats["bytes"] == stats["by_entity"]["tasks"]["bytes"]
+        assert stats["bytes"] >= 100
+    
+    def test_budget_enforced(self):
+        """Test total bytes never exceed the budget."""
+        cache = ResponseCache(max_bytes=2_000, max_entry_bytes=2_000)
+        for i in range(20):
+            cache.put(cache.make_key("tasks", {"cursor": i}), "tasks", {}, size=300)
+        
+        stats = cache.stats()
+        assert stats["bytes"] <= 2_000
+        assert stats["evictions"] > 0
+        assert stats["by_entity"]["tasks"]["evictions"] == stats["evictions"]
+    
+    def test_evicts_largest_of_least_recent(self):
+        """Test eviction prefers large, old entries over small, old ones."""
+        cache = ResponseCache(max_bytes=3_000, max_entry_bytes=3_000)
+        small = cache.make_key("labels")
+        large = cache.make_key("tasks")
+        cache.put(small, "labels", {}, size=100)
+        cache.put(large, "tasks", {}, size=1_500)
+        cache.put(cache.make_key("projects"), "projects", {}, size=1_500)
+        
+        assert cache.contains(small)
+        assert not cache.contains(large)
+    
+    def test_recently_used_survive(self):
+        """Test touching an entry protects it from eviction."""
+        cache = ResponseCache(max_bytes=2_000, max_entry_bytes=2_000)
+        cache.EVICTION_SAMPLE = 1
+        first = cache.make_key("tasks", {"cursor": 1})
+        second = cache.make_key("tasks", {"cursor": 2})
+        cache.put(first, "tasks", {}, size=800)
+        cache.put(second, "tasks", {}, size=800)
+        cache.get(first, "tasks")
+        cache.put(cache.make_key("tasks", {"cursor": 3}), "tasks", {}, size=800)
+        
+        assert cache.contains(first)
+        assert not cache.contains(second)
+    
+    def test_oversized_entries_not_cached(self):
+        """Test entries above max_entry_bytes are rejected."""
+        cache = ResponseCache(max_bytes=1_000, max_entry_bytes=100)
+        assert cache.put(cache.make_key("tasks"), "tasks", {}, size=500) is False
+        assert len(cache) == 0
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        cache = ResponseCache(ttl=10)
+        key = cache.make_key("projects")
+        with patch("todoist_mcp.cache.time.monotonic", return_value=0.0):
+            cache.put(key, "projects", {"results": []})
+        with patch("todoist_mcp.cache.time.monotonic", return_value=11.0):
+            assert cache.get(key, "projects", default=None) is None
+        assert cache.stats()["bytes"] == 0
+    
+    def test_invalidate_for_write(self):
+        """Test writes drop dependent entity types only."""
+        cache = ResponseCache()
+        cache.put(cache.make_key("tasks"), "tasks", {})
+        cache.put(cache.make_key("labels"), "labels", {})
+        cache.put(cache.make_key("comments"), "comments", {})
+        
+        cache.invalidate_for_write("labels/abc")
+        
+        assert not cache.contains(cache.make_key("tasks"))
+        assert not cache.contains(cache.make_key("labels"))
+        assert cache.contains(cache.make_key("comments"))
+
+
+class TestClientResponseCaching:
+    def test_repeated_get_served_from_cache(self, api_client, mock_httpx_client):
+        """Test identical GETs hit the network once."""
+        mock_httpx_client.request.return_value = json_response({"results": [], "next_cursor": None})
+        
+        api_client.get_projects(limit=10)
+        api_client.get_projects(limit=10)
+        api_client.get_projects(limit=20)
+        
+        assert mock_httpx_client.request.call_count == 2
+        stats = api_client.cache_stats()
+        assert stats["by_entity"]["projects"]["hits"] == 1
+        assert stats["by_entity"]["projects"]["misses"] == 2
+    
+    def test_write_invalidates(self, api_client, mock_httpx_client):
+        """Test a task write invalidates cached task reads."""
+        mock_httpx_client.request.return_value = json_response({"id": "task1"})
+        
+        api_client.get_task("task1")
+        api_client.update_task("task1", content="Changed")
+        api_client.get_task("task1")
+        
+        assert mock_httpx_client.request.call_count == 3
+    
+    def test_write_during_read_not_cached(self, api_client, mock_httpx_client):
+        """Test a read that started before a write does not cache its pre-write result."""
+        read_started = threading.Event()
+        write_done = threading.Event()
+        
+        def respond(method, url, **kwargs):
+            if method == "GET" and not write_done.is_set():
+                read_started.set()
+                write_done.wait(1)
+                return json_response({"id": "task1", "content": "Old"})
+            return json_response({"id": "task1", "content": "New"})
+        mock_httpx_client.request.side_effect = respond
+        
+        reader = threading.Thread(target=api_client.get_task, args=("task1",))
+        reader.start()
+        read_started.wait(1)
+        api_client.update_task("task1", content="New")
+        write_done.set()
+        reader.join()
+        
+        assert api_client.get_task("task1")["content"] == "New"
+        assert mock_httpx_client.request.call_count == 3
+    
+    def test_no_cache_by_default(self, mock_httpx_client):
+        """Test clients read upstream every time unless given a cache."""
+        client = TodoistV1Client("test_token")
+        mock_httpx_client.request.return_value = json_response({"results": []})
+        
+        client.get_labels()
+        client.get_labels()
+        
+        assert mock_httpx_client.request.call_count == 2
+    
+    def test_batch_update_labels_reads_current_labels_upstream(self, api_client, mock_httpx_client):
+        """Test the read behind a label read-modify-write skips cached responses."""
+        mock_httpx_client.request.return_value = json_response(
+            {"results": [{"id": "t1", "labels": ["old"]}], "next_cursor": None}
+        )
+        api_client.get_tasks(ids="t1", limit=200)
+        
+        # Labels changed elsewhere since the cached read
+        mock_httpx_client.request.return_value = json_response(
+            {"results": [{"id": "t1", "labels": ["old", "added-elsewhere"]}], "next_cursor": None}
+        )
+        api_client.batch_update_labels(["t1"], add_labels=["new"])
+        
+        write = mock_httpx_client.request.call_args_list[-1]
+        assert write.kwargs["json"] == {"labels": ["old", "added-elsewhere", "new"]}
+    
+    def test_disabled_cache(self, mock_httpx_client):
+        """Test a zero TTL disables response caching."""
+        client = TodoistV1Client("test_token", cache=ResponseCache(ttl=0))
+        mock_httpx_client.request.return_value = json_response({"results": []})
+        
+        client.get_labels()
+        client.get_labels()
+        
+        assert mock_httpx_client.request.call_count == 2
+
+
+class TestCacheStatsTool:
+    @pytest.mark.asyncio
+    async def test_get_cache_stats_tool(self):
+        """Test get_cache_stats tool returns client statistics."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.cache_stats.return_value = {"bytes": 0}
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["get_cache_stats"].fn()
+        
+        assert result == {"bytes": 0}
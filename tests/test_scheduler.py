@@ -0,0 +1,142 @@
+"""Tests for priority dispatch of upstream requests."""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from todoist_mcp.api_v1 import TodoistV1Client
+from todoist_mcp.scheduler import (
+    BACKGROUND, BULK, INTERACTIVE, RequestScheduler, prioritized, priority, request_priority,
+)
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.warmup import CacheWarmer
+
+
+def queue_behind(scheduler, arrivals, gap=0.01):
+    """Hold the only slot, queue ``arrivals`` in order, then release; returns dispatch order."""
+    order = []
+    held = threading.Event()
+    release = threading.Event()
+    
+    def holder():
+        with scheduler.slot(INTERACTIVE):
+            held.set()
+            release.wait()
+    
+    def request(name, level):
+        with scheduler.slot(level):
+            order.append(name)
+    
+    threads = [threading.Thread(target=holder)]
+    threads[0].start()
+    held.wait()
+    for name, level in arrivals:
+        thread = threading.Thread(target=request, args=(name, level))
+        thread.start()
+        threads.append(thread)
+        time.sleep(gap)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return order
+
+
+class TestRequestScheduler:
+    def test_higher_classes_dispatched_first(self):
+        scheduler = RequestScheduler(max_concurrent=1, aging=60)
+        
+        order = queue_behind(scheduler, [("refresh", BACKGROUND), ("batch", BULK), ("read", INTERACTIVE)])
+        
+        assert order == ["read", "batch", "refresh"]
+        stats = scheduler.stats()["by_priority"]
+        assert stats[BACKGROUND]["waited"] == 1
+        assert stats[INTERACTIVE]["dispatched"] == 2
+    
+    def test_waiting_requests_age_into_higher_classes(self):
+        scheduler = RequestScheduler(max_concurrent=1, aging=0.01)
+        
+        # The background request has waited more than two aging steps
+        order = queue_behind(scheduler, [("refresh", BACKGROUND), ("read", INTERACTIVE)], gap=0.05)
+        
+        assert order == ["refresh", "read"]
+    
+    def test_fifo_within_class_and_concurrency_cap(self):
+        scheduler = RequestScheduler(max_concurrent=2)
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+        
+        def request():
+            with scheduler.slot():
+                with lock:
+                    running["now"] += 1
+                    running["peak"] = max(running["peak"], running["now"])
+                time.sleep(0.01)
+                with lock:
+                    running["now"] -= 1
+        
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert running["peak"] == 2
+        assert scheduler.stats()["active"] == 0
+        assert scheduler.stats()["by_priority"][INTERACTIVE]["dispatched"] == 6
+    
+    def test_priority_context(self):
+        seen = []
+        
+        with priority(BULK):
+            seen.append(request_priority.get())
+        seen.append(request_priority.get())
+        prioritized("batch_update_tasks", lambda: seen.append(request_priority.get()))()
+        
+        assert seen == [BULK, INTERACTIVE, BULK]
+        assert prioritized("get_task", len) is len
+        with pytest.raises(ValueError):
+            with priority("urgent"):
+                pass
+
+
+class TestClientPriorities:
+    def test_requests_go_through_the_scheduler(self):
+        with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+            mock_class.return_value.request.return_value.status_code = 200
+            mock_class.return_value.request.return_value.content = b'{}'
+            mock_class.return_value.request.return_value.json.return_value = {"id": "t1"}
+            client = TodoistV1Client("test_token")
+            client.get_task("t1")
+            with priority(BULK):
+                client.update_task("t1", content="Changed")
+        
+        stats = client.scheduler_stats()["by_priority"]
+        assert stats[INTERACTIVE]["dispatched"] == 1
+        assert stats[BULK]["dispatched"] == 1
+    
+    def test_warm_up_runs_in_background(self):
+        api = Mock()
+        levels = []
+        api.get_projects.side_effect = lambda: levels.append(request_priority.get()) or {}
+        
+        warmer = CacheWarmer(api).start()
+        warmer.wait(timeout=1)
+        warmer.stop()
+        
+        assert levels == [BACKGROUND]
+    
+    @pytest.mark.asyncio
+    async def test_batch_tools_are_bulk(self):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            levels = []
+            mock_api_client.return_value.batch_complete_tasks.side_effect = \
+                lambda task_ids: levels.append(request_priority.get()) or {"completed": task_ids, "failed": []}
+            mock_api_client.return_value.get_task.side_effect = \
+                lambda task_id: levels.append(request_priority.get()) or {"id": task_id}
+            server = TodoistMCPServer(token="test_token")
+            tools = await server.mcp.get_tools()
+            
+            await tools["batch_complete_tasks"].fn(task_ids='["t1"]')
+            await tools["get_task"].fn(task_id="t1")
+        
+        assert levels == [BULK, INTERACTIVE]
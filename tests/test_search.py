@@ -0,0 +1,131 @@
+"""Tests for local full-text search."""
+
+import pytest
+from unittest.mock import patch
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.search import InvertedIndex, TaskSearchIndex, tokenize
+from todoist_mcp.server import TodoistMCPServer
+
+
+@pytest.fixture
+def sync_payload():
+    """Full sync response with a few searchable tasks."""
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [{"id": "work", "name": "Work"}, {"id": "home", "name": "Home"}],
+        "items": [
+            {"id": "t1", "content": "Write quarterly report", "description": "Budget numbers for the report",
+             "project_id": "work", "priority": 4, "labels": []},
+            {"id": "t2", "content": "Review budget", "description": "", "project_id": "work",
+             "priority": 1, "labels": []},
+            {"id": "t3", "content": "Fix the garden fence", "description": "Need new report nails",
+             "project_id": "home", "priority": 1, "labels": []},
+        ],
+    }
+
+
+@pytest.fixture
+def store(make_store, sync_payload):
+    """Task store with a registered search index."""
+    return make_store(sync_payload, search_index=TaskSearchIndex())
+
+
+class TestTokenize:
+    def test_casefolds_and_drops_stop_words(self):
+        assert tokenize("Call THE plumber, re: sink!") == ["call", "plumber", "re", "sink"]
+        assert tokenize("") == []
+
+
+class TestInvertedIndex:
+    def test_bm25_prefers_higher_term_frequency(self):
+        index = InvertedIndex()
+        index.add_document("a", "report")
+        index.add_document("b", "report report")
+        index.add_document("c", "garden")
+        
+        results = index.search("report")
+        assert [doc_id for doc_id, _ in results] == ["b", "a"]
+    
+    def test_rare_terms_weigh_more(self):
+        index = InvertedIndex()
+        index.add_document("a", "meeting notes")
+        index.add_document("b", "meeting agenda")
+        index.add_document("c", "meeting budget")
+        
+        results = index.search("meeting budget")
+        assert results[0][0] == "c"
+        assert len(results) == 3
+    
+    def test_replace_and_remove(self):
+        index = InvertedIndex()
+        index.add_document("a", "old words")
+        index.search("old")
+        index.add_document("a", "new words")
+        
+        assert index.search("old") == []
+        assert index.search("new")[0][0] == "a"
+        
+        index.remove_document("a")
+        assert index.search("words") == []
+        assert len(index) == 0
+    
+    def test_cached_impacts_follow_updates(self):
+        """Test scores stay consistent with a fresh index after incremental changes."""
+        incremental = InvertedIndex()
+        for i in range(50):
+            incremental.add_document(f"d{i}", f"task {i} shared words")
+        incremental.search("shared task")
+        incremental.add_document("d3", "shared shared shared")
+        incremental.remove_document("d4")
+        
+        fresh = InvertedIndex()
+        for i in range(50):
+            if i == 4:
+                continue
+            fresh.add_document(f"d{i}", "shared shared shared" if i == 3 else f"task {i} shared words")
+        
+        assert [d for d, _ in incremental.search("shared task", limit=5)] == \
+            [d for d, _ in fresh.search("shared task", limit=5)]
+    
+    def test_candidates_restrict_results(self):
+        index = InvertedIndex()
+        index.add_document("a", "report")
+        index.add_document("b", "report")
+        
+        assert [d for d, _ in index.search("report", candidates={"b"})] == ["b"]
+
+
+class TestTaskSearchIndex:
+    def test_indexes_content_and_description(self, store):
+        results = store.search_index.search("report")
+        assert [task_id for task_id, _ in results][:2] == ["t1", "t3"]
+        assert store.search_index.search("budget")[0][0] in {"t1", "t2"}
+    
+    def test_follows_store_changes(self, store):
+        """Test updates and completions reach the index through the store."""
+        store.handle_event(ChangeEvent("update", "tasks", "t2", {}, {
+            "id": "t2", "content": "Review invoices", "description": "", "project_id": "work", "labels": []
+        }))
+        store.handle_event(ChangeEvent("close", "tasks", "t3", None, None))
+        
+        assert [task_id for task_id, _ in store.search_index.search("invoices")] == ["t2"]
+        assert [task_id for task_id, _ in store.search_index.search("report")] == ["t1"]
+
+
+class TestSearchTasksTool:
+    @pytest.mark.asyncio
+    async def test_search_tasks_tool(self, sync_payload):
+        """Test search_tasks returns ranked tasks with scores and honours filters."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["search_tasks"].fn(query="report")
+            filtered = await tools["search_tasks"].fn(query="report", filter="#Home")
+        
+        assert [task["id"] for task in result["results"]] == ["t1", "t3"]
+        assert result["results"][0]["score"] > result["results"][1]["score"]
+        assert "score" not in server.tenant.store.tasks["t1"]
+        assert [task["id"] for task in filtered["results"]] == ["t3"]
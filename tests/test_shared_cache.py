@@ -0,0 +1,159 @@
+"""Tests for the SQLite-backed shared response cache."""
+
+import sqlite3
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from todoist_mcp.api_v1 import TodoistV1Client
+from todoist_mcp.cache import SharedResponseCache
+from todoist_mcp.server import TodoistMCPServer
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Path of a fresh shared cache file."""
+    return str(tmp_path / "cache.sqlite3")
+
+
+@pytest.fixture
+def mock_httpx_client():
+    """Mock httpx.Client for testing."""
+    with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+        mock_instance = Mock()
+        mock_class.return_value = mock_instance
+        yield mock_instance
+
+
+def json_response(payload):
+    """Build a successful mock response."""
+    response = Mock()
+    response.status_code = 200
+    response.content = b'{}'
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+
+class TestSharedResponseCache:
+    def test_entries_visible_across_instances(self, cache_path):
+        """Test a value stored by one process is read by another."""
+        writer = SharedResponseCache(cache_path)
+        reader = SharedResponseCache(cache_path)
+        key = writer.make_key("projects", {"limit": 10})
+        
+        writer.put(key, "projects", {"results": [{"id": "proj1"}]})
+        
+        assert reader.get(key, "projects") == {"results": [{"id": "proj1"}]}
+        assert reader.stats()["by_entity"]["projects"]["hits"] == 1
+    
+    def test_invalidation_across_instances(self, cache_path):
+        """Test invalidation in one process drops entries for all."""
+        first = SharedResponseCache(cache_path)
+        second = SharedResponseCache(cache_path)
+        key = first.make_key("tasks")
+        first.put(key, "tasks", {"results": []})
+        
+        second.invalidate_for_write("tasks/abc")
+        
+        assert first.get(key, "tasks", default=None) is None
+    
+    def test_put_after_invalidation_elsewhere_is_dropped(self, cache_path):
+        """Test a read started before another process's write is not stored after it."""
+        first = SharedResponseCache(cache_path)
+        second = SharedResponseCache(cache_path)
+        key = first.make_key("tasks")
+        generation = first.generation("tasks")
+        
+        second.invalidate_for_write("tasks/abc")
+        
+        assert not first.put(key, "tasks", {"results": []}, generation=generation)
+        assert not first.contains(key)
+        assert first.put(key, "tasks", {"results": []}, generation=first.generation("tasks"))
+    
+    def test_namespaces_are_isolated(self, cache_path):
+        """Test entries for different accounts do not collide."""
+        alice = SharedResponseCache(cache_path, namespace="alice")
+        bob = SharedResponseCache(cache_path, namespace="bob")
+        key = alice.make_key("labels")
+        alice.put(key, "labels", {"results": ["a"]})
+        
+        assert bob.get(key, "labels", default=None) is None
+        bob.invalidate("labels")
+        assert alice.contains(key)
+    
+    def test_budget_enforced(self, cache_path):
+        """Test the file stays within the byte budget."""
+        cache = SharedResponseCache(cache_path, max_bytes=2_000, max_entry_bytes=2_000)
+        for i in range(20):
+            cache.put(cache.make_key("tasks", {"cursor": i}), "tasks", {"pad": "x" * 200})
+        
+        stats = cache.stats()
+        assert stats["bytes"] <= 2_000
+        assert stats["evictions"] > 0
+    
+    def test_expired_entries_miss(self, cache_path):
+        """Test entries expire by wall clock time."""
+        cache = SharedResponseCache(cache_path, ttl=10)
+        key = cache.make_key("projects")
+        with patch("todoist_mcp.cache.time.time", return_value=1_000.0):
+            cache.put(key, "projects", {"results": []})
+        with patch("todoist_mcp.cache.time.time", return_value=1_011.0):
+            assert cache.get(key, "projects", default=None) is None
+        assert len(cache) == 0
+    
+    
+    def test_close_closes_every_threads_connection(self, cache_path):
+        """Test close() reaches connections opened by worker threads."""
+        cache = SharedResponseCache(cache_path)
+        key = cache.make_key("projects")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(lambda i: cache.put(key, "projects", {"i": i}), range(6)))
+        connections = list(cache._connections)
+        
+        cache.close()
+        
+        assert len(connections) >= 2
+        for conn in connections:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        # The cache still works afterwards on fresh connections
+        assert cache.get(key, "projects", default=None) is not None
+        cache.close()
+
+
+class TestClientSharedCache:
+    def test_second_worker_reads_from_shared_cache(self, cache_path, mock_httpx_client):
+        """Test upstream reads are not repeated per worker."""
+        mock_httpx_client.request.return_value = json_response({"results": [], "next_cursor": None})
+        worker_a = TodoistV1Client("test_token", cache=SharedResponseCache(cache_path))
+        worker_b = TodoistV1Client("test_token", cache=SharedResponseCache(cache_path))
+        
+        worker_a.get_projects()
+        worker_b.get_projects()
+        
+        assert mock_httpx_client.request.call_count == 1
+    
+    def test_write_in_one_worker_invalidates_other(self, cache_path, mock_httpx_client):
+        """Test a write through one worker forces a fresh read in another."""
+        mock_httpx_client.request.return_value = json_response({"id": "task1"})
+        worker_a = TodoistV1Client("test_token", cache=SharedResponseCache(cache_path))
+        worker_b = TodoistV1Client("test_token", cache=SharedResponseCache(cache_path))
+        
+        worker_b.get_task("task1")
+        worker_a.update_task("task1", content="Changed")
+        worker_b.get_task("task1")
+        
+        assert mock_httpx_client.request.call_count == 3
+
+
+class TestServerSharedCache:
+    def test_server_uses_shared_cache(self, cache_path):
+        """Test shared_cache_path configures a namespaced shared cache."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            TodoistMCPServer(token="test_token", shared_cache_path=cache_path)
+        
+        args, kwargs = mock_api_client.call_args
+        assert args == ("test_token",)
+        assert isinstance(kwargs["cache"], SharedResponseCache)
+        assert kwargs["cache"].path == cache_path
+        assert kwargs["cache"].namespace != "default"
@@ -0,0 +1,104 @@
+"""Start-up cost regression tests."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+from todoist_mcp.api_v1 import TodoistV1Client
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+# Wall-clock budgets are several times the usual cost so that only a real
+# regression (e.g. a new heavy import), not machine load, trips them
+ENTRY_POINT_BUDGET = 5.0
+SERVER_MODULES_BUDGET = 1.0
+
+# Modules each import adds to sys.modules
+PROBE = """
+import json, sys
+before = set(sys.modules)
+import todoist_mcp
+package = sorted(set(sys.modules) - before)
+import fastmcp, httpx
+before = set(sys.modules)
+import todoist_mcp.server
+server = sorted(set(sys.modules) - before)
+print(json.dumps({"package": package, "server": server}))
+"""
+
+# The imports main() makes before it can serve, timed in a fresh interpreter
+TIMING_PROBE = """
+import json, time
+start = time.perf_counter()
+from todoist_mcp import main
+import fastmcp, httpx
+dependencies = time.perf_counter()
+from todoist_mcp.server import TodoistMCPServer
+end = time.perf_counter()
+print(json.dumps({"entry_point": end - start, "server": end - dependencies}))
+"""
+
+
+def probe(code=PROBE):
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output)
+
+
+def third_party(modules):
+    """Top-level packages other than the standard library and this package."""
+    return {name.split(".")[0] for name in modules} - set(sys.stdlib_module_names) - {"todoist_mcp"}
+
+
+class TestImportTime:
+    def test_package_import_is_light(self):
+        package = probe()["package"]
+        
+        assert third_party(package) == set()
+        assert [name for name in package if name.startswith("todoist_mcp.")] == []
+    
+    def test_server_adds_no_dependencies(self):
+        # On top of FastMCP and httpx, which the server cannot avoid
+        assert third_party(probe()["server"]) == set()
+    
+    def test_stdio_path_skips_shared_cache(self):
+        """Test sqlite3 is imported only when a shared cache is configured."""
+        assert "sqlite3" not in probe()["server"]
+    
+    def test_entry_point_within_budget(self):
+        timings = probe(TIMING_PROBE)
+        
+        assert timings["entry_point"] < ENTRY_POINT_BUDGET
+        assert timings["server"] < SERVER_MODULES_BUDGET
+    
+    def test_server_class_still_exported(self):
+        import todoist_mcp
+        from todoist_mcp.server import TodoistMCPServer
+        
+        assert todoist_mcp.TodoistMCPServer is TodoistMCPServer
+
+
+class TestLazyClient:
+    def test_http_client_created_on_first_request(self):
+        with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+            client = TodoistV1Client("test_token")
+            assert not mock_class.called
+            
+            mock_class.return_value.request.return_value.status_code = 200
+            mock_class.return_value.request.return_value.content = b'{}'
+            mock_class.return_value.request.return_value.json.return_value = {"id": "p1"}
+            client.get_project("p1")
+            client.get_project("p2")
+            client.close()
+        
+        mock_class.assert_called_once_with(headers=client.headers)
+        mock_class.return_value.close.assert_called_once()
+    
+    def test_close_without_requests(self):
+        with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+            TodoistV1Client("test_token").close()
+        
+        assert not mock_class.called
@@ -0,0 +1,80 @@
+"""Tests for materialized task counts."""
+
+import pytest
+from unittest.mock import patch
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.stats import TaskCounts
+
+
+@pytest.fixture
+def sync_payload():
+    """Full sync response with tasks across projects, labels and priorities."""
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [{"id": "work", "name": "Work"}, {"id": "home", "name": "Home"}],
+        "items": [
+            {"id": "t1", "project_id": "work", "priority": 4, "labels": ["urgent", "deep"]},
+            {"id": "t2", "project_id": "work", "priority": 4, "labels": [], "responsible_uid": "u1"},
+            {"id": "t3", "project_id": "work", "priority": 1, "labels": ["urgent"]},
+            {"id": "t4", "project_id": "home", "priority": 4, "labels": []},
+        ],
+    }
+
+
+def as_dict(rows):
+    return {tuple(group.values()): count for group, count in rows}
+
+
+@pytest.fixture
+def store(make_store, sync_payload):
+    return make_store(sync_payload, counts=TaskCounts())
+
+
+class TestTaskCounts:
+    def test_single_dimensions(self, store):
+        assert as_dict(store.counts.counts(["project"])) == {("work",): 3, ("home",): 1}
+        assert as_dict(store.counts.counts(["label"])) == {("urgent",): 2, ("deep",): 1, (None,): 2}
+        assert as_dict(store.counts.counts(["assignee"])) == {("u1",): 1, (None,): 3}
+        assert store.counts.total == 4
+    
+    def test_pairs_in_any_order(self, store):
+        expected = {("work", 4): 2, ("work", 1): 1, ("home", 4): 1}
+        assert as_dict(store.counts.counts(["project", "priority"])) == expected
+        
+        rows = store.counts.counts(["priority", "project"])
+        assert {(group["project"], group["priority"]): count for group, count in rows} == expected
+    
+    def test_updates_on_mutations(self, store):
+        """Test counts follow updates, completions and sync deltas without rescans."""
+        store.handle_event(ChangeEvent("update", "tasks", "t3", {}, {
+            "id": "t3", "project_id": "work", "priority": 4, "labels": ["urgent"]
+        }))
+        store.handle_event(ChangeEvent("close", "tasks", "t4", None, None))
+        store.apply_sync({"items": [{"id": "t2", "project_id": "home", "priority": 4, "labels": []}]})
+        
+        assert as_dict(store.counts.counts(["project", "priority"])) == {("work", 4): 2, ("home", 4): 1}
+        assert store.counts.total == 3
+    
+    @pytest.mark.parametrize("group_by", [["colour"], [], ["project", "project"],
+                                          ["project", "label", "priority"]])
+    def test_invalid_group_by(self, store, group_by):
+        with pytest.raises(ValueError):
+            store.counts.counts(group_by)
+
+
+class TestGetTaskStatsTool:
+    @pytest.mark.asyncio
+    async def test_get_task_stats(self, sync_payload):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["get_task_stats"].fn(group_by="project,priority")
+        
+        assert result["group_by"] == ["project", "priority"]
+        assert result["total"] == 4
+        assert result["groups"][0] == {"project_id": "work", "project": "Work", "priority": 4, "count": 2}
+        assert len(result["groups"]) == 3
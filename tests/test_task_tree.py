@@ -0,0 +1,123 @@
+"""Tests for the task hierarchy index and get_task_tree."""
+
+import pytest
+from unittest.mock import patch
+from todoist_mcp.api_v1 import ChangeEvent
+from todoist_mcp.projection import Projection, parse_fields
+from todoist_mcp.server import TodoistMCPServer
+
+
+def task(task_id, parent_id=None, child_order=0, **fields):
+    return dict({"id": task_id, "content": task_id.title(), "project_id": "work", "section_id": None,
+                 "parent_id": parent_id, "child_order": child_order, "labels": []}, **fields)
+
+
+@pytest.fixture
+def sync_payload():
+    """Full sync response with a three-level task tree."""
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "projects": [{"id": "work", "name": "Work"}, {"id": "home", "name": "Home"}],
+        "items": [
+            task("root", due={"date": "2025-06-10"}),
+            task("b", "root", child_order=2),
+            task("a", "root", child_order=1),
+            task("a1", "a"),
+            task("other"),
+        ],
+    }
+
+
+class TestHierarchy:
+    def test_children_descendants_ancestors(self, store):
+        assert [t["id"] for t in store.children("root")] == ["a", "b"]
+        assert sorted(store.descendant_ids("root")) == ["a", "a1", "b"]
+        assert store.descendant_ids("a1") == []
+        assert store.ancestor_ids("a1") == ["a", "root"]
+        assert store.ancestor_ids("root") == []
+    
+    def test_closing_parent_removes_subtree(self, store):
+        store.handle_event(ChangeEvent("close", "tasks", "a", None, None))
+        
+        assert "a" not in store.tasks
+        assert "a1" not in store.tasks
+        assert [t["id"] for t in store.children("root")] == ["b"]
+    
+    def test_closing_recurring_parent_keeps_subtree(self, store):
+        """Test completing a recurring task keeps it and its subtasks and resyncs its date."""
+        store.upsert_task(task("a", "root", child_order=1, due={"date": "2025-06-10", "is_recurring": True}))
+        store.handle_event(ChangeEvent("close", "tasks", "a", None, None))
+        
+        assert "a" in store.tasks
+        assert "a1" in store.tasks
+        assert store.ancestor_ids("a1") == ["a", "root"]
+        assert [t["id"] for t in store.children("root")] == ["a", "b"]
+        assert not store.is_fresh
+    
+    def test_move_carries_subtree(self, store):
+        """Test moving a parent moves its subtasks to the same project."""
+        store.handle_event(ChangeEvent("move", "tasks", "root", {"project_id": "home"}, None))
+        
+        assert {store.tasks[t]["project_id"] for t in ["root", "a", "b", "a1"]} == {"home"}
+        assert store.by_project.get("work") == {"other"}
+        assert store.tasks["a1"]["parent_id"] == "a"
+    
+    def test_move_under_new_parent(self, store):
+        store.handle_event(ChangeEvent("move", "tasks", "a", {"parent_id": "other"}, None))
+        
+        assert [t["id"] for t in store.children("other")] == ["a"]
+        assert store.ancestor_ids("a1") == ["a", "other"]
+
+
+class TestProjection:
+    def test_parse_fields(self):
+        assert parse_fields('["id", "due.date"]') == ("id", "due.date")
+        assert parse_fields("id, content") == ("id", "content")
+        assert parse_fields(None) is None
+    
+    def test_nested_paths(self):
+        select = Projection(["id", "due.date", "missing"])
+        
+        assert select({"id": "1", "content": "x", "due": {"date": "2025-06-10", "string": "today"}}) == \
+            {"id": "1", "due": {"date": "2025-06-10"}}
+        assert select([{"id": "1"}, {"id": "2", "due": None}]) == [{"id": "1"}, {"id": "2", "due": None}]
+    
+    def test_parent_path_wins(self):
+        assert Projection(["due.date", "due"])({"due": {"date": "d", "string": "s"}}) == \
+            {"due": {"date": "d", "string": "s"}}
+
+
+class TestGetTaskTreeTool:
+    @pytest.mark.asyncio
+    async def test_get_task_tree(self, sync_payload):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            tree = await tools["get_task_tree"].fn(task_id="root", fields='["id", "due.date"]')
+            shallow = await tools["get_task_tree"].fn(task_id="a", depth=0)
+        
+        assert tree == {
+            "id": "root",
+            "due": {"date": "2025-06-10"},
+            "children": [
+                {"id": "a", "children": [{"id": "a1", "children": []}]},
+                {"id": "b", "children": []},
+            ],
+            "ancestor_ids": [],
+        }
+        assert "children" not in shallow
+        assert shallow["ancestor_ids"] == ["root"]
+        assert shallow["content"] == "A"
+    
+    @pytest.mark.asyncio
+    async def test_unknown_task(self, sync_payload):
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = sync_payload
+            server = TodoistMCPServer(token="test_token")
+            tools = await server.mcp.get_tools()
+            
+            with pytest.raises(ValueError):
+                await tools["get_task_tree"].fn(task_id="missing")
@@ -0,0 +1,282 @@
+"""Tests for multi-tenant mode and the tenant registry."""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from fastmcp.server.http import _current_http_request
+from mcp import types
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from starlette.requests import Request
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.tenants import MEMORY_PER_JSON_BYTE, Tenant, TenantRegistry, tenant_key, token_from_request
+
+
+def make_tenant(token, key):
+    return Tenant(Mock(), key=key)
+
+
+def http_request(token=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "method": "POST", "path": "/mcp", "headers": headers})
+
+
+@pytest.fixture
+def multi_tenant_server():
+    with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+        mock_api_client.side_effect = lambda token, **options: Mock(token=token, options=options)
+        server = TodoistMCPServer(multi_tenant=True, max_tenants=2, response_cache=True)
+        yield server
+        server.tenants.close()
+
+
+def full_sync(task_count):
+    return {
+        "full_sync": True,
+        "sync_token": "token1",
+        "items": [{"id": f"t{i}", "content": "Task", "project_id": "work", "labels": []}
+                  for i in range(task_count)],
+    }
+
+
+async def call_as(server, token, name, **arguments):
+    tools = await server.mcp.get_tools()
+    reset = _current_http_request.set(http_request(token))
+    try:
+        return await tools[name].fn(**arguments)
+    finally:
+        _current_http_request.reset(reset)
+
+
+class TestTenantRegistry:
+    def test_tenants_are_reused_per_token(self):
+        registry = TenantRegistry(make_tenant)
+        
+        with registry.acquire("token-a") as first:
+            pass
+        with registry.acquire("token-a") as again:
+            pass
+        with registry.acquire("token-b") as other:
+            pass
+        
+        assert first is again
+        assert other is not first
+        assert first.key == tenant_key("token-a")
+        assert registry.stats()["created"] == 2
+    
+    def test_least_recently_used_evicted_beyond_cap(self):
+        registry = TenantRegistry(make_tenant, max_tenants=2)
+        
+        with registry.acquire("a") as a:
+            pass
+        with registry.acquire("b"):
+            pass
+        with registry.acquire("a"):
+            pass
+        with registry.acquire("c"):
+            pass
+        
+        assert [tenant.key for tenant in registry.tenants()] == [tenant_key("a"), tenant_key("c")]
+        assert registry.evicted == 1
+        assert not a.api.close.called
+    
+    def test_busy_tenants_are_not_evicted(self):
+        registry = TenantRegistry(make_tenant, max_tenants=1)
+        
+        with registry.acquire("a") as a:
+            with registry.acquire("b"):
+                assert len(registry) == 2
+            assert registry.stats()["active"] == 1
+        with registry.acquire("c"):
+            pass
+        
+        assert a.api.close.called
+        assert [tenant.key for tenant in registry.tenants()] == [tenant_key("c")]
+    
+    def test_idle_tenants_expire(self):
+        registry = TenantRegistry(make_tenant, idle_ttl=60)
+        with registry.acquire("a") as a:
+            pass
+        a.last_used -= 61
+        
+        with registry.acquire("b"):
+            pass
+        
+        assert a.api.close.called
+        assert len(registry) == 1
+    
+    @pytest.mark.asyncio
+    async def test_subscribed_tenants_are_not_evicted(self):
+        registry = TenantRegistry(make_tenant, max_tenants=1, idle_ttl=60)
+        session = Mock()
+        with registry.acquire("a") as a:
+            a.resources.subscribe("todoist://projects", session)
+        a.last_used -= 61
+        
+        with registry.acquire("b"):
+            pass
+        
+        assert not a.api.close.called
+        assert registry.stats()["subscribed"] == 1
+        a.resources.unsubscribe("todoist://projects", session)
+        with registry.acquire("c"):
+            pass
+        assert a.api.close.called
+    
+    def test_factory_runs_outside_the_lock(self):
+        """Test a tenant is built without the registry lock and a lost race is discarded."""
+        built = []
+        
+        def factory(token, key):
+            assert not registry._lock.locked()
+            tenant = make_tenant(token, key)
+            built.append(tenant)
+            if len(built) == 1:
+                # Another call for the same token finishes first
+                with registry.acquire(token):
+                    pass
+            return tenant
+        
+        registry = TenantRegistry(factory)
+        with registry.acquire("a") as tenant:
+            pass
+        
+        assert len(built) == 2
+        assert tenant is built[1] and registry.tenants() == [tenant]
+        assert built[0].api.close.called
+        assert registry.stats()["created"] == 1
+    
+    def test_memory_estimate_follows_the_replica(self):
+        tenant = make_tenant("a", "a")
+        assert tenant.memory_bytes() == 0
+        
+        tenant.store.apply_sync(full_sync(10))
+        size = tenant.store.size_bytes
+        assert tenant.memory_bytes() == size * MEMORY_PER_JSON_BYTE > 0
+        tenant.store.upsert_task(dict(tenant.store.tasks["t0"], content="A much longer task title"))
+        assert tenant.store.size_bytes == size + len("A much longer task title") - len("Task")
+        tenant.store.remove_task("t0")
+        tenant.store.apply_sync(full_sync(0))
+        assert tenant.memory_bytes() == 0
+    
+    def test_tenants_over_memory_cap_are_refused(self):
+        registry = TenantRegistry(make_tenant, max_tenant_bytes=50_000, reject_ttl=60)
+        
+        with registry.acquire("small") as small:
+            small.store.apply_sync(full_sync(5))
+        with registry.acquire("large") as large:
+            large.store.apply_sync(full_sync(200))
+            # Not dropped while its call is in flight
+            assert len(registry) == 2
+        
+        assert large.api.close.called
+        assert registry.tenants() == [small]
+        assert registry.stats()["rejected"] == 1
+        with pytest.raises(ValueError, match="limit per account"):
+            with registry.acquire("large"):
+                pass
+        later = time.monotonic() + 61
+        with patch("todoist_mcp.tenants.time.monotonic", return_value=later):
+            with registry.acquire("large") as again:
+                pass
+        assert again is not large
+    
+    def test_token_from_request(self):
+        reset = _current_http_request.set(http_request("secret"))
+        try:
+            assert token_from_request() == "secret"
+        finally:
+            _current_http_request.reset(reset)
+        
+        with pytest.raises(ValueError, match="HTTP transport"):
+            token_from_request()
+        reset = _current_http_request.set(http_request())
+        try:
+            with pytest.raises(ValueError, match="Authorization"):
+                token_from_request()
+        finally:
+            _current_http_request.reset(reset)
+
+
+class TestMultiTenantServer:
+    @pytest.mark.asyncio
+    async def test_calls_use_the_callers_account(self, multi_tenant_server):
+        server = multi_tenant_server
+        
+        await call_as(server, "token-a", "get_project", project_id="p1")
+        await call_as(server, "token-b", "get_project", project_id="p2")
+        await call_as(server, "token-a", "get_project", project_id="p3")
+        
+        # Most recently used last
+        b, a = server.tenants.tenants()
+        assert a.api.token == "token-a" and b.api.token == "token-b"
+        assert [c.kwargs["project_id"] for c in a.api.get_project.call_args_list] == ["p1", "p3"]
+        assert [c.kwargs["project_id"] for c in b.api.get_project.call_args_list] == ["p2"]
+        # Each tenant gets its own bounded cache
+        assert a.api.options["cache"] is not b.api.options["cache"]
+        assert a.api.options["cache"].max_bytes == server.tenant_cache_bytes
+    
+    @pytest.mark.asyncio
+    async def test_calls_without_token_are_rejected(self, multi_tenant_server):
+        with pytest.raises(ValueError, match="Authorization"):
+            await call_as(multi_tenant_server, None, "get_project", project_id="p1")
+        
+        assert len(multi_tenant_server.tenants) == 0
+        with pytest.raises(ValueError, match="No tenant"):
+            multi_tenant_server.api
+    
+    @pytest.mark.asyncio
+    async def test_continuations_are_private_to_a_tenant(self, multi_tenant_server):
+        server = multi_tenant_server
+        first_parts = [
+            server.continuations.cut({"results": [{"id": str(i)} for i in range(3)]},
+                                     server.response_budget.merge(None, 1),
+                                     state={"format": "json", "fields": None, "tenant": tenant_key("token-a")})
+            for _ in range(2)
+        ]
+        
+        with pytest.raises(ValueError, match="Unknown or expired"):
+            await call_as(server, "token-b", "continue_response", handle=first_parts[0]["continuation"])
+        rest = await call_as(server, "token-a", "continue_response", handle=first_parts[1]["continuation"],
+                             max_items=5)
+        # Another account's attempt does not use up the owner's handle
+        kept = await call_as(server, "token-a", "continue_response", handle=first_parts[0]["continuation"],
+                             max_items=5)
+        
+        assert [task["id"] for task in rest["results"]] == ["1", "2"]
+        assert [task["id"] for task in kept["results"]] == ["1", "2"]
+        assert (await call_as(server, "token-a", "get_executor_stats"))["tenants"]["tenants"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_subscribe_builds_tenant_off_the_loop(self, multi_tenant_server):
+        server = multi_tenant_server
+        loop_thread = threading.current_thread()
+        factory = server.tenants.factory
+        threads = []
+        
+        def tracking_factory(token, key):
+            threads.append(threading.current_thread())
+            return factory(token, key)
+        
+        server.tenants.factory = tracking_factory
+        handler = server.mcp._mcp_server.request_handlers[types.SubscribeRequest]
+        session = Mock()
+        http_reset = _current_http_request.set(http_request("token-a"))
+        ctx_reset = request_ctx.set(RequestContext(request_id=1, meta=None, session=session,
+                                                   lifespan_context=None))
+        try:
+            await handler(types.SubscribeRequest(method="resources/subscribe",
+                                                 params=types.SubscribeRequestParams(uri="todoist://projects")))
+        finally:
+            request_ctx.reset(ctx_reset)
+            _current_http_request.reset(http_reset)
+        
+        assert threads and threads[0] is not loop_thread
+        tenant, = server.tenants.tenants()
+        assert tenant.resources.subscriptions()
+        tenant.resources.unsubscribe("todoist://projects", session)
+    
+    def test_warm_cache_rejected(self, multi_tenant_server):
+        with pytest.raises(ValueError):
+            multi_tenant_server.warm_cache()
@@ -0,0 +1,83 @@
+"""Tests for importance scoring and top_tasks."""
+
+import datetime
+import pytest
+from unittest.mock import patch
+from todoist_mcp.ranking import TaskScorer, top_k
+from todoist_mcp.server import TodoistMCPServer
+
+NOW = datetime.datetime(2025, 6, 10, 12, 0).astimezone()
+
+
+def task(task_id, priority=1, due=None, labels=()):
+    return {"id": task_id, "content": task_id, "project_id": "work", "priority": priority,
+            "labels": list(labels), "due": {"date": due} if due else None}
+
+
+class TestTaskScorer:
+    def test_components(self):
+        scorer = TaskScorer(now=NOW)
+        
+        assert scorer(task("p1", priority=4)) == pytest.approx(1.0)
+        assert scorer(task("today", due="2025-06-10")) == pytest.approx(1.0)
+        assert scorer(task("tomorrow", due="2025-06-11")) == pytest.approx(0.5)
+        assert scorer(task("month_late", due="2025-05-11")) == pytest.approx(1.5)
+        assert scorer(task("plain")) == 0
+    
+    def test_overdue_grows_with_lateness(self):
+        scorer = TaskScorer(now=NOW)
+        
+        assert scorer(task("a", due="2025-06-09")) < scorer(task("b", due="2025-06-01"))
+    
+    def test_custom_weights_and_labels(self):
+        scorer = TaskScorer({"priority": 0, "labels": {"Urgent": 2}}, now=NOW)
+        
+        assert scorer(task("a", priority=4, labels=["urgent"])) == pytest.approx(2.0)
+    
+    def test_unknown_weight(self):
+        with pytest.raises(ValueError):
+            TaskScorer({"colour": 1})
+
+
+class TestTopK:
+    def test_bounded_selection(self):
+        tasks = [task(f"t{i}", priority=1 + i % 4) for i in range(100)]
+        results = top_k(tasks, 3, TaskScorer(now=NOW))
+        
+        assert [t["id"] for t, _ in results] == ["t3", "t7", "t11"]
+        assert all(score == pytest.approx(1.0) for _, score in results)
+    
+    def test_fewer_tasks_than_k(self):
+        results = top_k([task("a"), task("b", priority=2)], 5, TaskScorer(now=NOW))
+        assert [t["id"] for t, _ in results] == ["b", "a"]
+
+
+class TestTopTasksTool:
+    @pytest.mark.asyncio
+    async def test_top_tasks(self):
+        today = datetime.date.today().isoformat()
+        payload = {
+            "full_sync": True,
+            "sync_token": "token1",
+            "projects": [{"id": "work", "name": "Work"}, {"id": "home", "name": "Home"}],
+            "items": [
+                task("low"),
+                task("urgent", priority=4, due=today),
+                task("important", priority=4),
+                dict(task("home", priority=3), project_id="home"),
+            ],
+        }
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            mock_api_client.return_value.sync.return_value = payload
+            server = TodoistMCPServer(token="test_token")
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["top_tasks"].fn(k=2)
+            filtered = await tools["top_tasks"].fn(k=2, filter="#Home")
+            reweighted = await tools["top_tasks"].fn(k=1, weights='{"priority": 0, "labels": {"x": 1}}')
+        
+        assert [t["id"] for t in result["results"]] == ["urgent", "important"]
+        assert result["results"][0]["score"] == 2.0
+        assert result["considered"] == 4
+        assert [t["id"] for t in filtered["results"]] == ["home"]
+        assert [t["id"] for t in reweighted["results"]] == ["urgent"]
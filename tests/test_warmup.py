@@ -0,0 +1,172 @@
+"""Tests for background cache warming and single-flight reads."""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from todoist_mcp.api_v1 import TodoistV1Client
+from todoist_mcp.cache import ResponseCache
+from todoist_mcp.server import TodoistMCPServer
+from todoist_mcp.warmup import CacheWarmer
+
+
+@pytest.fixture
+def mock_httpx_client():
+    """Mock httpx.Client for testing."""
+    with patch("todoist_mcp.api_v1.httpx.Client") as mock_class:
+        mock_instance = Mock()
+        mock_class.return_value = mock_instance
+        yield mock_instance
+
+
+def json_response(payload):
+    """Build a successful mock response."""
+    response = Mock()
+    response.status_code = 200
+    response.content = b'{}'
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+
+class TestCacheWarmer:
+    def test_loads_all_collections(self):
+        """Test warm-up loads projects, sections per project, labels and tasks."""
+        api = Mock()
+        api.get_projects.return_value = {
+            "results": [{"id": "proj1"}, {"id": "proj2"}],
+            "next_cursor": None
+        }
+        
+        warmer = CacheWarmer(api).start()
+        assert warmer.wait(timeout=5)
+        warmer.stop()
+        
+        api.get_projects.assert_called_once_with()
+        api.get_labels.assert_called_once_with()
+        api.get_tasks.assert_called_once_with()
+        assert sorted(c.kwargs["project_id"] for c in api.get_sections.call_args_list) == ["proj1", "proj2"]
+        assert warmer.done
+        assert warmer.errors == []
+    
+    def test_errors_are_recorded_not_raised(self):
+        """Test a failing load does not stop the others."""
+        api = Mock()
+        api.get_labels.side_effect = RuntimeError("boom")
+        api.get_projects.return_value = {"results": []}
+        
+        warmer = CacheWarmer(api).start()
+        assert warmer.wait(timeout=5)
+        warmer.stop()
+        
+        assert warmer.errors == ["boom"]
+        api.get_tasks.assert_called_once_with()
+    
+    def test_syncs_store_in_background(self):
+        """Test warm-up syncs the local task store at background priority."""
+        from todoist_mcp.scheduler import BACKGROUND, request_priority
+        
+        api = Mock()
+        api.get_projects.return_value = {"results": []}
+        store = Mock()
+        levels = []
+        store.ensure_fresh.side_effect = lambda: levels.append(request_priority.get())
+        
+        warmer = CacheWarmer(api, store=store).start()
+        assert warmer.wait(timeout=5)
+        warmer.stop()
+        
+        store.ensure_fresh.assert_called_once_with()
+        assert levels == [BACKGROUND]
+
+
+class TestSingleFlight:
+    def test_concurrent_reads_share_one_request(self, mock_httpx_client):
+        """Test a read arriving during an in-flight identical read waits for it."""
+        client = TodoistV1Client("test_token", cache=ResponseCache())
+        started = threading.Event()
+        release = threading.Event()
+        
+        def slow_request(*args, **kwargs):
+            started.set()
+            release.wait(timeout=5)
+            return json_response({"results": [{"id": "proj1"}], "next_cursor": None})
+        
+        mock_httpx_client.request.side_effect = slow_request
+        results = []
+        leader = threading.Thread(target=lambda: results.append(client.get_projects()))
+        leader.start()
+        assert started.wait(timeout=5)
+        
+        follower = threading.Thread(target=lambda: results.append(client.get_projects()))
+        follower.start()
+        release.set()
+        leader.join(timeout=5)
+        follower.join(timeout=5)
+        
+        assert mock_httpx_client.request.call_count == 1
+        assert results[0] == results[1]
+    
+    def test_failure_propagates_to_waiters(self, mock_httpx_client):
+        """Test an in-flight failure is raised and not cached."""
+        client = TodoistV1Client("test_token", cache=ResponseCache())
+        mock_httpx_client.request.side_effect = [RuntimeError("down"), json_response({"results": []})]
+        
+        with pytest.raises(RuntimeError):
+            client.get_labels()
+        assert client.get_labels() == {"results": []}
+
+
+class TestServerWarmup:
+    def test_run_with_warm_cache(self):
+        """Test run(warm_cache=True) starts warm-up and stops it on exit."""
+        with patch("todoist_mcp.server.TodoistV1Client"), \
+             patch("todoist_mcp.server.CacheWarmer") as mock_warmer:
+            server = TodoistMCPServer(token="test_token", response_cache=True)
+            with patch.object(server.mcp, "run") as mock_run:
+                server.run(warm_cache=True, transport="stdio")
+            
+            mock_warmer.assert_called_once_with(server.api, store=server.tenant.store)
+            mock_warmer.return_value.start.assert_called_once()
+            mock_warmer.return_value.start.return_value.stop.assert_called_once()
+            mock_run.assert_called_once_with(transport="stdio")
+    
+    def test_run_without_warm_cache(self):
+        """Test warm-up is opt-in."""
+        with patch("todoist_mcp.server.TodoistV1Client"), \
+             patch("todoist_mcp.server.CacheWarmer") as mock_warmer:
+            server = TodoistMCPServer(token="test_token")
+            with patch.object(server.mcp, "run"):
+                server.run()
+            
+            mock_warmer.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_first_local_tool_after_warm_up_skips_sync(self):
+        """Test a store-backed tool call after warm-up makes no upstream sync."""
+        with patch("todoist_mcp.server.TodoistV1Client") as mock_api_client:
+            api = mock_api_client.return_value
+            api.get_projects.return_value = {"results": []}
+            api.sync.return_value = {
+                "full_sync": True,
+                "sync_token": "token1",
+                "items": [{"id": "task1", "content": "Buy milk", "priority": 4}],
+            }
+            server = TodoistMCPServer(token="test_token", response_cache=True)
+            warmer = server.warm_cache()
+            assert warmer.wait(timeout=5)
+            warmer.stop()
+            assert api.sync.call_count == 1
+            
+            tools = await server.mcp.get_tools()
+            result = await tools["filter_tasks"].fn(query="p1")
+            
+            assert api.sync.call_count == 1
+            assert [task["id"] for task in result["results"]] == ["task1"]
+    
+    def test_warm_cache_needs_a_cache(self):
+        """Test warming is refused when responses are not cached."""
+        with patch("todoist_mcp.server.TodoistV1Client"):
+            server = TodoistMCPServer(token="test_token")
+            
+            with pytest.raises(ValueError, match="response cache"):
+                server.warm_cache()